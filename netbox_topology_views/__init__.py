@@ -14,7 +14,17 @@ class TopologyViewsConfig(PluginConfig):
         "static_image_directory": "netbox_topology_views/img",
         "allow_coordinates_saving": False,
         "always_save_coordinates": False,
+        "cache_timeout": 300,
+        "max_neighbor_depth": 3,
+        "max_neighbors_per_hop": 500,
+        "coordinates_custom_field_fallback": True,
+        "xml_export_images": "embed",
+        "compress_responses": True,
+        "background_build_threshold": 0,
+        "background_result_timeout": 3600,
+        "slow_build_threshold": 0,
     }
+    middleware = ["netbox_topology_views.profiling.ServerTimingMiddleware"]
 
     def ready(self):
         from . import signals
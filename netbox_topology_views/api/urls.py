@@ -7,5 +7,9 @@ router = NetBoxRouter()
 router.register("save-coords", views.SaveCoordsViewSet)
 router.register("images", views.SaveRoleImageViewSet)
 router.register("xml-export", views.ExportTopoToXML)
+router.register("graph-export", views.ExportTopoToGraph, basename="graphexport")
+router.register("render", views.RenderTopology, basename="render")
+router.register("topology", views.TopologyViewSet, basename="topology")
+router.register("coordinate-groups", views.CoordinateGroupViewSet, basename="coordinategroup")
 
 urlpatterns = router.urls
@@ -1,26 +1,45 @@
 from typing import Dict
 import sys
+import time
 
-from circuits.models import Circuit
-from dcim.models import Device, DeviceRole, PowerFeed, PowerPanel
-from extras.models import SavedFilter
+from core.choices import JobStatusChoices
+from dcim.models import Device, DeviceRole
 from django.conf import settings
 from django.contrib.auth.mixins import PermissionRequiredMixin
 from django.contrib.contenttypes.models import ContentType
-from django.http import HttpResponse, JsonResponse
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, JsonResponse, QueryDict, StreamingHttpResponse
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.viewsets import ReadOnlyModelViewSet, ViewSet
 
 from netbox_topology_views.api.serializers import (
+    CoordinateGroupSerializer,
     RoleImageSerializer,
     TopologyDummySerializer,
 )
-import netbox_topology_views.models
-from netbox_topology_views.models import RoleImage, IndividualOptions, CoordinateGroup, Coordinate, CircuitCoordinate, PowerPanelCoordinate, PowerFeedCoordinate
-from netbox_topology_views.views import get_topology_data
-from netbox_topology_views.utils import get_image_from_url, export_data_to_xml, get_query_settings
+from netbox_topology_views.models import NODE_PREFIXES, RoleImage, IndividualOptions, CoordinateGroup, Coordinate
+from netbox_topology_views.views import get_cached_topology_data, get_topology_settings
+from netbox_topology_views.utils import get_image_from_url, iter_data_to_xml, get_topology_delta
 from netbox_topology_views.filters import DeviceFilterSet
+from netbox_topology_views.compression import CompressedResponseMixin
+from netbox_topology_views.metrics import observe_coordinate_save
+from netbox_topology_views.jobs import ACTIVE_JOB_STATES, enqueue_topology_build, get_topology_build
+from netbox_topology_views.exporters import EXPORTERS, iter_graph_export
+from netbox_topology_views.rendering import cairosvg, iter_svg_export, render_png
+from netbox_topology_views.coordinate_io import FILE_FORMATS, get_export_response, import_coordinates
+from netbox_topology_views.caching import (
+    CACHE_MISS,
+    etag_matches,
+    get_build_result_key,
+    get_cache_key_for_etag,
+    get_topology_build_key,
+    get_topology_cache_key,
+    get_topology_etag,
+    invalidate_topology_cache,
+)
 
 class SaveCoordsViewSet(PermissionRequiredMixin, ReadOnlyModelViewSet):
     permission_required = 'netbox_topology_views.change_coordinate'
@@ -35,67 +54,368 @@ class SaveCoordsViewSet(PermissionRequiredMixin, ReadOnlyModelViewSet):
         ]:
             return Response({"status": "not allowed to save coords"}, status=500)
 
-        device_id: str = request.data.get("node_id", None)
+        device_id: str = str(request.data.get("node_id", ""))
         x_coord = request.data.get("x", None)
         y_coord = request.data.get("y", None)
         group_id = request.data.get("group", "None")
 
+        prefix = device_id[:1] if device_id[:1] in NODE_PREFIXES else ""
+        object_id = device_id[len(prefix):]
         actual_device = None
-        if device_id.startswith("c"):
-            device_id = device_id.lstrip("c")
-            actual_device = Circuit.objects.get(id=device_id)
-            model_name = 'CircuitCoordinate'
-        elif device_id.startswith("p"):
-            device_id = device_id.lstrip("p")
-            actual_device = PowerPanel.objects.get(id=device_id)
-            model_name = 'PowerPanelCoordinate'
-        elif device_id.startswith("f"):
-            device_id = device_id.lstrip("f")
-            actual_device = PowerFeed.objects.get(id=device_id)
-            model_name = 'PowerFeedCoordinate'
-        elif device_id.isnumeric():
-            actual_device = Device.objects.get(id=device_id)
-            model_name = 'Coordinate'
+        if object_id.isnumeric():
+            actual_device = NODE_PREFIXES[prefix].objects.filter(pk=object_id).first()
 
         if not actual_device:
             return Response({"status": "invalid node_id in body"}, status=400)
 
-        model_class = getattr(netbox_topology_views.models, model_name)
-
         if group_id is None or group_id == "default":
-            group_id = model_class.get_or_create_default_group(group_id)
+            group_id = Coordinate.get_or_create_default_group(group_id)
             if not group_id:
                 return Response(
                     {"status": "Error while creating default group."}, status=500
                 )  
 
+        start = time.perf_counter()
         try:
             if CoordinateGroup.objects.filter(pk=group_id):
                 group = CoordinateGroup.objects.get(pk=group_id)
-                # Hen-and-egg-problem. Thanks, Django! By default, Django updates records that
-                # already exist and inserts otherwise. This does not work with our 
-                # unique_together key if no pk is given. But: No record, no pk.
-                if not model_class.objects.filter(group=group, device=actual_device):
-                    # Unique group/device pair does not exist. Prepare new data set
-                    coords = model_class(group=group, device=actual_device, x=x_coord, y=y_coord)
-                else:
-                    # Unique group/device pair already exists. Update data
-                    coords = model_class(pk=model_class.objects.get(group=group, device=actual_device).pk, group=group, device=actual_device, x=x_coord, y=y_coord)  
+                coords = Coordinate.objects.filter(
+                    group=group,
+                    content_type=ContentType.objects.get_for_model(actual_device),
+                    object_id=actual_device.pk,
+                ).first() or Coordinate(group=group, assigned_object=actual_device)
+                coords.x = x_coord
+                coords.y = y_coord
                 coords.save()
         except:
             return Response(
                 {"status": "Coordinates could not be saved."}, status=500
             )
 
+        observe_coordinate_save("single", time.perf_counter() - start, 1)
         return Response({"status": "saved coords"})
 
-class ExportTopoToXML(PermissionRequiredMixin, ViewSet):
+    @action(detail=False, methods=["patch"])
+    def save_coords_bulk(self, request):
+        """
+        Save the coordinates of many nodes of one group at once. Expects
+        {"group": <group id>, "nodes": [{"node_id": ..., "x": ..., "y": ...}, ...]}
+        and writes all of them with a single upsert.
+        """
+        if not settings.PLUGINS_CONFIG["netbox_topology_views"][
+            "allow_coordinates_saving"
+        ]:
+            return Response({"status": "not allowed to save coords"}, status=500)
+
+        group_id = request.data.get("group", "None")
+        nodes = request.data.get("nodes", None)
+        if not isinstance(nodes, list):
+            return Response({"status": "nodes must be a list"}, status=400)
+
+        if group_id is None or group_id == "default":
+            group_id = Coordinate.get_or_create_default_group(group_id)
+            if not group_id:
+                return Response(
+                    {"status": "Error while creating default group."}, status=500
+                )
+        group = CoordinateGroup.objects.filter(pk=group_id).first() if str(group_id).isnumeric() else None
+        if group is None:
+            return Response({"status": "invalid group"}, status=400)
+
+        # node ids and positions per node prefix, a later position of the same node wins
+        node_statuses: Dict[str, str] = {}
+        positions: Dict[str, Dict[int, tuple]] = {prefix: {} for prefix in NODE_PREFIXES}
+        for node in nodes:
+            node_id = str(node.get("node_id", "")) if isinstance(node, dict) else ""
+            prefix = node_id[:1] if node_id[:1] in NODE_PREFIXES else ""
+            try:
+                object_id = int(node_id[len(prefix):])
+                position = (int(node["x"]), int(node["y"]))
+            except (KeyError, TypeError, ValueError):
+                node_statuses[node_id] = "invalid node"
+                continue
+            positions[prefix][object_id] = position
+            node_statuses[node_id] = "not found"
+
+        coordinates = []
+        content_types = ContentType.objects.get_for_models(*NODE_PREFIXES.values())
+        for prefix, model in NODE_PREFIXES.items():
+            if not positions[prefix]:
+                continue
+            existing_ids = set(model.objects.filter(
+                pk__in=positions[prefix].keys()
+            ).values_list("pk", flat=True))
+            for object_id, (x, y) in positions[prefix].items():
+                if object_id in existing_ids:
+                    coordinates.append(Coordinate(
+                        group=group, content_type=content_types[model], object_id=object_id, x=x, y=y
+                    ))
+                    node_statuses[f"{prefix}{object_id}"] = "saved"
+
+        start = time.perf_counter()
+        try:
+            with transaction.atomic():
+                Coordinate.objects.bulk_create(
+                    coordinates,
+                    update_conflicts=True,
+                    unique_fields=["group", "content_type", "object_id"],
+                    update_fields=["x", "y", "last_updated"],
+                )
+
+                # bulk_create does not send the signals which invalidate cached topologies
+                transaction.on_commit(invalidate_topology_cache)
+        except Exception:
+            return Response(
+                {"status": "Coordinates could not be saved."}, status=500
+            )
+
+        observe_coordinate_save("bulk", time.perf_counter() - start, len(coordinates))
+        return Response({
+            "status": "saved coords",
+            "nodes": [
+                {"node_id": node_id, "status": status}
+                for node_id, status in node_statuses.items()
+            ],
+        })
+
+
+class CoordinateGroupViewSet(CompressedResponseMixin, PermissionRequiredMixin, ViewSet):
+    permission_required = (
+        "netbox_topology_views.add_coordinategroup",
+        "netbox_topology_views.add_coordinate",
+    )
+
+    # Permissions of the actions which differ from permission_required
+    action_permissions = {
+        "export_coordinates": ("netbox_topology_views.view_coordinate",),
+        "import_coordinates": (
+            "netbox_topology_views.add_coordinate",
+            "netbox_topology_views.change_coordinate",
+        ),
+    }
+
+    queryset = CoordinateGroup.objects.none()
+    serializer_class = CoordinateGroupSerializer
+
+    def get_permission_required(self):
+        action_name = self.action_map.get(self.request.method.lower())
+        return self.action_permissions.get(action_name, self.permission_required)
+
+    @action(detail=True, methods=["post"])
+    def clone(self, request, pk=None):
+        """
+        Copy all coordinates of a group into a new group. Expects
+        {"name": ..., "description": ..., "device_filter": {<device filter parameters>}},
+        the device filter is optional.
+        """
+        group = CoordinateGroup.objects.filter(pk=pk).first()
+        if group is None:
+            return Response({"status": "coordinate group not found"}, status=404)
+
+        name = request.data.get("name", "")
+        if not name:
+            return Response({"status": "name is required"}, status=400)
+        if CoordinateGroup.objects.filter(name=name).exists():
+            return Response({"status": "a coordinate group with this name already exists"}, status=400)
+
+        devices = None
+        device_filter = request.data.get("device_filter", None)
+        if device_filter:
+            if not isinstance(device_filter, dict):
+                return Response({"status": "device_filter must be an object"}, status=400)
+            # Unknown parameters are ignored by the filter set, they would copy all coordinates
+            unknown = sorted(set(device_filter) - set(DeviceFilterSet.base_filters))
+            if unknown:
+                return Response({"status": f"unknown device filter: {', '.join(unknown)}"}, status=400)
+
+            query = QueryDict(mutable=True)
+            for key, value in device_filter.items():
+                query.setlist(key, [str(v) for v in value] if isinstance(value, list) else [str(value)])
+            filterset = DeviceFilterSet(query, Device.objects.all())
+            if not filterset.is_valid():
+                return Response({"status": "invalid device filter", "errors": filterset.errors}, status=400)
+            devices = filterset.qs
+
+        try:
+            new_group, count = group.clone(
+                name, description=request.data.get("description", ""), devices=devices
+            )
+        except IntegrityError:
+            # Created by a concurrent request since the check above
+            return Response({"status": "a coordinate group with this name already exists"}, status=400)
+
+        return Response(
+            {"id": new_group.pk, "name": new_group.name, "coordinates": count},
+            status=201,
+        )
+
+    @action(detail=True, methods=["get"], url_path="export")
+    def export_coordinates(self, request, pk=None):
+        """
+        Stream all coordinates of a group as csv (default) or JSON lines,
+        selected with ?file_format=csv|jsonl
+        """
+        group = CoordinateGroup.objects.filter(pk=pk).first()
+        if group is None:
+            return Response({"status": "coordinate group not found"}, status=404)
+
+        file_format = request.query_params.get("file_format", "csv")
+        if file_format not in FILE_FORMATS:
+            return Response({"status": "file_format must be csv or jsonl"}, status=400)
+
+        return get_export_response(group, file_format)
+
+    @action(detail=True, methods=["post"], url_path="import", parser_classes=[MultiPartParser])
+    def import_coordinates(self, request, pk=None):
+        """
+        Create or update the coordinates of a group from an uploaded csv or JSON
+        lines file (form field "file"). The format is taken from the field
+        "file_format" or the file extension.
+        """
+        group = CoordinateGroup.objects.filter(pk=pk).first()
+        if group is None:
+            return Response({"status": "coordinate group not found"}, status=404)
+
+        file = request.FILES.get("file", None)
+        if file is None:
+            return Response({"status": "file is required"}, status=400)
+
+        file_format = request.data.get("file_format", "") or file.name.rsplit(".", 1)[-1].lower()
+        if file_format not in FILE_FORMATS:
+            return Response({"status": "file_format must be csv or jsonl"}, status=400)
+
+        try:
+            count = import_coordinates(group, file, file_format)
+        except ValueError as e:
+            return Response({"status": str(e)}, status=400)
+
+        return Response({"status": "imported coords", "coordinates": count})
+
+
+def get_export_topology_data(request, view: str):
+    """
+    returns the (cached) topology for the filter parameters of an export request
+    """
+    queryset = DeviceFilterSet(
+        request.GET, Device.objects.all().select_related("device_type", "role")
+    ).qs
+
+    individualOptions, created = IndividualOptions.objects.get_or_create(
+        user_id=request.user.id,
+    )
+
+    return get_cached_topology_data(
+        request,
+        queryset=queryset,
+        individualOptions=individualOptions,
+        group_id=request.query_params.get("group", "default"),
+        topology_settings=get_topology_settings(request),
+        view=view,
+    )
+
+
+class ExportTopoToXML(CompressedResponseMixin, PermissionRequiredMixin, ViewSet):
     permission_required = ("dcim.view_site", "dcim.view_device")
 
     queryset = Device.objects.none()
     serializer_class = TopologyDummySerializer
 
     def list(self, request):
+        if request.GET:
+            topo_data = get_export_topology_data(request, "xml")
+
+            # Embedded images work offline, linked images keep large exports small
+            image_base_url = None
+            xml_images = request.query_params.get(
+                "xml_images", settings.PLUGINS_CONFIG["netbox_topology_views"]["xml_export_images"]
+            )
+            if xml_images == "link":
+                image_base_url = f"{request.scheme}://{request.get_host()}"
+
+            return StreamingHttpResponse(
+                iter_data_to_xml(topo_data, image_base_url), content_type="application/xml; charset=utf-8"
+            )
+        else:
+            return JsonResponse(
+                {"status": "Missing or malformed request parameters"}, status=400
+            )
+
+
+class ExportTopoToGraph(CompressedResponseMixin, PermissionRequiredMixin, ViewSet):
+    """
+    Stream the topology as GraphML, GEXF, Graphviz DOT or JSON Graph Format,
+    selected with ?graph_format=graphml|gexf|dot|jgf
+    """
+    permission_required = ("dcim.view_site", "dcim.view_device")
+
+    queryset = Device.objects.none()
+    serializer_class = TopologyDummySerializer
+
+    def list(self, request):
+        graph_format = request.query_params.get("graph_format", "graphml")
+        if graph_format not in EXPORTERS:
+            return JsonResponse(
+                {"status": f"graph_format must be one of {', '.join(EXPORTERS)}"}, status=400
+            )
+
+        _, content_type, extension = EXPORTERS[graph_format]
+        response = StreamingHttpResponse(
+            iter_graph_export(get_export_topology_data(request, "graph"), graph_format),
+            content_type=f"{content_type}; charset=utf-8",
+        )
+        response["Content-Disposition"] = f'attachment; filename="topology.{extension}"'
+        return response
+
+
+class RenderTopology(CompressedResponseMixin, PermissionRequiredMixin, ViewSet):
+    """
+    Render the topology on the server, as streamed SVG (?image_format=svg, default)
+    or as PNG (?image_format=png, requires cairosvg). Nodes without stored
+    coordinates are placed by a server-side layout, ?layout=auto places all nodes.
+    """
+    permission_required = ("dcim.view_site", "dcim.view_device")
+
+    queryset = Device.objects.none()
+    serializer_class = TopologyDummySerializer
+
+    def list(self, request):
+        image_format = request.query_params.get("image_format", "svg")
+        if image_format not in ("svg", "png"):
+            return JsonResponse({"status": "image_format must be svg or png"}, status=400)
+        if image_format == "png" and cairosvg is None:
+            return JsonResponse({"status": "PNG rendering requires the cairosvg package"}, status=400)
+
+        topo_data = get_export_topology_data(request, "render")
+        use_stored_positions = request.query_params.get("layout", "stored") != "auto"
+
+        if image_format == "png":
+            response = HttpResponse(render_png(topo_data, use_stored_positions), content_type="image/png")
+        else:
+            image_base_url = None
+            xml_images = request.query_params.get(
+                "xml_images", settings.PLUGINS_CONFIG["netbox_topology_views"]["xml_export_images"]
+            )
+            if xml_images == "link":
+                image_base_url = f"{request.scheme}://{request.get_host()}"
+            response = StreamingHttpResponse(
+                iter_svg_export(topo_data, image_base_url, use_stored_positions),
+                content_type="image/svg+xml; charset=utf-8",
+            )
+        response["Content-Disposition"] = f'attachment; filename="topology.{image_format}"'
+        return response
+
+
+class TopologyViewSet(CompressedResponseMixin, PermissionRequiredMixin, ViewSet):
+    """
+    Deliver the topology as JSON for the same filter parameters as the topology view
+    """
+    permission_required = ("dcim.view_site", "dcim.view_device")
+
+    queryset = Device.objects.none()
+    serializer_class = TopologyDummySerializer
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
 
         self.filterset = DeviceFilterSet
         self.queryset = Device.objects.all().select_related(
@@ -103,65 +423,108 @@ class ExportTopoToXML(PermissionRequiredMixin, ViewSet):
         )
         self.queryset = self.filterset(request.GET, self.queryset).qs
 
-        individualOptions, created = IndividualOptions.objects.get_or_create(
+        self.individualOptions, created = IndividualOptions.objects.get_or_create(
             user_id=request.user.id,
         )
+        self.topology_settings = get_topology_settings(request)
+        self.group_id = request.query_params.get("group", "default")
 
-        if request.GET:
+        self.cache_key = get_topology_cache_key(
+            request, self.individualOptions, self.group_id, self.topology_settings
+        )
+        self.build_key = get_topology_build_key(
+            request, self.individualOptions, self.group_id, self.topology_settings
+        )
+        self.etag = get_topology_etag(self.cache_key)
+        self.etag_headers = {"ETag": self.etag, "Cache-Control": "private, no-cache"}
+
+    def get_topology_data(self, request):
+        return get_cached_topology_data(
+            request,
+            queryset=self.queryset,
+            individualOptions=self.individualOptions,
+            group_id=self.group_id,
+            topology_settings=self.topology_settings,
+            cache_key=self.cache_key,
+            view="topology",
+        )
 
-            filter_id, save_coords, show_unconnected, show_power, show_circuit, show_logical_connections, show_single_cable_logical_conns, show_cables, show_wireless, group_sites, group_locations, group_racks,show_neighbors = get_query_settings(request)
-
-            # Read options from saved filters as NetBox does not handle custom plugin filters
-            if "filter_id" in request.GET and request.GET["filter_id"] != '':
-                try:
-                    saved_filter = SavedFilter.objects.get(pk=filter_id)
-                    saved_filter_params = getattr(saved_filter, 'parameters')
-
-                    if save_coords == False and 'save_coords' in saved_filter_params: save_coords = saved_filter_params['save_coords']
-                    if show_power == False and 'show_power' in saved_filter_params: show_power = saved_filter_params['show_power']
-                    if show_circuit == False and 'show_circuit' in saved_filter_params: show_circuit = saved_filter_params['show_circuit']
-                    if show_logical_connections == False and 'show_logical_connections' in saved_filter_params: show_logical_connections = saved_filter_params['show_logical_connections']
-                    if show_single_cable_logical_conns == False and 'show_single_cable_logical_conns' in saved_filter_params: show_single_cable_logical_conns = saved_filter_params['show_single_cable_logical_conns']
-                    if show_cables == False and 'show_cables' in saved_filter_params: show_cables = saved_filter_params['show_cables']
-                    if show_wireless == False and 'show_wireless' in saved_filter_params: show_wireless = saved_filter_params['show_wireless']
-                    if group_sites == False and 'group_sites' in saved_filter_params: group_sites = saved_filter_params['group_sites']
-                    if group_locations == False and 'group_locations' in saved_filter_params: group_locations = saved_filter_params['group_locations']
-                    if group_racks == False and 'group_racks' in saved_filter_params: group_racks = saved_filter_params['group_racks']
-                    if show_neighbors == False and 'show_neighbors' in saved_filter_params: show_neighbors = saved_filter_params['show_neighbors']
-                except SavedFilter.DoesNotExist: # filter_id not found
-                    pass
-                except Exception as inst:
-                    print(type(inst))
-
-            if 'group' not in request.query_params:
-                group_id = "default"
-            else:
-                group_id = request.query_params["group"]
-            topo_data = get_topology_data(
-                queryset=self.queryset,
-                individualOptions=individualOptions,
-                save_coords=save_coords,
-                show_unconnected=show_unconnected,
-                show_cables=show_cables,
-                show_logical_connections=show_logical_connections,
-                show_single_cable_logical_conns=show_single_cable_logical_conns,
-                show_neighbors=show_neighbors,
-                show_circuit=show_circuit,
-                show_power=show_power,
-                show_wireless=show_wireless,
-                group_sites=group_sites,
-                group_locations=group_locations,
-                group_racks=group_racks,
-                group_id=group_id,
+    def list(self, request):
+        if etag_matches(self.etag, request.headers.get("If-None-Match")):
+            return Response(status=304, headers=self.etag_headers)
+
+        return Response(self.get_topology_data(request), headers=self.etag_headers)
+
+    @action(detail=False, methods=["get", "post"])
+    def build(self, request):
+        """
+        Build the topology for the filter parameters in a NetBox background job
+        (POST) and report the state of the build (GET). Once it has completed, the
+        topology view loads the result of the job with ?build=<job_id>, the topology
+        and export endpoints deliver it as long as the data is unchanged.
+        """
+        if cache.has_key(self.cache_key):
+            return Response({"status": "completed", "etag": self.etag})
+
+        job = get_topology_build(self.build_key)
+        if request.method == "POST" and (job is None or job.status not in ACTIVE_JOB_STATES):
+            job = enqueue_topology_build(
+                request, self.individualOptions, self.group_id, self.topology_settings, self.cache_key, self.build_key
             )
-            xml_data = export_data_to_xml(topo_data).decode('utf-8')
+            if job is None:
+                # Another request is queueing the same build right now
+                return Response({"status": "pending"}, status=202)
+        if job is None:
+            return Response({"status": "not found"}, status=404)
+
+        if job.status == JobStatusChoices.STATUS_COMPLETED:
+            # The result is kept per job, even if the data has changed in the meantime
+            if not cache.has_key(get_build_result_key(job.pk)):
+                return Response({"status": "not found", "job_id": job.pk}, status=404)
+            return Response({"status": "completed", "job_id": job.pk, "etag": (job.data or {}).get("etag")})
+
+        return Response(
+            {
+                "status": job.status,
+                "job_id": job.pk,
+                "etag": self.etag,
+                "error": (job.data or {}).get("error"),
+            },
+            status=202 if job.status in ACTIVE_JOB_STATES else 200,
+        )
 
-            return HttpResponse(xml_data, content_type="application/xml; charset=utf-8")
-        else:
-            return JsonResponse(
-                {"status": "Missing or malformed request parameters"}, status=400
+    @action(detail=False, methods=["get"])
+    def delta(self, request):
+        """
+        Return only the nodes and edges that have been added, changed or removed since
+        the topology with the ETag given in "since" (or If-None-Match) has been delivered.
+        The full topology is returned if that topology is no longer known.
+        """
+        since = request.query_params.get("since") or request.headers.get("If-None-Match")
+        if since and etag_matches(self.etag, since):
+            return Response(status=304, headers=self.etag_headers)
+
+        topo_data = self.get_topology_data(request)
+
+        previous = CACHE_MISS
+        if since:
+            previous = cache.get(get_cache_key_for_etag(since), CACHE_MISS)
+        if previous is CACHE_MISS:
+            return Response(
+                {"full": True, "etag": self.etag, "topology": topo_data},
+                headers=self.etag_headers,
             )
 
+        return Response(
+            {
+                "full": False,
+                "since": since,
+                "etag": self.etag,
+                **get_topology_delta(previous, topo_data),
+            },
+            headers=self.etag_headers,
+        )
+
 class SaveRoleImageViewSet(PermissionRequiredMixin, ReadOnlyModelViewSet):
     queryset = DeviceRole.objects.none()
     serializer_class = RoleImageSerializer
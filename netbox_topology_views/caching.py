@@ -0,0 +1,156 @@
+import hashlib
+import json
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from users.models import ObjectPermission
+
+CACHE_KEY_PREFIX = "netbox_topology_views"
+DATA_VERSION_KEY = f"{CACHE_KEY_PREFIX}:data_version"
+
+# Request parameters that neither change the device filter nor the topology options
+IGNORED_FILTER_PARAMS = ("draw_init", "per_page", "page", "export", "since", "xml_images", "graph_format", "image_format", "layout", "build")
+
+# Marks a cache miss, as None is a valid (empty) topology
+CACHE_MISS = object()
+
+
+def get_data_version() -> str:
+    """
+    returns the current version of the topology data
+
+    The version changes whenever one of the models a topology is built from is
+    saved or deleted. Cache entries are keyed by this version, so invalidating
+    all of them is a single cache write.
+    """
+    version = cache.get(DATA_VERSION_KEY)
+    if version is None:
+        cache.add(DATA_VERSION_KEY, uuid4().hex, None)
+        version = cache.get(DATA_VERSION_KEY)
+    return version
+
+
+def invalidate_topology_cache():
+    cache.set(DATA_VERSION_KEY, uuid4().hex, None)
+
+
+def get_cache_timeout() -> int:
+    return settings.PLUGINS_CONFIG["netbox_topology_views"]["cache_timeout"]
+
+
+def get_permission_fingerprint(user) -> str:
+    """
+    returns a hash of everything that restricts the objects a user may view
+
+    get_all_permissions() only returns the permission names, the object
+    permissions the user is assigned to are added with their pk. Constraints
+    may refer to the user ($user), so users with constrained permissions do not
+    share cached topologies. Changes to object permissions bump the data version.
+    """
+    permissions = []
+    object_permissions = set()
+    user_id = None
+    if user.is_authenticated:
+        permissions = sorted(user.get_all_permissions())
+        for pk, constraints in ObjectPermission.objects.filter(
+            Q(users=user) | Q(groups__user=user), enabled=True
+        ).values_list("pk", "constraints"):
+            object_permissions.add(pk)
+            if constraints:
+                user_id = user.pk
+    return hashlib.sha256(
+        json.dumps([user.is_superuser, permissions, sorted(object_permissions), user_id]).encode("utf-8")
+    ).hexdigest()
+
+
+def get_normalized_filter(query_params) -> dict:
+    return {
+        key: sorted(values)
+        for key, values in sorted(query_params.lists())
+        if key not in IGNORED_FILTER_PARAMS
+    }
+
+
+def get_digest(key_data: dict) -> str:
+    return hashlib.sha256(
+        json.dumps(key_data, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def get_topology_key_data(request, individualOptions, group_id, topology_settings: dict) -> dict:
+    return {
+        "filter": get_normalized_filter(request.GET),
+        "options": topology_settings,
+        "group": str(group_id),
+        "ignore_cable_type": individualOptions.ignore_cable_type,
+        "permissions": get_permission_fingerprint(request.user),
+    }
+
+
+def get_topology_cache_key(request, individualOptions, group_id, topology_settings: dict):
+    """
+    returns the cache key for a topology built for this request
+
+    The key covers the normalized filter, the resolved topology options, the
+    coordinate group, the user's ignored cable types, a fingerprint of the user's
+    permissions and the current data version.
+    """
+    key_data = get_topology_key_data(request, individualOptions, group_id, topology_settings)
+    key_data["version"] = get_data_version()
+    return f"{CACHE_KEY_PREFIX}:topology:{get_digest(key_data)}"
+
+
+def get_topology_build_key(request, individualOptions, group_id, topology_settings: dict):
+    """
+    returns the key of background builds for this request, like the cache key
+    but without the data version
+
+    Changes during a long build do not lead to another build of the same
+    topology, see enqueue_topology_build.
+    """
+    key_data = get_topology_key_data(request, individualOptions, group_id, topology_settings)
+    return f"{CACHE_KEY_PREFIX}:build:{get_digest(key_data)}"
+
+
+def get_build_result_key(job_id) -> str:
+    # The result of a background build is stored per job, the page loads it by job id
+    return f"{CACHE_KEY_PREFIX}:build-result:{job_id}"
+
+
+def get_topology_etag(cache_key: str) -> str:
+    """
+    returns a strong ETag for the topology stored under cache_key
+
+    As the cache key changes with the data version, the ETag stays the same
+    exactly as long as the topology is unchanged.
+    """
+    return '"%s"' % cache_key.rsplit(":", 1)[-1]
+
+
+def get_etag_digest(etag: str) -> str:
+    """
+    returns the digest of an ETag as sent by a client, without the encoding
+    the response has been delivered in (see get_encoded_etag)
+    """
+    etag = etag.strip()
+    if etag.startswith("W/"):
+        etag = etag[2:]
+    return etag.strip(chr(34)).split("-", 1)[0]
+
+
+def get_cache_key_for_etag(etag: str) -> str:
+    """
+    returns the cache key of the topology that has been delivered with this ETag
+    """
+    return f"{CACHE_KEY_PREFIX}:topology:{get_etag_digest(etag)}"
+
+
+def etag_matches(etag: str, if_none_match: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    digest = get_etag_digest(etag)
+    return any(get_etag_digest(tag) == digest for tag in if_none_match.split(","))
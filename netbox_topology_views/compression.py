@@ -0,0 +1,174 @@
+import zlib
+from typing import Dict, Iterable, Iterator, Optional
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponseBase
+from django.template.response import SimpleTemplateResponse
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Responses smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 200
+
+# Content types which are compressed already
+COMPRESSED_CONTENT_TYPES = ("image/png", "image/jpeg", "image/gif", "image/webp")
+
+
+def get_available_encodings():
+    """
+    returns the supported content encodings, the preferred one first
+    """
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return encodings
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+def get_response_encoding(request: HttpRequest) -> Optional[str]:
+    """
+    returns the best content encoding the client accepts or None
+    """
+    accepted = parse_accept_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+    best, best_quality = None, 0.0
+    for encoding in get_available_encodings():
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def get_encoded_etag(etag: str, encoding: str) -> str:
+    """
+    returns the ETag of the representation in this encoding, e.g. "<digest>-br"
+
+    The encoding is negotiated from Accept-Encoding alone, so the same request
+    always gets the same bytes for the same tag, also when the body is too small
+    to be compressed. etag_matches ignores the suffix.
+    """
+    if not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+class Compressor:
+    """
+    incremental compressor with the same interface for all encodings
+    """
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "zstd":
+            self.compressor = zstandard.ZstdCompressor().compressobj()
+        elif encoding == "br":
+            self.compressor = brotli.Compressor()
+        else:
+            # wbits 31 writes the gzip header and trailer
+            self.compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self.compressor.process(data)
+        return self.compressor.compress(data)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self.compressor.finish()
+        return self.compressor.flush()
+
+
+def compress_stream(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    """
+    compresses a streamed body chunk by chunk, the compressor only keeps its
+    window in memory
+    """
+    compressor = Compressor(encoding)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def compress_response(request: HttpRequest, response: HttpResponseBase) -> HttpResponseBase:
+    """
+    compresses the response with the best encoding the client accepts
+
+    Streaming responses are compressed on the fly. Responses which are already
+    encoded, unsuccessful or small are returned unchanged.
+    """
+    if not settings.PLUGINS_CONFIG["netbox_topology_views"]["compress_responses"]:
+        return response
+    if isinstance(response, SimpleTemplateResponse) and not response.is_rendered:
+        # DRF and template responses are rendered after the view returns
+        response.add_post_render_callback(lambda rendered: compress_response(request, rendered))
+        return response
+
+    patch_vary_headers(response, ("Accept-Encoding",))
+    if response.has_header("Content-Encoding"):
+        return response
+    encoding = get_response_encoding(request)
+    if encoding is None:
+        return response
+
+    # The ETag names the encoding, 200 and 304 responses carry the same strong
+    # validator for the representation, see get_encoded_etag
+    etag = response.get("ETag")
+    if etag and response.status_code in (200, 304):
+        response["ETag"] = get_encoded_etag(etag, encoding)
+
+    if response.status_code != 200:
+        return response
+    if response.get("Content-Type", "").split(";")[0] in COMPRESSED_CONTENT_TYPES:
+        return response
+    if not response.streaming and len(response.content) < MIN_COMPRESS_SIZE:
+        return response
+
+    if response.streaming:
+        response.streaming_content = compress_stream(response.streaming_content, encoding)
+        del response["Content-Length"]
+    else:
+        compressor = Compressor(encoding)
+        response.content = compressor.compress(response.content) + compressor.finish()
+        response["Content-Length"] = str(len(response.content))
+
+    response["Content-Encoding"] = encoding
+    return response
+
+
+class CompressedResponseMixin:
+    """
+    compresses the responses of a DRF view, see compress_response
+    """
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        return compress_response(request, response)
@@ -0,0 +1,253 @@
+import csv
+import json
+from collections import defaultdict
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from circuits.models import Circuit
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+
+from netbox_topology_views.caching import invalidate_topology_cache
+from netbox_topology_views.models import NODE_PREFIXES, Coordinate, CoordinateGroup
+
+# Columns of exported and imported files, the name is only used if object_id is empty
+FIELDS = ("content_type", "object_id", "name", "x", "y")
+
+FILE_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/jsonl; charset=utf-8",
+}
+
+# Rows which are resolved and written with one query per object type
+BATCH_SIZE = 2000
+
+# Marks a name which belongs to more than one object
+AMBIGUOUS = object()
+
+
+def batched(iterable: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def get_name_field(model) -> str:
+    return "cid" if model is Circuit else "name"
+
+
+def get_content_types() -> Dict[str, ContentType]:
+    """
+    returns the content types of all objects which can be placed by their label,
+    e.g. "dcim.device"
+    """
+    content_types = ContentType.objects.get_for_models(*NODE_PREFIXES.values())
+    return {f"{ct.app_label}.{ct.model}": ct for ct in content_types.values()}
+
+
+def iter_coordinate_batches(group: CoordinateGroup) -> Iterator[List[Dict]]:
+    """
+    yields the coordinates of a group as rows of FIELDS in batches
+
+    Coordinates are read with a database cursor and the names of a batch are
+    fetched with one query per object type, so memory usage does not depend
+    on the size of the group.
+    """
+    labels = {ct.pk: label for label, ct in get_content_types().items()}
+    queryset = group.coordinate_set.filter(
+        content_type_id__in=labels.keys()
+    ).order_by("pk").values_list("content_type_id", "object_id", "x", "y")
+
+    for batch in batched(queryset.iterator(chunk_size=BATCH_SIZE), BATCH_SIZE):
+        object_ids = defaultdict(set)
+        for content_type_id, object_id, _, _ in batch:
+            object_ids[content_type_id].add(object_id)
+
+        names = {}
+        for content_type_id, ids in object_ids.items():
+            model = ContentType.objects.get_for_id(content_type_id).model_class()
+            names[content_type_id] = dict(
+                model.objects.filter(pk__in=ids).values_list("pk", get_name_field(model))
+            )
+
+        yield [
+            {
+                "content_type": labels[content_type_id],
+                "object_id": object_id,
+                "name": names[content_type_id].get(object_id) or "",
+                "x": x,
+                "y": y,
+            }
+            for content_type_id, object_id, x, y in batch
+        ]
+
+
+class Echo:
+    """
+    file-like object which returns what is written, used to stream csv rows
+    """
+    def write(self, value):
+        return value
+
+
+def export_csv(group: CoordinateGroup) -> Iterator[str]:
+    writer = csv.DictWriter(Echo(), fieldnames=FIELDS)
+    yield writer.writeheader()
+    for batch in iter_coordinate_batches(group):
+        yield "".join(writer.writerow(row) for row in batch)
+
+
+def export_jsonl(group: CoordinateGroup) -> Iterator[str]:
+    for batch in iter_coordinate_batches(group):
+        yield "".join(json.dumps(row) + "\n" for row in batch)
+
+
+EXPORTERS = {
+    "csv": export_csv,
+    "jsonl": export_jsonl,
+}
+
+
+def get_export_response(group: CoordinateGroup, file_format: str) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(
+        EXPORTERS[file_format](group), content_type=FILE_FORMATS[file_format]
+    )
+    response["Content-Disposition"] = f'attachment; filename="coordinates_{group.pk}.{file_format}"'
+    return response
+
+
+def decode_lines(file) -> Iterator[str]:
+    for line in file:
+        yield line.decode("utf-8-sig") if isinstance(line, bytes) else line
+
+
+def read_csv(file) -> Iterator[Tuple[int, Dict]]:
+    """
+    yields the line number and the row of every record of a csv file
+    """
+    reader = csv.DictReader(decode_lines(file))
+    try:
+        for row in reader:
+            yield reader.line_num, row
+    except csv.Error as e:
+        raise ValueError(f"Line {reader.line_num}: {e}")
+
+
+def read_jsonl(file) -> Iterator[Tuple[int, Dict]]:
+    """
+    yields the line number and the object of every non-empty line of a JSON lines file
+    """
+    for line_number, line in enumerate(decode_lines(file), start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Line {line_number}: {e}")
+        if not isinstance(row, dict):
+            raise ValueError(f"Line {line_number}: expected an object")
+        yield line_number, row
+
+
+READERS = {
+    "csv": read_csv,
+    "jsonl": read_jsonl,
+}
+
+
+def resolve_batch(
+    group: CoordinateGroup, batch: List[Tuple[int, Dict]], content_types: Dict[str, ContentType]
+) -> List[Coordinate]:
+    """
+    returns the coordinates of a batch of rows
+
+    Objects are looked up by object_id or, if it is empty, by name with one query
+    per object type. Raises a ValueError for the first invalid row.
+    """
+    rows = []
+    ids = defaultdict(set)
+    names = defaultdict(set)
+    for line_number, row in batch:
+        label = str(row.get("content_type") or "").strip().lower()
+        if label not in content_types:
+            raise ValueError(f"Line {line_number}: invalid content type '{label}'")
+        content_type = content_types[label]
+
+        try:
+            x, y = int(row["x"]), int(row["y"])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"Line {line_number}: x and y must be integers")
+
+        object_id = str(row.get("object_id") or "").strip()
+        name = str(row.get("name") or "").strip()
+        if object_id:
+            if not object_id.isdigit():
+                raise ValueError(f"Line {line_number}: invalid object_id '{object_id}'")
+            reference = int(object_id)
+            ids[content_type].add(reference)
+        elif name:
+            reference = name
+            names[content_type].add(name)
+        else:
+            raise ValueError(f"Line {line_number}: object_id or name is required")
+        rows.append((line_number, content_type, reference, x, y))
+
+    # ids are ints and names are strings, so both can share one dict
+    found = {}
+    for content_type in ids.keys() | names.keys():
+        model = content_type.model_class()
+        name_field = get_name_field(model)
+        queryset = model.objects.filter(
+            Q(pk__in=ids[content_type]) | Q(**{f"{name_field}__in": names[content_type]})
+        )
+        for pk, name in queryset.values_list("pk", name_field):
+            if pk in ids[content_type]:
+                found[(content_type, pk)] = pk
+            if name in names[content_type]:
+                found[(content_type, name)] = pk if (content_type, name) not in found else AMBIGUOUS
+
+    # A later row of the same object wins, an upsert must not touch a row twice
+    coordinates = {}
+    for line_number, content_type, reference, x, y in rows:
+        object_id = found.get((content_type, reference))
+        if object_id is None:
+            raise ValueError(f"Line {line_number}: {content_type.name} '{reference}' not found")
+        if object_id is AMBIGUOUS:
+            raise ValueError(
+                f"Line {line_number}: more than one {content_type.name} is named '{reference}', use object_id"
+            )
+        coordinates[(content_type.pk, object_id)] = Coordinate(
+            group=group, content_type=content_type, object_id=object_id, x=x, y=y
+        )
+    return list(coordinates.values())
+
+
+def import_coordinates(group: CoordinateGroup, file, file_format: str) -> int:
+    """
+    creates or updates the coordinates of a group from a csv or JSON lines file
+
+    The file is parsed incrementally and written in batches inside one
+    transaction, an invalid row rolls back the whole import. Returns the number
+    of imported coordinates.
+    """
+    content_types = get_content_types()
+    count = 0
+    with transaction.atomic():
+        for batch in batched(READERS[file_format](file), BATCH_SIZE):
+            coordinates = resolve_batch(group, batch, content_types)
+            Coordinate.objects.bulk_create(
+                coordinates,
+                update_conflicts=True,
+                unique_fields=["group", "content_type", "object_id"],
+                update_fields=["x", "y", "last_updated"],
+            )
+            count += len(coordinates)
+
+        # bulk_create does not send the signals which invalidate cached topologies
+        transaction.on_commit(invalidate_topology_cache)
+    return count
@@ -0,0 +1,262 @@
+import io
+import json
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+from xml.sax.saxutils import XMLGenerator
+
+from netbox_topology_views.utils import LinePattern
+
+# Size of the chunks yielded by the exporters
+CHUNK_SIZE = 64 * 1024
+
+# Node attributes which are exported next to the id, label and position
+NODE_ATTRIBUTES = ("type", "href", "site", "site_id", "location", "location_id", "rack", "rack_id")
+
+# Edge attributes which are exported next to the id, source and target
+EDGE_ATTRIBUTES = ("type", "color", "href")
+
+# Node types by the prefix of the node id, see NODE_PREFIXES
+NODE_TYPES = {
+    "c": "circuit",
+    "p": "powerpanel",
+    "f": "powerfeed",
+}
+
+
+def get_node_type(node: Dict) -> str:
+    node_id = str(node["id"])
+    return "device" if node_id.isdigit() else NODE_TYPES.get(node_id[:1], "device")
+
+
+def get_edge_type(edge: Dict) -> str:
+    dashes = edge.get("dashes")
+    if dashes is True:
+        return "circuit"
+    if dashes == LinePattern().wireless:
+        return "wireless"
+    if dashes == LinePattern().power:
+        return "power"
+    if dashes == LinePattern().logical:
+        return "logical"
+    return "cable"
+
+
+def get_position(node: Dict) -> Optional[Tuple[int, int]]:
+    # Only stored positions are exported, other nodes are placed by the physics engine
+    if node.get("physics") is False:
+        return node["x"], node["y"]
+    return None
+
+
+def get_node_attributes(node: Dict) -> Dict:
+    attributes = {"type": get_node_type(node), **node}
+    return {
+        name: attributes[name] for name in NODE_ATTRIBUTES if attributes.get(name) is not None
+    }
+
+
+def get_edge_attributes(edge: Dict) -> Dict:
+    attributes = {"type": get_edge_type(edge), **edge}
+    return {
+        name: attributes[name] for name in EDGE_ATTRIBUTES if attributes.get(name) is not None
+    }
+
+
+def iter_chunks(parts: Iterable[str]) -> Iterator[bytes]:
+    """
+    joins the parts of a document to utf-8 encoded chunks of about CHUNK_SIZE
+    """
+    buffer = []
+    size = 0
+    for part in parts:
+        buffer.append(part)
+        size += len(part)
+        if size >= CHUNK_SIZE:
+            yield "".join(buffer).encode("utf-8")
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+class XMLWriter:
+    """
+    XMLGenerator on a string buffer, pop() returns what has been written since the
+    last call
+    """
+    def __init__(self):
+        self.buffer = io.StringIO()
+        self.generator = XMLGenerator(self.buffer, encoding="utf-8", short_empty_elements=True)
+
+    def pop(self) -> str:
+        value = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return value
+
+    def start(self, name: str, attributes: Optional[Dict] = None):
+        self.generator.startElement(name, {key: str(value) for key, value in (attributes or {}).items()})
+
+    def end(self, name: str):
+        self.generator.endElement(name)
+
+    def element(self, name: str, attributes: Optional[Dict] = None, text: Optional[str] = None):
+        self.start(name, attributes)
+        if text is not None:
+            self.generator.characters(text)
+        self.end(name)
+
+
+def iter_graphml(data: Dict) -> Iterator[str]:
+    writer = XMLWriter()
+    writer.generator.startDocument()
+    writer.start("graphml", {"xmlns": "http://graphml.graphdrawing.org/xmlns"})
+    for name in ("label", "x", "y", *NODE_ATTRIBUTES):
+        attribute_type = "int" if name in ("x", "y") or name.endswith("_id") else "string"
+        writer.element(
+            "key", {"id": f"n_{name}", "for": "node", "attr.name": name, "attr.type": attribute_type}
+        )
+    for name in EDGE_ATTRIBUTES:
+        writer.element("key", {"id": f"e_{name}", "for": "edge", "attr.name": name, "attr.type": "string"})
+    writer.start("graph", {"id": "topology", "edgedefault": "undirected"})
+    yield writer.pop()
+
+    for node in data["nodes"]:
+        writer.start("node", {"id": node["id"]})
+        writer.element("data", {"key": "n_label"}, str(node["label"]))
+        position = get_position(node)
+        if position is not None:
+            writer.element("data", {"key": "n_x"}, str(position[0]))
+            writer.element("data", {"key": "n_y"}, str(position[1]))
+        for name, value in get_node_attributes(node).items():
+            writer.element("data", {"key": f"n_{name}"}, str(value))
+        writer.end("node")
+        yield writer.pop()
+
+    for edge in data["edges"]:
+        writer.start("edge", {"id": edge["id"], "source": edge["from"], "target": edge["to"]})
+        for name, value in get_edge_attributes(edge).items():
+            writer.element("data", {"key": f"e_{name}"}, str(value))
+        writer.end("edge")
+        yield writer.pop()
+
+    writer.end("graph")
+    writer.end("graphml")
+    writer.generator.endDocument()
+    yield writer.pop()
+
+
+def iter_gexf(data: Dict) -> Iterator[str]:
+    writer = XMLWriter()
+    writer.generator.startDocument()
+    writer.start("gexf", {
+        "xmlns": "http://gexf.net/1.3",
+        "xmlns:viz": "http://gexf.net/1.3/viz",
+        "version": "1.3",
+    })
+    writer.start("graph", {"defaultedgetype": "undirected", "mode": "static"})
+    for attribute_class, names in (("node", NODE_ATTRIBUTES), ("edge", EDGE_ATTRIBUTES)):
+        writer.start("attributes", {"class": attribute_class})
+        for name in names:
+            attribute_type = "integer" if name.endswith("_id") else "string"
+            writer.element("attribute", {"id": name, "title": name, "type": attribute_type})
+        writer.end("attributes")
+    writer.start("nodes")
+    yield writer.pop()
+
+    for node in data["nodes"]:
+        writer.start("node", {"id": node["id"], "label": node["label"]})
+        writer.start("attvalues")
+        for name, value in get_node_attributes(node).items():
+            writer.element("attvalue", {"for": name, "value": value})
+        writer.end("attvalues")
+        position = get_position(node)
+        if position is not None:
+            # GEXF y axis points up, the topology y axis points down
+            writer.element("viz:position", {"x": position[0], "y": -position[1], "z": 0})
+        writer.end("node")
+        yield writer.pop()
+
+    writer.end("nodes")
+    writer.start("edges")
+    for edge in data["edges"]:
+        writer.start("edge", {"id": edge["id"], "source": edge["from"], "target": edge["to"]})
+        writer.start("attvalues")
+        for name, value in get_edge_attributes(edge).items():
+            writer.element("attvalue", {"for": name, "value": value})
+        writer.end("attvalues")
+        writer.end("edge")
+        yield writer.pop()
+
+    writer.end("edges")
+    writer.end("graph")
+    writer.end("gexf")
+    writer.generator.endDocument()
+    yield writer.pop()
+
+
+def dot_quote(value) -> str:
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+
+
+def dot_attributes(attributes: Dict) -> str:
+    return ", ".join(f"{name}={dot_quote(value)}" for name, value in attributes.items())
+
+
+def iter_dot(data: Dict) -> Iterator[str]:
+    yield "graph topology {\n"
+    for node in data["nodes"]:
+        attributes = {"label": node["label"], **get_node_attributes(node)}
+        position = get_position(node)
+        if position is not None:
+            # Graphviz y axis points up, "!" pins the position for neato and fdp
+            attributes["pos"] = f"{position[0]},{-position[1]}!"
+        yield f"  {dot_quote(node['id'])} [{dot_attributes(attributes)}];\n"
+
+    for edge in data["edges"]:
+        attributes = {"id": edge["id"], **get_edge_attributes(edge)}
+        yield f"  {dot_quote(edge['from'])} -- {dot_quote(edge['to'])} [{dot_attributes(attributes)}];\n"
+    yield "}\n"
+
+
+def iter_jgf(data: Dict) -> Iterator[str]:
+    """
+    JSON Graph Format version 2, written node by node
+    """
+    yield '{"graph": {"id": "topology", "directed": false, "nodes": {'
+    for index, node in enumerate(data["nodes"]):
+        metadata = get_node_attributes(node)
+        position = get_position(node)
+        if position is not None:
+            metadata["x"], metadata["y"] = position
+        separator = ", " if index else ""
+        yield f'{separator}{json.dumps(str(node["id"]))}: {json.dumps({"label": str(node["label"]), "metadata": metadata})}'
+
+    yield '}, "edges": ['
+    for index, edge in enumerate(data["edges"]):
+        separator = ", " if index else ""
+        yield separator + json.dumps({
+            "id": edge["id"],
+            "source": str(edge["from"]),
+            "target": str(edge["to"]),
+            "metadata": get_edge_attributes(edge),
+        })
+    yield "]}}\n"
+
+
+# Exporters by format with their content type and file extension
+EXPORTERS = {
+    "graphml": (iter_graphml, "application/graphml+xml", "graphml"),
+    "gexf": (iter_gexf, "application/gexf+xml", "gexf"),
+    "dot": (iter_dot, "text/vnd.graphviz", "gv"),
+    "jgf": (iter_jgf, "application/vnd.jgf+json", "json"),
+}
+
+
+def iter_graph_export(data: Optional[Dict], graph_format: str) -> Iterator[bytes]:
+    """
+    yields the topology in the given format (see EXPORTERS) in chunks
+    """
+    if data is None:
+        data = {"nodes": [], "edges": []}
+    exporter = EXPORTERS[graph_format][0]
+    return iter_chunks(exporter(data))
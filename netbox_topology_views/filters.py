@@ -2,13 +2,14 @@ import django_filters
 from circuits.models import Circuit
 from dcim.choices import DeviceStatusChoices
 from dcim.models import Device, DeviceRole, Location, Rack, Region, Site, SiteGroup, Manufacturer, DeviceType, Platform, PowerPanel, PowerFeed
+from django.contrib.contenttypes.models import ContentType
 from django.db.models import Q
 from extras.filtersets import LocalConfigContextFilterSet
 from extras.models import ConfigTemplate
 from netbox.filtersets import NetBoxModelFilterSet
 from tenancy.filtersets import TenancyFilterSet, ContactModelFilterSet
-from utilities.filters import TreeNodeMultipleChoiceFilter, MultiValueCharFilter, MultiValueMACAddressFilter
-from netbox_topology_views.models import CoordinateGroup, Coordinate, CircuitCoordinate, PowerPanelCoordinate, PowerFeedCoordinate
+from utilities.filters import ContentTypeFilter, TreeNodeMultipleChoiceFilter, MultiValueCharFilter, MultiValueMACAddressFilter
+from netbox_topology_views.models import CoordinateGroup, Coordinate
 
 class DeviceFilterSet(NetBoxModelFilterSet, TenancyFilterSet, ContactModelFilterSet, LocalConfigContextFilterSet):
     q = django_filters.CharFilter(
@@ -165,90 +166,53 @@ class DeviceFilterSet(NetBoxModelFilterSet, TenancyFilterSet, ContactModelFilter
     def _virtual_chassis_member(self, queryset, name, value):
         return queryset.exclude(virtual_chassis__isnull=value)
 
-class CircuitCoordinatesFilterSet(NetBoxModelFilterSet):
+class CoordinatesFilterSet(NetBoxModelFilterSet):
     group = django_filters.ModelMultipleChoiceFilter(
         queryset = CoordinateGroup.objects.all(),
     )
 
+    content_type = ContentTypeFilter()
+
     device = django_filters.ModelMultipleChoiceFilter(
-        queryset = Circuit.objects.all(),
+        queryset = Device.objects.all(),
+        method = 'filter_assigned_object',
     )
 
-    class Meta:
-        model = CircuitCoordinate
-        fields = ['id', 'group', 'device', 'x', 'y']
-
-    def search(self, queryset, name, value):
-        """Perform the filtered search."""
-        if not value.strip():
-            return queryset
-        return queryset.filter(
-            Q(group__name__icontains=value) |
-            Q(device__name__icontains=value)
-        )
-
-class PowerPanelCoordinatesFilterSet(NetBoxModelFilterSet):
-    group = django_filters.ModelMultipleChoiceFilter(
-        queryset = CoordinateGroup.objects.all(),
+    circuit = django_filters.ModelMultipleChoiceFilter(
+        queryset = Circuit.objects.all(),
+        method = 'filter_assigned_object',
     )
 
-    device = django_filters.ModelMultipleChoiceFilter(
+    power_panel = django_filters.ModelMultipleChoiceFilter(
         queryset = PowerPanel.objects.all(),
+        method = 'filter_assigned_object',
     )
 
-    class Meta:
-        model = PowerPanelCoordinate
-        fields = ['id', 'group', 'device', 'x', 'y']
-
-    def search(self, queryset, name, value):
-        """Perform the filtered search."""
-        if not value.strip():
-            return queryset
-        return queryset.filter(
-            Q(group__name__icontains=value) |
-            Q(device__name__icontains=value)
-        )
-
-class PowerFeedCoordinatesFilterSet(NetBoxModelFilterSet):
-    group = django_filters.ModelMultipleChoiceFilter(
-        queryset = CoordinateGroup.objects.all(),
-    )
-
-    device = django_filters.ModelMultipleChoiceFilter(
+    power_feed = django_filters.ModelMultipleChoiceFilter(
         queryset = PowerFeed.objects.all(),
+        method = 'filter_assigned_object',
     )
 
     class Meta:
-        model = PowerFeedCoordinate
-        fields = ['id', 'group', 'device', 'x', 'y']
+        model = Coordinate
+        fields = ['id', 'group', 'content_type', 'object_id', 'x', 'y']
 
-    def search(self, queryset, name, value):
-        """Perform the filtered search."""
-        if not value.strip():
+    def filter_assigned_object(self, queryset, name, value):
+        if not value:
             return queryset
         return queryset.filter(
-            Q(group__name__icontains=value) |
-            Q(device__name__icontains=value)
+            content_type=ContentType.objects.get_for_model(self.filters[name].queryset.model),
+            object_id__in=[obj.pk for obj in value]
         )
 
-class CoordinatesFilterSet(NetBoxModelFilterSet):
-    group = django_filters.ModelMultipleChoiceFilter(
-        queryset = CoordinateGroup.objects.all(),
-    )
-
-    device = django_filters.ModelMultipleChoiceFilter(
-        queryset = Device.objects.all(),
-    )
-
-    class Meta:
-        model = Coordinate
-        fields = ['id', 'group', 'device', 'x', 'y']
-
     def search(self, queryset, name, value):
         """Perform the filtered search."""
         if not value.strip():
             return queryset
-        return queryset.filter(
-            Q(group__name__icontains=value) |
-            Q(device__name__icontains=value)
-        )
+        query = Q(group__name__icontains=value)
+        for model, name_field in ((Device, 'name'), (Circuit, 'cid'), (PowerPanel, 'name'), (PowerFeed, 'name')):
+            query |= Q(
+                content_type=ContentType.objects.get_for_model(model),
+                object_id__in=model.objects.filter(**{f'{name_field}__icontains': value}).values('pk')
+            )
+        return queryset.filter(query)
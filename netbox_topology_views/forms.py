@@ -1,6 +1,7 @@
 from cProfile import label
 from django import forms
 from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
 
 from django.utils.translation import gettext as _
 
@@ -17,11 +18,14 @@ from django.conf import settings
 from netbox.forms import NetBoxModelFilterSetForm, NetBoxModelForm, NetBoxModelImportForm
 from utilities.forms import BOOLEAN_WITH_BLANK_CHOICES, add_blank_choice
 from utilities.forms.fields import (
+    ContentTypeMultipleChoiceField,
+    CSVContentTypeField,
     TagFilterField,
+    DynamicModelChoiceField,
     DynamicModelMultipleChoiceField
 )
 
-from netbox_topology_views.models import IndividualOptions, CoordinateGroup, Coordinate, CircuitCoordinate, PowerPanelCoordinate, PowerFeedCoordinate
+from netbox_topology_views.models import COORDINATE_OBJECT_TYPES, IndividualOptions, CoordinateGroup, Coordinate
 
 class DeviceFilterForm(
     LocalConfigContextFilterForm,
@@ -35,8 +39,8 @@ class DeviceFilterForm(
         (None, ('q', 'filter_id', 'tag')),
         (_('Options'), (
             'group', 'save_coords', 'show_unconnected', 'show_cables', 'show_logical_connections',
-            'show_single_cable_logical_conns', 'show_neighbors', 'show_circuit', 'show_power', 'show_wireless', 
-            'group_sites', 'group_locations', 'group_racks'
+            'show_single_cable_logical_conns', 'show_neighbors', 'neighbor_depth', 'show_circuit', 'show_power',
+            'show_wireless', 'group_sites', 'group_locations', 'group_racks'
         )),
         (_('Device'), ('id',)),        
         (_('Location'), ('region_id', 'site_group_id', 'site_id', 'location_id', 'rack_id')),
@@ -250,6 +254,9 @@ class DeviceFilterForm(
     show_neighbors = forms.BooleanField(
         label =_('Show Neighbors'), required=False, initial=False
     )
+    neighbor_depth = forms.IntegerField(
+        label =_('Neighbor Hops'), required=False, initial=1, min_value=1
+    )
     show_circuit = forms.BooleanField(
         label=_('Show Circuit Terminations'), required=False, initial=False
     )
@@ -278,122 +285,155 @@ class CoordinateGroupsForm(NetBoxModelForm):
         model = CoordinateGroup
         fields = ('name', 'description')
 
-class CoordinateGroupsImportForm(NetBoxModelImportForm):
-    class Meta:
-        model = CoordinateGroup
-        fields = ('name', 'description')
-
-class CircuitCoordinatesForm(NetBoxModelForm):
-    fieldsets = (
-        ('CircuitCoordinate', ('group', 'device', 'x', 'y')),
+class CoordinateGroupCloneForm(forms.Form):
+    name = forms.CharField(
+        max_length=100
     )
-
-    class Meta:
-        model = CircuitCoordinate
-        fields = ('group', 'device', 'x', 'y')
-
-class PowerPanelCoordinatesForm(NetBoxModelForm):
-    fieldsets = (
-        ('PowerPanel', ('group', 'device', 'x', 'y')),
+    description = forms.CharField(
+        max_length=255,
+        required=False
+    )
+    site = DynamicModelMultipleChoiceField(
+        queryset=Site.objects.all(),
+        required=False,
+        help_text=_('Only copy the coordinates of devices in these sites')
+    )
+    role = DynamicModelMultipleChoiceField(
+        queryset=DeviceRole.objects.all(),
+        required=False,
+        help_text=_('Only copy the coordinates of devices with these roles')
     )
 
-    class Meta:
-        model = PowerPanelCoordinate
-        fields = ('group', 'device', 'x', 'y')
-
-class PowerFeedCoordinatesForm(NetBoxModelForm):
     fieldsets = (
-        ('PowerFeedCoordinate', ('group', 'device', 'x', 'y')),
+        ('Coordinate Group', ('name', 'description')),
+        ('Device Filter', ('site', 'role')),
+    )
+
+    def clean_name(self):
+        name = self.cleaned_data['name']
+        if CoordinateGroup.objects.filter(name=name).exists():
+            raise forms.ValidationError(_('A coordinate group with this name already exists.'))
+        return name
+
+    def get_devices(self):
+        """
+        returns the devices whose coordinates are copied or None to copy all of them
+        """
+        if not self.cleaned_data['site'] and not self.cleaned_data['role']:
+            return None
+        devices = Device.objects.all()
+        if self.cleaned_data['site']:
+            devices = devices.filter(site__in=self.cleaned_data['site'])
+        if self.cleaned_data['role']:
+            devices = devices.filter(role__in=self.cleaned_data['role'])
+        return devices
+
+class CoordinateGroupFileImportForm(forms.Form):
+    file = forms.FileField(
+        help_text=_('Columns: content_type, object_id, name, x, y. '
+            'Objects are looked up by name if object_id is empty.')
+    )
+    file_format = forms.ChoiceField(
+        choices=(
+            ('csv', 'CSV'),
+            ('jsonl', 'JSON Lines'),
+        )
     )
 
-    class Meta:
-        model = PowerFeedCoordinate
-        fields = ('group', 'device', 'x', 'y')
-
-class CoordinatesForm(NetBoxModelForm):
     fieldsets = (
-        ('Coordinate', ('group', 'device', 'x', 'y')),
+        ('Coordinates', ('file', 'file_format')),
     )
 
+class CoordinateGroupsImportForm(NetBoxModelImportForm):
     class Meta:
-        model = Coordinate
-        fields = ('group', 'device', 'x', 'y')
-
-class CircuitCoordinatesImportForm(NetBoxModelImportForm):
-    class Meta:
-        model = CircuitCoordinate
-        fields = ('group', 'device', 'x', 'y')
-
-class PowerPanelCoordinatesImportForm(NetBoxModelImportForm):
-    class Meta:
-        model = PowerPanelCoordinate
-        fields = ('group', 'device', 'x', 'y')
-
-class PowerFeedCoordinatesImportForm(NetBoxModelImportForm):
-    class Meta:
-        model = PowerFeedCoordinate
-        fields = ('group', 'device', 'x', 'y')
-
-class CoordinatesImportForm(NetBoxModelImportForm):
-    class Meta:
-        model = Coordinate
-        fields = ('group', 'device', 'x', 'y')
+        model = CoordinateGroup
+        fields = ('name', 'description')
 
-class CircuitCoordinatesFilterForm(NetBoxModelFilterSetForm):
-    model = CircuitCoordinate
-    fieldsets = (
-        (None, ('q', 'filter_id')),
-        ('CircuitCoordinates', ('group', 'device', 'x', 'y'))
-    )
+# Form field of every model which can be placed in a topology view
+ASSIGNED_OBJECT_FIELDS = {
+    Device: 'device',
+    Circuit: 'circuit',
+    PowerPanel: 'power_panel',
+    PowerFeed: 'power_feed',
+}
 
-    group = forms.ModelMultipleChoiceField(
-        queryset=CoordinateGroup.objects.all(),
+class CoordinatesForm(NetBoxModelForm):
+    device = DynamicModelChoiceField(
+        queryset=Device.objects.all(),
         required=False
     )
-
-    device = DynamicModelMultipleChoiceField(
+    circuit = DynamicModelChoiceField(
         queryset=Circuit.objects.all(),
         required=False
     )
-
-    x = forms.IntegerField(
+    power_panel = DynamicModelChoiceField(
+        queryset=PowerPanel.objects.all(),
         required=False
     )
-
-    y = forms.IntegerField(
+    power_feed = DynamicModelChoiceField(
+        queryset=PowerFeed.objects.all(),
         required=False
     )
 
-class PowerPanelCoordinatesFilterForm(NetBoxModelFilterSetForm):
-    model = PowerPanelCoordinate
     fieldsets = (
-        (None, ('q', 'filter_id')),
-        ('PowerPanelCoordinates', ('group', 'device', 'x', 'y'))
+        ('Coordinate', ('group', 'x', 'y')),
+        ('Object', ('device', 'circuit', 'power_panel', 'power_feed')),
     )
 
-    group = forms.ModelMultipleChoiceField(
-        queryset=CoordinateGroup.objects.all(),
-        required=False
-    )
-
-    device = DynamicModelMultipleChoiceField(
-        queryset=PowerPanel.objects.all(),
-        required=False
-    )
+    class Meta:
+        model = Coordinate
+        fields = ('group', 'x', 'y')
+
+    def __init__(self, *args, **kwargs):
+        instance = kwargs.get('instance')
+        initial = kwargs.get('initial', {}).copy()
+
+        if instance is not None and instance.assigned_object is not None:
+            initial[ASSIGNED_OBJECT_FIELDS[type(instance.assigned_object)]] = instance.assigned_object
+        kwargs['initial'] = initial
+
+        super().__init__(*args, **kwargs)
+
+    def clean(self):
+        super().clean()
+
+        selected_objects = [
+            self.cleaned_data[field] for field in ASSIGNED_OBJECT_FIELDS.values()
+            if self.cleaned_data.get(field)
+        ]
+        if len(selected_objects) != 1:
+            raise forms.ValidationError(
+                _('Select exactly one device, circuit, power panel or power feed.')
+            )
+        self.instance.assigned_object = selected_objects[0]
+
+        # The unique constraint is not validated by the model form as content type
+        # and object id are not form fields
+        group = self.cleaned_data.get('group')
+        if group is not None and Coordinate.objects.filter(
+            group=group,
+            content_type=self.instance.content_type,
+            object_id=self.instance.object_id,
+        ).exclude(pk=self.instance.pk).exists():
+            raise forms.ValidationError(
+                _('This object already has coordinates in this group.')
+            )
 
-    x = forms.IntegerField(
-        required=False
+class CoordinatesImportForm(NetBoxModelImportForm):
+    content_type = CSVContentTypeField(
+        queryset=ContentType.objects.filter(COORDINATE_OBJECT_TYPES),
+        help_text=_('Object type, e.g. dcim.device or circuits.circuit')
     )
 
-    y = forms.IntegerField(
-        required=False
-    )
+    class Meta:
+        model = Coordinate
+        fields = ('group', 'content_type', 'object_id', 'x', 'y')
 
-class PowerFeedCoordinatesFilterForm(NetBoxModelFilterSetForm):
+class CoordinatesFilterForm(NetBoxModelFilterSetForm):
     model = Coordinate
     fieldsets = (
         (None, ('q', 'filter_id')),
-        ('PowerFeedCoordinates', ('group', 'device', 'x', 'y'))
+        ('Coordinates', ('group', 'content_type', 'device', 'circuit', 'power_panel', 'power_feed', 'x', 'y'))
     )
 
     group = forms.ModelMultipleChoiceField(
@@ -401,33 +441,29 @@ class PowerFeedCoordinatesFilterForm(NetBoxModelFilterSetForm):
         required=False
     )
 
-    device = DynamicModelMultipleChoiceField(
-        queryset=PowerFeed.objects.all(),
-        required=False
+    content_type = ContentTypeMultipleChoiceField(
+        queryset=ContentType.objects.filter(COORDINATE_OBJECT_TYPES),
+        required=False,
+        label=_('Object Type')
     )
 
-    x = forms.IntegerField(
+    device = DynamicModelMultipleChoiceField(
+        queryset=Device.objects.all(),
         required=False
     )
 
-    y = forms.IntegerField(
+    circuit = DynamicModelMultipleChoiceField(
+        queryset=Circuit.objects.all(),
         required=False
     )
 
-class CoordinatesFilterForm(NetBoxModelFilterSetForm):
-    model = Coordinate
-    fieldsets = (
-        (None, ('q', 'filter_id')),
-        ('Coordinates', ('group', 'device', 'x', 'y'))
-    )
-
-    group = forms.ModelMultipleChoiceField(
-        queryset=CoordinateGroup.objects.all(),
+    power_panel = DynamicModelMultipleChoiceField(
+        queryset=PowerPanel.objects.all(),
         required=False
     )
 
-    device = DynamicModelMultipleChoiceField(
-        queryset=Device.objects.all(),
+    power_feed = DynamicModelMultipleChoiceField(
+        queryset=PowerFeed.objects.all(),
         required=False
     )
 
@@ -0,0 +1,252 @@
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from core.choices import JobStatusChoices
+from core.models import Job
+from dcim.models import Device, Site
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Exists, OuterRef, QuerySet
+from django.http import QueryDict
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+
+from netbox_topology_views.caching import (
+    get_build_result_key,
+    get_cache_timeout,
+    get_topology_etag,
+    invalidate_topology_cache,
+)
+from netbox_topology_views.filters import DeviceFilterSet
+from netbox_topology_views.metrics import observe_topology
+from netbox_topology_views.models import Coordinate, CoordinateGroup, IndividualOptions
+from netbox_topology_views.profiling import TopologyProfiler
+
+# Out of scope coordinates of a group are moved to the group with this suffix
+ARCHIVE_SUFFIX = " (archive)"
+
+# States of a job which has not finished yet
+ACTIVE_JOB_STATES = (
+    JobStatusChoices.STATUS_PENDING,
+    JobStatusChoices.STATUS_SCHEDULED,
+    JobStatusChoices.STATUS_RUNNING,
+)
+
+# Seconds a request may take to queue a topology build
+BUILD_LOCK_TIMEOUT = 30
+
+
+def get_archive_group(group: CoordinateGroup) -> CoordinateGroup:
+    archive_group, _ = CoordinateGroup.objects.get_or_create(
+        name=f"{group.name}{ARCHIVE_SUFFIX}"[:100],
+        defaults={"description": f"Out of scope coordinates of {group.name}"},
+    )
+    return archive_group
+
+
+def purge_stale_coordinates(
+    group: CoordinateGroup,
+    sites: Optional[QuerySet] = None,
+    archive: bool = False,
+    dry_run: bool = False,
+    batch_size: int = 1000,
+) -> Dict[str, int]:
+    """
+    deletes the orphaned and out of scope coordinates of a group in batches,
+    see CoordinateGroup.get_stale_coordinates
+
+    With archive, out of scope coordinates are moved to the archive group of the
+    group instead. Orphaned coordinates are always deleted as their object is gone.
+
+    returns the number of stale coordinates by reason
+    """
+    counts = {}
+    for reason, coordinates in group.get_stale_coordinates(sites).items():
+        counts[reason] = coordinates.count()
+        if dry_run or not counts[reason]:
+            continue
+
+        archive_group = get_archive_group(group) if archive and reason == "out of scope" else None
+        while True:
+            # Short transactions, the coordinates are not locked for the whole run
+            with transaction.atomic():
+                pks = list(coordinates.values_list("pk", flat=True)[:batch_size])
+                if not pks:
+                    break
+                batch = Coordinate.objects.filter(pk__in=pks)
+                if archive_group is None:
+                    batch.delete()
+                else:
+                    # Newer positions replace the archived ones
+                    archive_group.coordinate_set.filter(Exists(batch.filter(
+                        content_type=OuterRef("content_type"), object_id=OuterRef("object_id")
+                    ))).delete()
+                    batch.update(group=archive_group, last_updated=timezone.now())
+                    # update() does not send the signals which invalidate cached topologies
+                    transaction.on_commit(invalidate_topology_cache)
+
+    return counts
+
+
+def purge_stale_coordinates_job(job: Job, site_ids: Optional[List[int]] = None, archive: bool = False, **kwargs):
+    """
+    background job which purges the stale coordinates of the group the job is
+    assigned to, reschedules itself if an interval is set
+    """
+    job.start()
+    group = job.object
+    if group is None:
+        job.data = {"error": "coordinate group has been deleted"}
+        job.terminate(status=JobStatusChoices.STATUS_FAILED)
+        return
+
+    try:
+        sites = Site.objects.filter(pk__in=site_ids) if site_ids else None
+        job.data = purge_stale_coordinates(group, sites, archive=archive)
+        job.terminate()
+    except Exception as e:
+        job.data = {"error": str(e)}
+        job.terminate(status=JobStatusChoices.STATUS_ERRORED)
+
+    if job.interval:
+        Job.enqueue(
+            purge_stale_coordinates_job,
+            instance=group,
+            name=job.name,
+            user=job.user,
+            schedule_at=(job.scheduled or job.started) + timedelta(minutes=job.interval),
+            interval=job.interval,
+            site_ids=site_ids,
+            archive=archive,
+        )
+
+
+def get_build_result_timeout() -> int:
+    return max(get_cache_timeout(), settings.PLUGINS_CONFIG["netbox_topology_views"]["background_result_timeout"])
+
+
+def get_topology_build_name(build_key: str) -> str:
+    return f"Build topology {build_key.rsplit(':', 1)[-1][:12]}"
+
+
+def get_topology_build(build_key: str) -> Optional[Job]:
+    """
+    returns the latest background build of the topology with this build key
+    """
+    job_id = cache.get(build_key)
+    if job_id is None:
+        return None
+    return Job.objects.filter(pk=job_id).first()
+
+
+def get_completed_topology_build(job_id, build_key: str) -> Optional[Job]:
+    """
+    returns the job if it has completed a build for build_key, its result is
+    stored under get_build_result_key(job.pk) even if the data has changed since
+    """
+    if not str(job_id).isdigit():
+        return None
+    job = Job.objects.filter(pk=job_id, status=JobStatusChoices.STATUS_COMPLETED).first()
+    if job is None or (job.data or {}).get("build_key") != build_key:
+        return None
+    return job
+
+
+def enqueue_topology_build(
+    request, individualOptions: IndividualOptions, group_id, topology_settings: Dict, cache_key: str, build_key: str
+) -> Optional[Job]:
+    """
+    queues a background build of the topology for the filter of the request,
+    unless the same topology is being built already
+
+    Returns None if another request is queueing the same build at this moment.
+    The result is stored per job and under cache_key, where
+    get_cached_topology_data finds it as long as the data is unchanged.
+    """
+    job = get_topology_build(build_key)
+    if job is not None and job.status in ACTIVE_JOB_STATES:
+        return job
+
+    # Concurrent requests for the same topology queue a single build
+    lock_key = f"{build_key}:lock"
+    if not cache.add(lock_key, True, BUILD_LOCK_TIMEOUT):
+        return None
+    try:
+        job = get_topology_build(build_key)
+        if job is not None and job.status in ACTIVE_JOB_STATES:
+            return job
+
+        # Jobs belong to an object, a topology build to its coordinate group
+        group_pk = group_id
+        if group_id is None or group_id == "default":
+            group_pk = Coordinate.get_or_create_default_group(group_id)
+        group = get_object_or_404(CoordinateGroup, pk=group_pk)
+
+        job = Job.enqueue(
+            build_topology_job,
+            instance=group,
+            name=get_topology_build_name(build_key),
+            user=request.user,
+            query_string=request.GET.urlencode(),
+            individual_options_id=individualOptions.pk,
+            group_id=group_id,
+            topology_settings=topology_settings,
+            cache_key=cache_key,
+            build_key=build_key,
+        )
+        cache.set(build_key, job.pk, get_build_result_timeout())
+        return job
+    finally:
+        cache.delete(lock_key)
+
+
+def build_topology_job(
+    job: Job,
+    query_string: str,
+    individual_options_id: int,
+    group_id,
+    topology_settings: Dict,
+    cache_key: str,
+    build_key: str,
+    **kwargs,
+):
+    """
+    background job which builds a topology and stores it in the cache
+    """
+    # The views import the jobs, so they are imported when the job runs
+    from netbox_topology_views.views import TopologyContext, get_topology_data
+
+    job.start()
+    try:
+        queryset = DeviceFilterSet(
+            QueryDict(query_string), Device.objects.all().select_related("device_type", "role")
+        ).qs
+        profiler = TopologyProfiler()
+        with profiler:
+            topo_data = get_topology_data(
+                queryset=queryset,
+                individualOptions=IndividualOptions.objects.get(pk=individual_options_id),
+                group_id=group_id,
+                context=TopologyContext.create(group_id),
+                profiler=profiler,
+                **topology_settings,
+            )
+        profiler.log_if_slow(job=job.pk, query_string=query_string)
+        observe_topology("job", False, profiler.total_ms / 1000, topo_data)
+
+        result_timeout = get_build_result_timeout()
+        cache.set(get_build_result_key(job.pk), topo_data, result_timeout)
+        cache.set(cache_key, topo_data, result_timeout)
+        cache.set(build_key, job.pk, result_timeout)
+        job.data = {
+            "build_key": build_key,
+            "etag": get_topology_etag(cache_key),
+            "nodes": len(topo_data["nodes"]) if topo_data else 0,
+            "edges": len(topo_data["edges"]) if topo_data else 0,
+            "profile": profiler.as_dict(),
+        }
+        job.terminate()
+    except Exception as e:
+        job.data = {"build_key": build_key, "error": str(e)}
+        job.terminate(status=JobStatusChoices.STATUS_ERRORED)
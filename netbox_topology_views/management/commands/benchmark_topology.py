@@ -0,0 +1,275 @@
+import json
+from collections import deque
+import time
+import tracemalloc
+from io import StringIO
+from itertools import compress, groupby, product
+from statistics import median
+from typing import Callable, Dict, List, Optional
+
+from dcim.models import Device
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from netbox_topology_views.models import CoordinateGroup, IndividualOptions
+from netbox_topology_views.utils import encode_image, find_image_url, iter_data_to_xml
+from netbox_topology_views.views import NODE_DEVICE_RELATED, TopologyContext, create_node, get_topology_data
+
+# The options which are combined with each other, all other options are off
+BENCHMARK_OPTIONS = (
+    "show_cables",
+    "show_logical_connections",
+    "show_neighbors",
+    "show_circuit",
+    "show_power",
+    "show_wireless",
+)
+
+# Prefix of the objects generated for --devices, see generate_topology_data
+SWEEP_PREFIX = "topo-bench-sweep"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure wall time, query count and peak memory of get_topology_data, "
+        "create_node and the streamed draw.io export for each combination of topology options"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--site", action="append", default=[], help="Only use the devices of this site slug")
+        parser.add_argument(
+            "--devices",
+            type=int,
+            nargs="+",
+            metavar="COUNT",
+            help=(
+                "Generate topologies of these numbers of devices with generate_topology_data and benchmark "
+                "each of them instead of the existing devices, fails if the number of queries grows"
+            ),
+        )
+        parser.add_argument(
+            "--option",
+            action="append",
+            choices=BENCHMARK_OPTIONS,
+            help="Only combine these options (default: all)",
+        )
+        parser.add_argument(
+            "--group",
+            default="default",
+            help="Coordinate group id or 'default', --devices uses the group of the generated coordinates",
+        )
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement, the median is reported")
+        parser.add_argument("--output", help="Write the results as JSON to this file")
+        parser.add_argument("--baseline", help="Compare with the JSON results of a previous run")
+        parser.add_argument(
+            "--max-regression",
+            type=float,
+            default=20.0,
+            help="Fail if a measurement is this many percent slower than the baseline",
+        )
+
+    def handle(self, *args, **options):
+        if options["devices"]:
+            results = []
+            try:
+                for device_count in sorted(set(options["devices"])):
+                    self.generate_devices(device_count)
+                    queryset = Device.objects.filter(site__slug__startswith=f"{SWEEP_PREFIX}-")
+                    # The stored positions are part of the benchmark
+                    group_id = CoordinateGroup.objects.get(name=SWEEP_PREFIX).pk
+                    results += self.run_benchmarks(queryset, options, group_id, device_count)
+            finally:
+                call_command("generate_topology_data", prefix=SWEEP_PREFIX, delete=True, stdout=StringIO())
+        else:
+            queryset = Device.objects.all()
+            if options["site"]:
+                queryset = queryset.filter(site__slug__in=options["site"])
+            if not queryset.exists():
+                raise CommandError("No devices found, see the generate_topology_data command")
+            results = self.run_benchmarks(queryset, options, options["group"])
+
+        self.print_results(results)
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(results, f, indent=2)
+
+        if options["devices"]:
+            self.check_scaling(results)
+
+        if options["baseline"]:
+            with open(options["baseline"]) as f:
+                baseline = json.load(f)
+            self.compare(results, baseline, options["max_regression"])
+
+    def generate_devices(self, device_count: int):
+        """
+        generates a single site with device_count devices, circuits, power feeds
+        and wireless links grow with the number of devices
+        """
+        if device_count < 2:
+            raise CommandError("At least two devices are required")
+        call_command(
+            "generate_topology_data",
+            prefix=SWEEP_PREFIX,
+            sites=1,
+            racks_per_site=1,
+            devices_per_rack=device_count,
+            interfaces_per_device=4,
+            circuits_per_site=max(device_count // 10, 1),
+            power_feeds_per_site=max(device_count // 10, 1),
+            wireless_links_per_site=max(device_count // 20, 1),
+            coordinates=True,
+            stdout=StringIO(),
+        )
+
+    def run_benchmarks(self, queryset, options, group_id, device_count: Optional[int] = None) -> List[Dict]:
+        """
+        every run evaluates a fresh queryset, so no run reuses the objects loaded
+        by the previous one
+        """
+        individual_options = IndividualOptions(ignore_cable_type="")
+        option_names = options["option"] or BENCHMARK_OPTIONS
+        repeat = max(options["repeat"], 1)
+        results = []
+
+        def create_nodes():
+            # Loaded like get_topology_data loads the devices of the nodes
+            context = TopologyContext.create(group_id)
+            return [
+                create_node(device, False, group_id, context)
+                for device in queryset.select_related(*NODE_DEVICE_RELATED)
+            ]
+
+        results.append(self.measure("create_node", "", create_nodes, repeat))
+
+        for enabled in product((False, True), repeat=len(option_names)):
+            enabled_options = list(compress(option_names, enabled))
+            topology_settings = {
+                "save_coords": False,
+                "show_unconnected": False,
+                "show_single_cable_logical_conns": False,
+                "group_sites": False,
+                "group_locations": False,
+                "group_racks": False,
+                **dict.fromkeys(BENCHMARK_OPTIONS, False),
+                **dict.fromkeys(enabled_options, True),
+            }
+
+            def build_topology():
+                return get_topology_data(
+                    queryset=queryset.all(),
+                    individualOptions=individual_options,
+                    group_id=group_id,
+                    **topology_settings,
+                )
+
+            result = self.measure("get_topology_data", ",".join(enabled_options), build_topology, repeat)
+            topology = build_topology()
+            result["nodes"] = len(topology["nodes"]) if topology else 0
+            result["edges"] = len(topology["edges"]) if topology else 0
+            results.append(result)
+            results.append(
+                self.measure(
+                    "export_data_to_xml",
+                    ",".join(enabled_options),
+                    lambda: deque(iter_data_to_xml(topology), maxlen=0),
+                    repeat,
+                )
+            )
+
+        if device_count is not None:
+            for result in results:
+                result["devices"] = device_count
+        return results
+
+    def measure(self, benchmark: str, enabled_options: str, func: Callable, repeat: int) -> Dict:
+        """
+        every run starts cold, the process wide caches of the content types and
+        node images are cleared before it
+        """
+        timings = []
+        query_counts = []
+        for _ in range(repeat):
+            ContentType.objects.clear_cache()
+            find_image_url.cache_clear()
+            encode_image.cache_clear()
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                func()
+                timings.append(time.perf_counter() - start)
+            query_counts.append(len(queries))
+
+        # Measured in an extra run, tracing allocations slows down the timed runs
+        tracemalloc.start()
+        try:
+            func()
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            "benchmark": benchmark,
+            "options": enabled_options,
+            "seconds": median(timings),
+            "queries": max(query_counts),
+            "peak_memory_kb": peak_memory // 1024,
+        }
+
+    def print_results(self, results: List[Dict]):
+        self.stdout.write(
+            f"{'benchmark':<20} {'devices':>8} {'seconds':>9} {'queries':>8} {'peak KiB':>10} {'nodes':>7} "
+            f"{'edges':>7}  options"
+        )
+        for result in results:
+            self.stdout.write(
+                f"{result['benchmark']:<20} {result.get('devices', ''):>8} {result['seconds']:>9.4f} "
+                f"{result['queries']:>8} {result['peak_memory_kb']:>10} {result.get('nodes', ''):>7} "
+                f"{result.get('edges', ''):>7}  "
+                f"{result['options'] or '-'}"
+            )
+
+    def check_scaling(self, results: List[Dict]):
+        """
+        fails if the number of queries of a benchmark depends on the number of devices
+        """
+        def get_benchmark(result):
+            return result["benchmark"], result["options"]
+
+        growing = []
+        for (benchmark, enabled_options), sizes in groupby(sorted(results, key=get_benchmark), get_benchmark):
+            sizes = sorted(sizes, key=lambda result: result["devices"])
+            if len({result["queries"] for result in sizes}) > 1:
+                growing.append(
+                    f"{benchmark} [{enabled_options or '-'}]: "
+                    + ", ".join(f"{result['queries']} queries with {result['devices']} devices" for result in sizes)
+                )
+
+        if growing:
+            raise CommandError("The number of queries grows with the number of devices:\n" + "\n".join(growing))
+        self.stdout.write(self.style.SUCCESS("The number of queries is independent of the number of devices"))
+
+    def compare(self, results: List[Dict], baseline: List[Dict], max_regression: float):
+        def get_key(result):
+            return result["benchmark"], result["options"], result.get("devices")
+
+        baseline_results = {get_key(result): result for result in baseline}
+        regressions = []
+        for result in results:
+            previous = baseline_results.get(get_key(result))
+            if previous is None:
+                continue
+            name = f"{result['benchmark']} [{result['options'] or '-'}]"
+            if "devices" in result:
+                name += f" with {result['devices']} devices"
+            if result["seconds"] > previous["seconds"] * (1 + max_regression / 100):
+                regressions.append(f"{name}: {previous['seconds']:.4f}s -> {result['seconds']:.4f}s")
+            if result["queries"] > previous["queries"]:
+                regressions.append(f"{name}: {previous['queries']} -> {result['queries']} queries")
+
+        if regressions:
+            raise CommandError("Performance regressions:\n" + "\n".join(regressions))
+        self.stdout.write(self.style.SUCCESS("No regressions compared with the baseline"))
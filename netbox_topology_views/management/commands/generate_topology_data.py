@@ -0,0 +1,208 @@
+from typing import Dict, List
+
+from circuits.models import Circuit, CircuitTermination, CircuitType, Provider, ProviderNetwork
+from dcim.models import (
+    Cable,
+    Device,
+    DeviceRole,
+    DeviceType,
+    Interface,
+    Manufacturer,
+    PowerFeed,
+    PowerPanel,
+    PowerPort,
+    Rack,
+    Site,
+)
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from wireless.models import WirelessLink
+
+from netbox_topology_views.models import Coordinate, CoordinateGroup
+
+# Distance between two nodes of the generated coordinates
+GRID_SPACING = 150
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic sites, racks, devices, interfaces, cables, circuits, "
+        "power feeds, wireless links and coordinates to benchmark topology views"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--prefix", default="topo-bench", help="Name and slug prefix of all generated objects")
+        parser.add_argument("--sites", type=int, default=2)
+        parser.add_argument("--racks-per-site", type=int, default=4)
+        parser.add_argument("--devices-per-rack", type=int, default=10)
+        parser.add_argument("--interfaces-per-device", type=int, default=24)
+        parser.add_argument("--circuits-per-site", type=int, default=2)
+        parser.add_argument("--power-feeds-per-site", type=int, default=4)
+        parser.add_argument("--wireless-links-per-site", type=int, default=2)
+        parser.add_argument(
+            "--coordinates", action="store_true", help="Store coordinates for all generated nodes"
+        )
+        parser.add_argument(
+            "--delete", action="store_true", help="Delete the objects generated with this prefix and exit"
+        )
+
+    def handle(self, *args, **options):
+        prefix = options["prefix"]
+
+        with transaction.atomic():
+            self.delete_data(prefix)
+            if options["delete"]:
+                self.stdout.write(self.style.SUCCESS(f"Deleted synthetic data with prefix '{prefix}'"))
+                return
+
+            if options["interfaces_per_device"] < 2:
+                raise CommandError("At least two interfaces per device are required")
+
+            counts = self.generate_data(prefix, options)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Generated " + ", ".join(f"{count} {name}" for name, count in counts.items())
+            )
+        )
+
+    def delete_data(self, prefix: str):
+        sites = Site.objects.filter(slug__startswith=f"{prefix}-")
+        devices = Device.objects.filter(site__in=sites)
+
+        WirelessLink.objects.filter(_interface_a_device__in=devices).delete()
+        # Circuit and power feed cables end on a generated device as well
+        Cable.objects.filter(terminations___device__in=devices).distinct().delete()
+        devices.delete()
+        PowerFeed.objects.filter(power_panel__site__in=sites).delete()
+        PowerPanel.objects.filter(site__in=sites).delete()
+        Circuit.objects.filter(provider__slug=prefix).delete()
+        ProviderNetwork.objects.filter(provider__slug=prefix).delete()
+        Provider.objects.filter(slug=prefix).delete()
+        Rack.objects.filter(site__in=sites).delete()
+        sites.delete()
+        CoordinateGroup.objects.filter(name=prefix).delete()
+
+    def generate_data(self, prefix: str, options) -> Dict[str, int]:
+        manufacturer, _ = Manufacturer.objects.get_or_create(name=prefix, slug=prefix)
+        device_type, _ = DeviceType.objects.get_or_create(
+            manufacturer=manufacturer, model=prefix, slug=prefix, defaults={"u_height": 0}
+        )
+        role, _ = DeviceRole.objects.get_or_create(name=prefix, slug=prefix, defaults={"color": "2196f3"})
+        provider = Provider.objects.create(name=prefix, slug=prefix)
+        circuit_type, _ = CircuitType.objects.get_or_create(name=prefix, slug=prefix)
+        provider_network = ProviderNetwork.objects.create(provider=provider, name=prefix)
+
+        counts = dict.fromkeys(
+            ("sites", "racks", "devices", "interfaces", "cables", "circuits", "power feeds", "wireless links", "coordinates"),
+            0,
+        )
+        coordinates: List[Coordinate] = []
+        group = CoordinateGroup.objects.create(name=prefix) if options["coordinates"] else None
+
+        for site_index in range(options["sites"]):
+            site = Site.objects.create(name=f"{prefix}-{site_index}", slug=f"{prefix}-{site_index}")
+            racks = Rack.objects.bulk_create(
+                Rack(site=site, name=f"{prefix}-{site_index}-{rack_index}")
+                for rack_index in range(options["racks_per_site"])
+            )
+            devices = Device.objects.bulk_create(
+                Device(
+                    name=f"{rack.name}-{device_index}",
+                    device_type=device_type,
+                    role=role,
+                    site=site,
+                    rack=rack,
+                )
+                for rack in racks
+                for device_index in range(options["devices_per_rack"])
+            )
+            interfaces = Interface.objects.bulk_create(
+                Interface(device=device, name=f"eth{interface_index}", type="1000base-t")
+                for device in devices
+                for interface_index in range(options["interfaces_per_device"])
+            )
+            counts["sites"] += 1
+            counts["racks"] += len(racks)
+            counts["devices"] += len(devices)
+            counts["interfaces"] += len(interfaces)
+
+            # Interfaces which are not cabled yet, in the order of the devices
+            free_interfaces: Dict[int, List[Interface]] = {device.pk: [] for device in devices}
+            for interface in interfaces:
+                free_interfaces[interface.device_id].append(interface)
+
+            # Connect the devices of a site in a ring, the remaining interfaces stay uncabled
+            for device, next_device in zip(devices, devices[1:] + devices[:1]):
+                if device == next_device or not free_interfaces[device.pk] or not free_interfaces[next_device.pk]:
+                    continue
+                Cable(
+                    a_terminations=[free_interfaces[device.pk].pop(0)],
+                    b_terminations=[free_interfaces[next_device.pk].pop(0)],
+                ).save()
+                counts["cables"] += 1
+
+            for circuit_index in range(options["circuits_per_site"]):
+                device = devices[circuit_index % len(devices)] if devices else None
+                circuit = Circuit.objects.create(
+                    cid=f"{site.name}-{circuit_index}", provider=provider, type=circuit_type
+                )
+                termination = CircuitTermination.objects.create(circuit=circuit, term_side="A", site=site)
+                CircuitTermination.objects.create(
+                    circuit=circuit, term_side="Z", provider_network=provider_network
+                )
+                if device is not None and free_interfaces[device.pk]:
+                    Cable(
+                        a_terminations=[free_interfaces[device.pk].pop(0)],
+                        b_terminations=[termination],
+                    ).save()
+                    counts["cables"] += 1
+                counts["circuits"] += 1
+                if group is not None:
+                    coordinates.append(
+                        Coordinate(group=group, assigned_object=circuit, x=circuit_index * GRID_SPACING, y=-GRID_SPACING)
+                    )
+
+            if options["power_feeds_per_site"]:
+                power_panel = PowerPanel.objects.create(site=site, name=f"{site.name}-panel")
+                if group is not None:
+                    coordinates.append(
+                        Coordinate(group=group, assigned_object=power_panel, x=0, y=-2 * GRID_SPACING)
+                    )
+                for feed_index in range(options["power_feeds_per_site"]):
+                    power_feed = PowerFeed.objects.create(power_panel=power_panel, name=f"{site.name}-feed-{feed_index}")
+                    if devices:
+                        power_port = PowerPort.objects.create(
+                            device=devices[feed_index % len(devices)], name=f"psu{feed_index}"
+                        )
+                        Cable(a_terminations=[power_feed], b_terminations=[power_port]).save()
+                        counts["cables"] += 1
+                    counts["power feeds"] += 1
+                    if group is not None:
+                        coordinates.append(
+                            Coordinate(group=group, assigned_object=power_feed, x=feed_index * GRID_SPACING, y=-3 * GRID_SPACING)
+                        )
+
+            for link_index in range(min(options["wireless_links_per_site"], len(devices) // 2)):
+                interface_a, interface_b = Interface.objects.bulk_create(
+                    Interface(device=device, name=f"wlan{link_index}", type="ieee802.11ac")
+                    for device in (devices[2 * link_index], devices[2 * link_index + 1])
+                )
+                WirelessLink(interface_a=interface_a, interface_b=interface_b).save()
+                counts["interfaces"] += 2
+                counts["wireless links"] += 1
+
+            if group is not None:
+                # One row per rack, the sites are placed next to each other
+                devices_per_rack = options["devices_per_rack"]
+                for device_index, device in enumerate(devices):
+                    column = site_index * devices_per_rack + device_index % devices_per_rack
+                    row = device_index // devices_per_rack
+                    coordinates.append(
+                        Coordinate(group=group, assigned_object=device, x=column * GRID_SPACING, y=row * GRID_SPACING)
+                    )
+
+        Coordinate.objects.bulk_create(coordinates)
+        counts["coordinates"] = len(coordinates)
+
+        return counts
@@ -0,0 +1,119 @@
+from typing import Dict, Optional
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from netbox_topology_views.caching import invalidate_topology_cache
+from netbox_topology_views.coordinate_io import batched
+from netbox_topology_views.models import NODE_PREFIXES, Coordinate, CoordinateGroup
+
+
+class Command(BaseCommand):
+    help = (
+        'Copy the positions stored in the deprecated "coordinates" custom field ("x;y") '
+        "of devices, circuits, power panels and power feeds into a coordinate group"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--group", default="default", help="Name or id of the coordinate group")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--overwrite",
+            action="store_true",
+            help="Replace coordinates which already exist in the group (default: keep them)",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Only report what would be migrated"
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        self.verbosity = options["verbosity"]
+        batch_size = max(options["batch_size"], 1)
+
+        with transaction.atomic():
+            group = self.get_group(options["group"], create=not dry_run)
+            for model in NODE_PREFIXES.values():
+                counts = self.migrate_model(model, group, batch_size, options["overwrite"], dry_run)
+                self.stdout.write(
+                    f"{model._meta.verbose_name_plural}: "
+                    + ", ".join(f"{count} {name}" for name, count in counts.items())
+                )
+
+            if not dry_run:
+                # bulk_create does not send the signals which invalidate cached topologies
+                transaction.on_commit(invalidate_topology_cache)
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING("Dry run, nothing has been saved"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Migrated the custom field coordinates to group '{group}'"))
+
+    def get_group(self, name: str, create: bool) -> Optional[CoordinateGroup]:
+        group = CoordinateGroup.objects.filter(name=name).first()
+        if group is None and name.isdigit():
+            group = CoordinateGroup.objects.filter(pk=name).first()
+        if group is None and name == "default":
+            # The default group is created on demand, just like when saving coordinates
+            if not create:
+                return None
+            group = CoordinateGroup.objects.get(pk=Coordinate.get_or_create_default_group(name))
+        if group is None:
+            raise CommandError(f"Coordinate group '{name}' not found")
+        return group
+
+    def migrate_model(
+        self, model, group: Optional[CoordinateGroup], batch_size: int, overwrite: bool, dry_run: bool
+    ) -> Dict[str, int]:
+        content_type = ContentType.objects.get_for_model(model)
+        counts = dict.fromkeys(("migrated", "existing", "invalid"), 0)
+        queryset = model.objects.filter(
+            custom_field_data__coordinates__isnull=False
+        ).order_by("pk").values_list("pk", "custom_field_data__coordinates")
+
+        for batch in batched(queryset.iterator(chunk_size=batch_size), batch_size):
+            positions = {}
+            for object_id, value in batch:
+                if not value:
+                    continue
+                try:
+                    x, y = str(value).split(";")
+                    positions[object_id] = (int(x), int(y))
+                except ValueError:
+                    counts["invalid"] += 1
+                    if self.verbosity > 1:
+                        self.stdout.write(f"  {model._meta.verbose_name} {object_id}: invalid value '{value}'")
+
+            existing_ids = set()
+            if group is not None and not overwrite:
+                existing_ids = set(Coordinate.objects.filter(
+                    group=group, content_type=content_type, object_id__in=positions.keys()
+                ).values_list("object_id", flat=True))
+            counts["existing"] += len(existing_ids)
+            coordinates = [
+                Coordinate(group=group, content_type=content_type, object_id=object_id, x=x, y=y)
+                for object_id, (x, y) in positions.items()
+                if object_id not in existing_ids
+            ]
+
+            if dry_run:
+                counts["migrated"] += len(coordinates)
+            elif overwrite:
+                Coordinate.objects.bulk_create(
+                    coordinates,
+                    update_conflicts=True,
+                    unique_fields=["group", "content_type", "object_id"],
+                    update_fields=["x", "y", "last_updated"],
+                )
+                counts["migrated"] += len(coordinates)
+            else:
+                Coordinate.objects.bulk_create(coordinates, ignore_conflicts=True)
+                # Conflicting rows, e.g. of a concurrent run, are skipped and counted as existing
+                inserted = Coordinate.objects.filter(
+                    group=group, content_type=content_type, object_id__in=positions.keys()
+                ).count() - len(existing_ids)
+                counts["migrated"] += inserted
+                counts["existing"] += len(coordinates) - inserted
+
+        return counts
@@ -0,0 +1,93 @@
+from core.models import Job
+from dcim.models import Site
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from netbox_topology_views.jobs import ARCHIVE_SUFFIX, purge_stale_coordinates, purge_stale_coordinates_job
+from netbox_topology_views.models import CoordinateGroup
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete coordinates of objects which no longer exist and, if sites are given, "
+        "of objects outside of these sites"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--group",
+            action="append",
+            default=[],
+            help="Name or id of a coordinate group (default: all groups except archives)",
+        )
+        parser.add_argument(
+            "--site",
+            action="append",
+            default=[],
+            help="Slug of a site the groups are scoped to, coordinates of objects in other sites are out of scope",
+        )
+        parser.add_argument(
+            "--archive",
+            action="store_true",
+            help=f"Move out of scope coordinates to the group '<name>{ARCHIVE_SUFFIX}' instead of deleting them",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true", help="Only report the stale coordinates")
+        parser.add_argument(
+            "--schedule",
+            type=int,
+            metavar="MINUTES",
+            help="Run as a background job per group now and every MINUTES minutes instead",
+        )
+
+    def handle(self, *args, **options):
+        groups = self.get_groups(options["group"])
+        sites = None
+        if options["site"]:
+            sites = Site.objects.filter(slug__in=options["site"])
+            missing = set(options["site"]) - set(sites.values_list("slug", flat=True))
+            if missing:
+                raise CommandError(f"Sites not found: {', '.join(sorted(missing))}")
+
+        if options["schedule"] is not None:
+            if options["schedule"] < 1:
+                raise CommandError("The interval must be at least one minute")
+            for group in groups:
+                job = Job.enqueue(
+                    purge_stale_coordinates_job,
+                    instance=group,
+                    name="Purge stale coordinates",
+                    interval=options["schedule"],
+                    site_ids=list(sites.values_list("pk", flat=True)) if sites is not None else None,
+                    archive=options["archive"],
+                )
+                self.stdout.write(f"{group}: scheduled job {job.pk}")
+            return
+
+        for group in groups:
+            counts = purge_stale_coordinates(
+                group,
+                sites,
+                archive=options["archive"],
+                dry_run=options["dry_run"],
+                batch_size=max(options["batch_size"], 1),
+            )
+            self.stdout.write(f"{group}: " + ", ".join(f"{count} {reason}" for reason, count in counts.items()))
+
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING("Dry run, nothing has been deleted"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Purged stale coordinates"))
+
+    def get_groups(self, names):
+        if not names:
+            return list(CoordinateGroup.objects.exclude(name__endswith=ARCHIVE_SUFFIX))
+
+        groups = []
+        for name in names:
+            query = Q(name=name) | Q(pk=name) if name.isdigit() else Q(name=name)
+            group = CoordinateGroup.objects.filter(query).first()
+            if group is None:
+                raise CommandError(f"Coordinate group '{name}' not found")
+            groups.append(group)
+        return groups
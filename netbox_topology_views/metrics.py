@@ -0,0 +1,103 @@
+import threading
+from typing import Dict, Optional
+
+from django.conf import settings
+
+from netbox_topology_views.utils import encode_image, encode_image_uri, find_image_url
+
+try:
+    from prometheus_client import Counter, Histogram
+except ImportError:
+    Counter = Histogram = None
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+COUNT_BUCKETS = (10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000)
+BATCH_BUCKETS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+# lru_caches of the image lookups by label
+IMAGE_CACHES = {
+    "find_image_url": find_image_url,
+    "encode_image": encode_image,
+    "encode_image_uri": encode_image_uri,
+}
+
+if Histogram is not None:
+    TOPOLOGY_SECONDS = Histogram(
+        "netbox_topology_views_topology_seconds",
+        "Time to deliver the topology data, built or from the cache",
+        ["view", "cache"],
+        buckets=LATENCY_BUCKETS,
+    )
+    TOPOLOGY_NODES = Histogram(
+        "netbox_topology_views_topology_nodes",
+        "Number of nodes of the delivered topologies",
+        ["view"],
+        buckets=COUNT_BUCKETS,
+    )
+    TOPOLOGY_EDGES = Histogram(
+        "netbox_topology_views_topology_edges",
+        "Number of edges of the delivered topologies",
+        ["view"],
+        buckets=COUNT_BUCKETS,
+    )
+    COORDINATE_SAVE_SECONDS = Histogram(
+        "netbox_topology_views_coordinate_save_seconds",
+        "Time to save coordinates",
+        ["endpoint"],
+        buckets=LATENCY_BUCKETS,
+    )
+    COORDINATE_SAVE_BATCH_SIZE = Histogram(
+        "netbox_topology_views_coordinate_save_batch_size",
+        "Number of coordinates saved per request",
+        ["endpoint"],
+        buckets=BATCH_BUCKETS,
+    )
+    IMAGE_CACHE_LOOKUPS = Counter(
+        "netbox_topology_views_image_cache_lookups",
+        "Lookups of node images by cache and result",
+        ["cache", "result"],
+    )
+
+_image_cache_lock = threading.Lock()
+_image_cache_seen: Dict[str, tuple] = {}
+
+
+def metrics_enabled() -> bool:
+    # Metrics are exported by NetBox's django-prometheus integration
+    return Histogram is not None and getattr(settings, "METRICS_ENABLED", False)
+
+
+def sync_image_cache_metrics():
+    """
+    adds the hits and misses of the image caches since the last call to the
+    counters, the lookups themselves are not slowed down by counting
+    """
+    with _image_cache_lock:
+        for name, func in IMAGE_CACHES.items():
+            info = func.cache_info()
+            hits, misses = _image_cache_seen.get(name, (0, 0))
+            if info.hits < hits or info.misses < misses:
+                # The cache has been cleared
+                hits, misses = 0, 0
+            IMAGE_CACHE_LOOKUPS.labels(cache=name, result="hit").inc(info.hits - hits)
+            IMAGE_CACHE_LOOKUPS.labels(cache=name, result="miss").inc(info.misses - misses)
+            _image_cache_seen[name] = (info.hits, info.misses)
+
+
+def observe_topology(view: str, cache_hit: bool, seconds: float, topo_data: Optional[Dict]):
+    """
+    records the delivery of a topology by view, e.g. home, htmx or xml
+    """
+    if not metrics_enabled():
+        return
+    TOPOLOGY_SECONDS.labels(view=view, cache="hit" if cache_hit else "miss").observe(seconds)
+    TOPOLOGY_NODES.labels(view=view).observe(len(topo_data["nodes"]) if topo_data else 0)
+    TOPOLOGY_EDGES.labels(view=view).observe(len(topo_data["edges"]) if topo_data else 0)
+    sync_image_cache_metrics()
+
+
+def observe_coordinate_save(endpoint: str, seconds: float, batch_size: int):
+    if not metrics_enabled():
+        return
+    COORDINATE_SAVE_SECONDS.labels(endpoint=endpoint).observe(seconds)
+    COORDINATE_SAVE_BATCH_SIZE.labels(endpoint=endpoint).observe(batch_size)
@@ -0,0 +1,155 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+OLD_COORDINATE_MODELS = (
+    # old model, app label and model name of the placed object
+    ('circuitcoordinate', 'circuits', 'circuit'),
+    ('powerpanelcoordinate', 'dcim', 'powerpanel'),
+    ('powerfeedcoordinate', 'dcim', 'powerfeed'),
+)
+
+BATCH_SIZE = 1000
+
+
+def copy_coordinates(apps, db_alias, sources, Target, target_fields, source_type, target_type):
+    """
+    Create a Target for every source coordinate, with the timestamps and tags of the
+    source. Returns the pks of the created coordinates by source pk.
+    """
+    TaggedItem = apps.get_model('extras', 'TaggedItem')
+
+    sources = list(sources)
+    targets = Target.objects.using(db_alias).bulk_create(
+        (
+            Target(
+                group_id=source.group_id,
+                x=source.x,
+                y=source.y,
+                custom_field_data=source.custom_field_data,
+                **target_fields(source),
+            )
+            for source in sources
+        ),
+        batch_size=BATCH_SIZE,
+    )
+
+    # bulk_create stamps new created and last_updated values, bulk_update does not
+    for source, target in zip(sources, targets):
+        target.created = source.created
+        target.last_updated = source.last_updated
+    Target.objects.using(db_alias).bulk_update(targets, ['created', 'last_updated'], batch_size=BATCH_SIZE)
+
+    target_ids = {source.pk: target.pk for source, target in zip(sources, targets)}
+    TaggedItem.objects.using(db_alias).bulk_create(
+        (
+            TaggedItem(tag_id=item.tag_id, content_type=target_type, object_id=target_ids[item.object_id])
+            for item in TaggedItem.objects.using(db_alias).filter(content_type=source_type)
+            if item.object_id in target_ids
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    return target_ids
+
+
+def migrate_coordinates(apps, schema_editor):
+    """
+    Move the device coordinates to the generic columns and copy the circuit, power
+    panel and power feed coordinates, including their tags, into the coordinate table.
+    """
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    Coordinate = apps.get_model('netbox_topology_views', 'Coordinate')
+    db_alias = schema_editor.connection.alias
+
+    def get_content_type(app_label, model):
+        return ContentType.objects.using(db_alias).get_or_create(app_label=app_label, model=model)[0]
+
+    Coordinate.objects.using(db_alias).update(
+        content_type=get_content_type('dcim', 'device'),
+        object_id=models.F('device_id'),
+    )
+
+    coordinate_type = get_content_type('netbox_topology_views', 'coordinate')
+    for model_name, app_label, object_model in OLD_COORDINATE_MODELS:
+        OldCoordinate = apps.get_model('netbox_topology_views', model_name)
+        object_type = get_content_type(app_label, object_model)
+        copy_coordinates(
+            apps,
+            db_alias,
+            OldCoordinate.objects.using(db_alias).order_by('pk'),
+            Coordinate,
+            lambda old: {'content_type': object_type, 'object_id': old.device_id},
+            get_content_type('netbox_topology_views', model_name),
+            coordinate_type,
+        )
+
+
+def restore_coordinates(apps, schema_editor):
+    """
+    Reverse of migrate_coordinates: set the device of the device coordinates and move
+    the circuit, power panel and power feed coordinates back into their own tables.
+    """
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    TaggedItem = apps.get_model('extras', 'TaggedItem')
+    Coordinate = apps.get_model('netbox_topology_views', 'Coordinate')
+    db_alias = schema_editor.connection.alias
+
+    def get_content_type(app_label, model):
+        return ContentType.objects.using(db_alias).get_or_create(app_label=app_label, model=model)[0]
+
+    Coordinate.objects.using(db_alias).filter(content_type=get_content_type('dcim', 'device')).update(
+        device_id=models.F('object_id'),
+    )
+
+    coordinate_type = get_content_type('netbox_topology_views', 'coordinate')
+    for model_name, app_label, object_model in OLD_COORDINATE_MODELS:
+        OldCoordinate = apps.get_model('netbox_topology_views', model_name)
+        coordinates = Coordinate.objects.using(db_alias).filter(
+            content_type=get_content_type(app_label, object_model),
+        ).order_by('pk')
+        copied = copy_coordinates(
+            apps,
+            db_alias,
+            coordinates,
+            OldCoordinate,
+            lambda coordinate: {'device_id': coordinate.object_id},
+            coordinate_type,
+            get_content_type('netbox_topology_views', model_name),
+        )
+        # The device column of the coordinate table is required again
+        TaggedItem.objects.using(db_alias).filter(content_type=coordinate_type, object_id__in=list(copied)).delete()
+        Coordinate.objects.using(db_alias).filter(pk__in=list(copied)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('dcim', '0167_module_status'),
+        ('extras', '0084_staging'),
+        ('netbox_topology_views', '0007_individualoptions_group_locations_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='coordinate',
+            unique_together=set(),
+        ),
+        # Circuits, power panels and power feeds have no device
+        migrations.AlterField(
+            model_name='coordinate',
+            name='device',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='dcim.device'),
+        ),
+        migrations.AddField(
+            model_name='coordinate',
+            name='content_type',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype'),
+        ),
+        migrations.AddField(
+            model_name='coordinate',
+            name='object_id',
+            field=models.PositiveBigIntegerField(null=True),
+        ),
+        migrations.RunPython(migrate_coordinates, restore_coordinates),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_topology_views', '0008_coordinate_content_type_object_id'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='coordinate',
+            name='device',
+        ),
+        migrations.AlterField(
+            model_name='coordinate',
+            name='content_type',
+            field=models.ForeignKey(limit_choices_to=models.Q(models.Q(('app_label', 'dcim'), ('model__in', ('device', 'powerpanel', 'powerfeed'))), models.Q(('app_label', 'circuits'), ('model', 'circuit')), _connector='OR'), on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype'),
+        ),
+        migrations.AlterField(
+            model_name='coordinate',
+            name='object_id',
+            field=models.PositiveBigIntegerField(),
+        ),
+        migrations.AlterModelOptions(
+            name='coordinate',
+            options={'ordering': ['group', 'content_type', 'object_id']},
+        ),
+        migrations.AlterUniqueTogether(
+            name='coordinate',
+            unique_together={('group', 'content_type', 'object_id')},
+        ),
+        migrations.DeleteModel(
+            name='CircuitCoordinate',
+        ),
+        migrations.DeleteModel(
+            name='PowerFeedCoordinate',
+        ),
+        migrations.DeleteModel(
+            name='PowerPanelCoordinate',
+        ),
+    ]
@@ -1,14 +1,16 @@
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 
 from circuits.models import Circuit
 from dcim.models import Device, DeviceRole, PowerPanel, PowerFeed
 from extras.models import Tag
 from django.conf import settings
+from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
-from django.db import models
+from django.db import connection, models, transaction
 from django.templatetags.static import static
 from django.urls import reverse
+from django.utils import timezone
 from netbox.models import NetBoxModel
 from netbox.models.features import (
     ChangeLoggingMixin,
@@ -25,6 +27,27 @@ from netbox_topology_views.utils import (
     image_static_url,
 )
 
+# Models which can be placed in a topology view, by the prefix of their node id
+NODE_PREFIXES = {
+    "": Device,
+    "c": Circuit,
+    "p": PowerPanel,
+    "f": PowerFeed,
+}
+
+# Lookups of the site of every model which can be placed
+SITE_LOOKUPS = {
+    Device: "site",
+    Circuit: "terminations__site",
+    PowerPanel: "site",
+    PowerFeed: "power_panel__site",
+}
+
+COORDINATE_OBJECT_TYPES = (
+    models.Q(app_label='dcim', model__in=('device', 'powerpanel', 'powerfeed'))
+    | models.Q(app_label='circuits', model='circuit')
+)
+
 
 class RoleImage(ChangeLoggingMixin, ExportTemplatesMixin, EventRulesMixin):
     class Meta:
@@ -124,168 +147,103 @@ class CoordinateGroup(NetBoxModel):
     def get_absolute_url(self):
         return reverse('plugins:netbox_topology_views:coordinategroup', args=[self.pk])
 
-class Coordinate(NetBoxModel):
-    """
-    Coordinates are being used to place devices in a topology view onto a certain 
-    position. Devices belong to one or more coordinate groups. They have to 
-    be unique together.
-    """
-    device = models.ForeignKey(Device, on_delete=models.CASCADE)
-    group = models.ForeignKey(CoordinateGroup, on_delete=models.CASCADE)
-    
-    x = models.IntegerField(
-        help_text='X-coordinate of the device (horizontal) on the canvas. '
-            'Smaller values correspond to a position further to the left on the monitor.',
-    )
-    y = models.IntegerField(
-        help_text='Y-coordinate of the device (vertical) on the canvas. '
-            'Smaller values correspond to a position further up on the monitor.',
-    )
+    def get_positions(self):
+        """Get positions
 
-    _netbox_private = True
+        loads the coordinates of all devices, circuits, power panels and power feeds
+        of this group with a single scan of the (group, content type, object) index
 
-    def get_or_create_default_group(group_id):
-        # Default group named "default" must always exist in order to make sure
-        # that coordinate values can be stored even if no coordinate group has been
-        # selected. The default group will be added automatically if it does not exist.
-        try:
-            if CoordinateGroup.objects.filter(name="default"):
-                group = CoordinateGroup.objects.get(name="default")
-                group_id = group.pk
-            else:
-                group = CoordinateGroup(
-                    name="default", 
-                    description="Automatically generated default group. If you delete "
-                        "this group, all default coordinates are gone for good but "
-                        "the group itself will be re-created."
-                )
-                group.save()
-                group_id = group.pk
-        except:
-            return False
-        return group_id
+        returns a dict which maps the topology node id to (x, y)
+        """
+        prefixes = Coordinate.get_node_prefixes()
 
-    class Meta:
-        ordering = ['group', 'device']
-        unique_together = ('device', 'group')
+        return {
+            f"{prefixes[content_type_id]}{object_id}" if prefixes[content_type_id] else object_id: (x, y)
+            for content_type_id, object_id, x, y in self.coordinate_set.order_by().values_list(
+                "content_type_id", "object_id", "x", "y"
+            )
+            if content_type_id in prefixes
+        }
 
-    def __str__(self):
-        return f'{self.x};{self.y}'
+    def clone(self, name: str, description: str = "", devices: Optional[models.QuerySet] = None):
+        """Clone
 
-    def get_absolute_url(self):
-        return reverse('plugins:netbox_topology_views:coordinate', args=[self.pk])
+        creates a new group and copies all coordinates of this group into it with
+        a single INSERT ... SELECT statement. If a device queryset is given, only the
+        coordinates of these devices are copied along with all circuit, power panel
+        and power feed coordinates.
 
-class CircuitCoordinate(NetBoxModel):
-    """
-    Coordinates are being used to place devices in a topology view onto a certain 
-    position. Devices belong to one or more coordinate groups. They have to 
-    be unique together.
-    """
-    device = models.ForeignKey(Circuit, on_delete=models.CASCADE)
-    group = models.ForeignKey(CoordinateGroup, on_delete=models.CASCADE)
-    
-    x = models.IntegerField(
-        help_text='X-coordinate of the device (horizontal) on the canvas. '
-            'Smaller values correspond to a position further to the left on the monitor.',
-    )
-    y = models.IntegerField(
-        help_text='Y-coordinate of the device (vertical) on the canvas. '
-            'Smaller values correspond to a position further up on the monitor.',
-    )
-
-    _netbox_private = True
-
-    def get_or_create_default_group(group_id):
-        # Default group named "default" must always exist in order to make sure
-        # that coordinate values can be stored even if no coordinate group has been
-        # selected. The default group will be added automatically if it does not exist.
-        try:
-            if CoordinateGroup.objects.filter(name="default"):
-                group = CoordinateGroup.objects.get(name="default")
-                group_id = group.pk
-            else:
-                group = CoordinateGroup(
-                    name="default", 
-                    description="Automatically generated default group. If you delete "
-                        "this group, all default coordinates are gone for good but "
-                        "the group itself will be re-created."
+        returns the new group and the number of copied coordinates
+        """
+        now = timezone.now()
+        table = connection.ops.quote_name(Coordinate._meta.db_table)
+        sql = (
+            f"INSERT INTO {table} "
+            "(created, last_updated, custom_field_data, group_id, content_type_id, object_id, x, y) "
+            "SELECT %s, %s, custom_field_data, %s, content_type_id, object_id, x, y "
+            f"FROM {table} WHERE group_id = %s"
+        )
+
+        with transaction.atomic():
+            group = CoordinateGroup.objects.create(name=name, description=description)
+            params = [now, now, group.pk, self.pk]
+
+            if devices is not None:
+                device_sql, device_params = devices.order_by().values("pk").query.sql_with_params()
+                sql += f" AND (content_type_id <> %s OR object_id IN ({device_sql}))"
+                params += [ContentType.objects.get_for_model(Device).pk, *device_params]
+
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                count = cursor.rowcount
+
+        return group, count
+
+    def get_stale_coordinates(self, sites: Optional[models.QuerySet] = None) -> Dict[str, models.QuerySet]:
+        """Get stale coordinates
+
+        returns the coordinates of this group whose object has been deleted
+        ("orphaned") and, if sites are given, the coordinates of objects outside
+        of these sites ("out of scope"). Both are single anti-join queries.
+        """
+        content_types = ContentType.objects.get_for_models(*NODE_PREFIXES.values())
+        orphaned = models.Q(pk__in=[])
+        out_of_scope = models.Q(pk__in=[])
+        for model, content_type in content_types.items():
+            objects = model.objects.filter(pk=models.OuterRef("object_id"))
+            orphaned |= models.Q(content_type=content_type) & ~models.Exists(objects)
+            if sites is not None:
+                in_scope = objects.filter(**{f"{SITE_LOOKUPS[model]}__in": sites})
+                out_of_scope |= (
+                    models.Q(content_type=content_type)
+                    & models.Exists(objects)
+                    & ~models.Exists(in_scope)
                 )
-                group.save()
-                group_id = group.pk
-        except:
-            return False
-        return group_id
-
-    class Meta:
-        ordering = ['group', 'device']
-        unique_together = ('device', 'group')
-
-    def __str__(self):
-        return f'{self.x};{self.y}'
 
-    def get_absolute_url(self):
-        return reverse('plugins:netbox_topology_views:circuitcoordinate', args=[self.pk])
+        coordinates = self.coordinate_set.order_by()
+        stale = {"orphaned": coordinates.filter(orphaned)}
+        if sites is not None:
+            stale["out of scope"] = coordinates.filter(out_of_scope)
+        return stale
 
-class PowerPanelCoordinate(NetBoxModel):
+class Coordinate(NetBoxModel):
     """
-    Coordinates are being used to place devices in a topology view onto a certain 
-    position. Devices belong to one or more coordinate groups. They have to 
-    be unique together.
+    Coordinates are being used to place devices, circuits, power panels and power
+    feeds in a topology view onto a certain position. Objects belong to one or more
+    coordinate groups. They have to be unique together.
     """
-    device = models.ForeignKey(PowerPanel, on_delete=models.CASCADE)
     group = models.ForeignKey(CoordinateGroup, on_delete=models.CASCADE)
-    
-    x = models.IntegerField(
-        help_text='X-coordinate of the device (horizontal) on the canvas. '
-            'Smaller values correspond to a position further to the left on the monitor.',
+    content_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.CASCADE,
+        limit_choices_to=COORDINATE_OBJECT_TYPES,
     )
-    y = models.IntegerField(
-        help_text='Y-coordinate of the device (vertical) on the canvas. '
-            'Smaller values correspond to a position further up on the monitor.',
+    object_id = models.PositiveBigIntegerField()
+    assigned_object = GenericForeignKey(
+        ct_field='content_type',
+        fk_field='object_id',
     )
 
-    _netbox_private = True
-
-    def get_or_create_default_group(group_id):
-        # Default group named "default" must always exist in order to make sure
-        # that coordinate values can be stored even if no coordinate group has been
-        # selected. The default group will be added automatically if it does not exist.
-        try:
-            if CoordinateGroup.objects.filter(name="default"):
-                group = CoordinateGroup.objects.get(name="default")
-                group_id = group.pk
-            else:
-                group = CoordinateGroup(
-                    name="default", 
-                    description="Automatically generated default group. If you delete "
-                        "this group, all default coordinates are gone for good but "
-                        "the group itself will be re-created."
-                )
-                group.save()
-                group_id = group.pk
-        except:
-            return False
-        return group_id
-
-    class Meta:
-        ordering = ['group', 'device']
-        unique_together = ('device', 'group')
-
-    def __str__(self):
-        return f'{self.x};{self.y}'
-
-    def get_absolute_url(self):
-        return reverse('plugins:netbox_topology_views:powerpanelcoordinate', args=[self.pk])
-
-class PowerFeedCoordinate(NetBoxModel):
-    """
-    Coordinates are being used to place devices in a topology view onto a certain 
-    position. Devices belong to one or more coordinate groups. They have to 
-    be unique together.
-    """
-    device = models.ForeignKey(PowerFeed, on_delete=models.CASCADE)
-    group = models.ForeignKey(CoordinateGroup, on_delete=models.CASCADE)
-    
     x = models.IntegerField(
         help_text='X-coordinate of the device (horizontal) on the canvas. '
             'Smaller values correspond to a position further to the left on the monitor.',
@@ -297,6 +255,7 @@ class PowerFeedCoordinate(NetBoxModel):
 
     _netbox_private = True
 
+    @staticmethod
     def get_or_create_default_group(group_id):
         # Default group named "default" must always exist in order to make sure
         # that coordinate values can be stored even if no coordinate group has been
@@ -318,15 +277,27 @@ class PowerFeedCoordinate(NetBoxModel):
             return False
         return group_id
 
+    @staticmethod
+    def get_node_prefixes():
+        """Get node prefixes
+
+        returns a dict which maps the content type id of every model that can be placed
+        to the prefix of its topology node id
+        """
+        content_types = ContentType.objects.get_for_models(*NODE_PREFIXES.values())
+        return {
+            content_types[model].pk: prefix for prefix, model in NODE_PREFIXES.items()
+        }
+
     class Meta:
-        ordering = ['group', 'device']
-        unique_together = ('device', 'group')
+        ordering = ['group', 'content_type', 'object_id']
+        unique_together = ('group', 'content_type', 'object_id')
 
     def __str__(self):
         return f'{self.x};{self.y}'
 
     def get_absolute_url(self):
-        return reverse('plugins:netbox_topology_views:powerfeedcoordinate', args=[self.pk])
+        return reverse('plugins:netbox_topology_views:coordinate', args=[self.pk])
 
 class IndividualOptions(NetBoxModel):
     CHOICES = (
@@ -18,57 +18,6 @@ coordinategroup_buttons = (
     )
 )
 
-circuitcoordinate_buttons = (
-    PluginMenuButton(
-        link='plugins:netbox_topology_views:circuitcoordinate_add',
-        title='Add',
-        icon_class='mdi mdi-plus-thick',
-        color=ButtonColorChoices.GREEN,
-        permissions=['netbox_topology_views.add_coordinate']
-    ),
-    PluginMenuButton(
-        link='plugins:netbox_topology_views:circuitcoordinate_import',
-        title='Import',
-        icon_class='mdi mdi-upload',
-        color=ButtonColorChoices.CYAN,
-        permissions=['netbox_topology_views.add_coordinate']
-    )
-)
-
-powerpanelcoordinate_buttons = (
-    PluginMenuButton(
-        link='plugins:netbox_topology_views:powerpanelcoordinate_add',
-        title='Add',
-        icon_class='mdi mdi-plus-thick',
-        color=ButtonColorChoices.GREEN,
-        permissions=['netbox_topology_views.add_coordinate']
-    ),
-    PluginMenuButton(
-        link='plugins:netbox_topology_views:powerpanelcoordinate_import',
-        title='Import',
-        icon_class='mdi mdi-upload',
-        color=ButtonColorChoices.CYAN,
-        permissions=['netbox_topology_views.add_coordinate']
-    )
-)
-
-powerfeedcoordinate_buttons = (
-    PluginMenuButton(
-        link='plugins:netbox_topology_views:powerfeedcoordinate_add',
-        title='Add',
-        icon_class='mdi mdi-plus-thick',
-        color=ButtonColorChoices.GREEN,
-        permissions=['netbox_topology_views.add_coordinate']
-    ),
-    PluginMenuButton(
-        link='plugins:netbox_topology_views:powerfeedcoordinate_import',
-        title='Import',
-        icon_class='mdi mdi-upload',
-        color=ButtonColorChoices.CYAN,
-        permissions=['netbox_topology_views.add_coordinate']
-    )
-)
-
 coordinate_buttons = (
     PluginMenuButton(
         link='plugins:netbox_topology_views:coordinate_add',
@@ -98,10 +47,7 @@ menu = PluginMenu(
         ('COORDINATES', 
             (
                 PluginMenuItem(link="plugins:netbox_topology_views:coordinategroup_list", link_text="Coordinate Groups", buttons=coordinategroup_buttons, permissions=['netbox_topology_views.view_coordinategroup']),
-                PluginMenuItem(link="plugins:netbox_topology_views:coordinate_list", link_text="Device Coordinates", buttons=coordinate_buttons, permissions=['netbox_topology_views.view_coordinate']),
-                PluginMenuItem(link="plugins:netbox_topology_views:powerfeedcoordinate_list", link_text="Power Feed Coords", buttons=powerfeedcoordinate_buttons, permissions=['netbox_topology_views.view_coordinate']),
-                PluginMenuItem(link="plugins:netbox_topology_views:powerpanelcoordinate_list", link_text="Power Panel Coords", buttons=powerpanelcoordinate_buttons, permissions=['netbox_topology_views.view_coordinate']),
-                PluginMenuItem(link="plugins:netbox_topology_views:circuitcoordinate_list", link_text="Circuit Coordinates", buttons=circuitcoordinate_buttons, permissions=['netbox_topology_views.view_coordinate']),
+                PluginMenuItem(link="plugins:netbox_topology_views:coordinate_list", link_text="Coordinates", buttons=coordinate_buttons, permissions=['netbox_topology_views.view_coordinate']),
             ),
         ),
         ('PREFERENCES', 
@@ -0,0 +1,137 @@
+import json
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger("netbox_topology_views.profiling")
+
+# Returns the number of nodes and edges collected so far
+Counter = Callable[[], Tuple[int, int]]
+
+
+class TopologyProfiler:
+    """
+    records wall time, database queries and the nodes and edges added per phase
+    of a topology build
+
+    phase() ends the current phase and starts the next one. Queries are counted
+    while the profiler is entered:
+
+        with profiler:
+            get_topology_data(..., profiler=profiler)
+    """
+    def __init__(self, cache_hit: bool = False):
+        self.cache_hit = cache_hit
+        self.phases: List[Dict] = []
+        self.current: Optional[Dict] = None
+        self.counter: Optional[Counter] = None
+        self.wrapper = None
+
+    def __enter__(self):
+        self.wrapper = connection.execute_wrapper(self.execute)
+        self.wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+        self.wrapper.__exit__(*exc_info)
+        self.wrapper = None
+
+    def execute(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            if self.current is not None:
+                self.current["queries"] += 1
+                self.current["query_ms"] += (time.perf_counter() - start) * 1000
+
+    def phase(self, name: str, counter: Optional[Counter] = None):
+        self.stop()
+        nodes, edges = counter() if counter is not None else (0, 0)
+        self.counter = counter
+        self.current = {
+            "name": name,
+            "ms": 0.0,
+            "queries": 0,
+            "query_ms": 0.0,
+            "nodes": -nodes,
+            "edges": -edges,
+            "start": time.perf_counter(),
+        }
+
+    def stop(self):
+        if self.current is None:
+            return
+        phase = self.current
+        self.current = None
+        phase["ms"] = (time.perf_counter() - phase.pop("start")) * 1000
+        nodes, edges = self.counter() if self.counter is not None else (0, 0)
+        phase["nodes"] += nodes
+        phase["edges"] += edges
+        self.phases.append(phase)
+
+    @property
+    def total_ms(self) -> float:
+        return sum(phase["ms"] for phase in self.phases)
+
+    def as_dict(self) -> Dict:
+        return {
+            "cache": "hit" if self.cache_hit else "miss",
+            "ms": round(self.total_ms, 3),
+            "queries": sum(phase["queries"] for phase in self.phases),
+            "query_ms": round(sum(phase["query_ms"] for phase in self.phases), 3),
+            "phases": [
+                {**phase, "ms": round(phase["ms"], 3), "query_ms": round(phase["query_ms"], 3)}
+                for phase in self.phases
+            ],
+        }
+
+    def get_server_timing(self) -> str:
+        """
+        returns the value of the Server-Timing header, one metric per phase
+        """
+        if self.cache_hit:
+            return 'topology-cache;desc="hit"'
+        metrics = ['topology-cache;desc="miss"']
+        for phase in self.phases:
+            metrics.append(
+                f'topology-{phase["name"]};dur={phase["ms"]:.1f};'
+                f'desc="{phase["queries"]} queries in {phase["query_ms"]:.1f}ms, '
+                f'{phase["nodes"]} nodes, {phase["edges"]} edges"'
+            )
+        metrics.append(f"topology-total;dur={self.total_ms:.1f}")
+        return ", ".join(metrics)
+
+    def log_if_slow(self, **extra):
+        """
+        logs the phases as one JSON line if the build took longer than the
+        slow_build_threshold setting (milliseconds, 0 disables logging)
+        """
+        threshold = settings.PLUGINS_CONFIG["netbox_topology_views"]["slow_build_threshold"]
+        if self.cache_hit or not threshold or self.total_ms < threshold:
+            return
+        logger.warning("slow topology build %s", json.dumps({**extra, **self.as_dict()}))
+
+
+def set_request_profiler(request, profiler: TopologyProfiler):
+    # DRF requests wrap the request the middleware sees
+    getattr(request, "_request", request).topology_profiler = profiler
+
+
+class ServerTimingMiddleware:
+    """
+    adds the phases of the topology built for a request as Server-Timing header
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        profiler = getattr(request, "topology_profiler", None)
+        if profiler is not None:
+            response["Server-Timing"] = profiler.get_server_timing()
+        return response
@@ -0,0 +1,232 @@
+import math
+import os
+from typing import Dict, Iterator, Optional, Tuple
+
+from django.conf import settings
+
+from netbox_topology_views.exporters import XMLWriter, get_edge_type, get_position, iter_chunks
+from netbox_topology_views.utils import LinePattern, encode_image_uri, get_image_from_url
+
+try:
+    import cairosvg
+except ImportError:
+    cairosvg = None
+
+# Size of the node icons and distance between placed nodes, as in the topology view
+NODE_SIZE = 50
+NODE_SPACING = 150
+MARGIN = 100
+
+# Nodes without stored position are placed by a force directed layout as long as
+# they and their neighbours with stored positions are at most this many, larger
+# graphs are placed on a grid
+MAX_FORCE_LAYOUT_NODES = 200
+FORCE_LAYOUT_ITERATIONS = 50
+
+Position = Tuple[float, float]
+
+
+def get_grid_positions(count: int, origin: Position) -> Iterator[Position]:
+    columns = max(1, math.ceil(math.sqrt(count)))
+    for index in range(count):
+        yield (
+            origin[0] + (index % columns) * NODE_SPACING,
+            origin[1] + (index // columns) * NODE_SPACING,
+        )
+
+
+def compute_layout(data: Dict, use_stored_positions: bool = True) -> Dict[str, Position]:
+    """
+    returns the position of every node by node id
+
+    Stored positions are kept unless use_stored_positions is False. The other
+    nodes start on a grid below the stored ones and are moved by a
+    Fruchterman-Reingold layout, in which they are repelled by each other and
+    by their neighbours and pulled together by their edges. The stored nodes
+    are above the grid, so only the neighbours have to be taken into account.
+    The layout is deterministic, so repeated renderings look the same.
+    """
+    positions = {}
+    free_ids = []
+    for node in data["nodes"]:
+        node_id = str(node["id"])
+        position = get_position(node) if use_stored_positions else None
+        if position is None:
+            free_ids.append(node_id)
+        else:
+            positions[node_id] = position
+
+    if not free_ids:
+        return positions
+
+    origin = (0, max((y for _, y in positions.values()), default=-NODE_SPACING) + NODE_SPACING)
+    positions.update(zip(free_ids, get_grid_positions(len(free_ids), origin)))
+    if len(free_ids) > MAX_FORCE_LAYOUT_NODES:
+        return positions
+
+    free = set(free_ids)
+    edges = [
+        (str(edge["from"]), str(edge["to"]))
+        for edge in data["edges"]
+        if (str(edge["from"]) in free or str(edge["to"]) in free)
+        and str(edge["from"]) in positions
+        and str(edge["to"]) in positions
+        and edge["from"] != edge["to"]
+    ]
+    node_ids = free_ids + sorted({node_id for edge in edges for node_id in edge} - free)
+    if len(node_ids) > MAX_FORCE_LAYOUT_NODES:
+        return positions
+
+    temperature = NODE_SPACING * math.sqrt(len(free_ids))
+    for iteration in range(FORCE_LAYOUT_ITERATIONS):
+        displacement = {node_id: [0.0, 0.0] for node_id in free_ids}
+        for node_id in free_ids:
+            x, y = positions[node_id]
+            for other_id in node_ids:
+                if other_id == node_id:
+                    continue
+                dx = x - positions[other_id][0]
+                dy = y - positions[other_id][1]
+                distance = max(math.hypot(dx, dy), 1.0)
+                force = NODE_SPACING * NODE_SPACING / distance
+                displacement[node_id][0] += dx / distance * force
+                displacement[node_id][1] += dy / distance * force
+        for source, target in edges:
+            dx = positions[source][0] - positions[target][0]
+            dy = positions[source][1] - positions[target][1]
+            distance = max(math.hypot(dx, dy), 1.0)
+            force = distance * distance / NODE_SPACING
+            if source in displacement:
+                displacement[source][0] -= dx / distance * force
+                displacement[source][1] -= dy / distance * force
+            if target in displacement:
+                displacement[target][0] += dx / distance * force
+                displacement[target][1] += dy / distance * force
+
+        # Cool down linearly, the steps get smaller with every iteration
+        limit = temperature * (1 - iteration / FORCE_LAYOUT_ITERATIONS)
+        for node_id, (dx, dy) in displacement.items():
+            length = max(math.hypot(dx, dy), 1.0)
+            step = min(length, limit)
+            x, y = positions[node_id]
+            positions[node_id] = (x + dx / length * step, y + dy / length * step)
+
+    return positions
+
+
+def get_dasharray(edge: Dict) -> Optional[str]:
+    edge_type = get_edge_type(edge)
+    if edge_type == "circuit":
+        return "5 5"
+    if edge_type in ("wireless", "power", "logical"):
+        return " ".join(str(value) for value in getattr(LinePattern(), edge_type))
+    return None
+
+
+def iter_svg(
+    data: Optional[Dict], image_base_url: Optional[str] = None, use_stored_positions: bool = True
+) -> Iterator[str]:
+    """
+    yields the topology as SVG document
+
+    Every distinct image is defined once and referenced by the nodes. Images are
+    embedded unless image_base_url is set, see iter_data_to_xml.
+    """
+    if data is None:
+        data = {"nodes": [], "edges": []}
+    positions = compute_layout(data, use_stored_positions)
+    writer = XMLWriter()
+
+    xs = [x for x, _ in positions.values()] or [0]
+    ys = [y for _, y in positions.values()] or [0]
+    min_x, min_y = min(xs) - MARGIN, min(ys) - MARGIN
+    width, height = max(xs) - min(xs) + 2 * MARGIN, max(ys) - min(ys) + 2 * MARGIN
+
+    writer.generator.startDocument()
+    writer.start("svg", {
+        "xmlns": "http://www.w3.org/2000/svg",
+        "xmlns:xlink": "http://www.w3.org/1999/xlink",
+        "width": f"{width:.0f}",
+        "height": f"{height:.0f}",
+        "viewBox": f"{min_x:.0f} {min_y:.0f} {width:.0f} {height:.0f}",
+        "font-family": "sans-serif",
+        "font-size": "12",
+    })
+    writer.element("rect", {"x": f"{min_x:.0f}", "y": f"{min_y:.0f}", "width": "100%", "height": "100%", "fill": "#ffffff"})
+
+    image_ids = {}
+    writer.start("defs")
+    for node in data["nodes"]:
+        url = node.get("image")
+        if not url or url in image_ids:
+            continue
+        image_ids[url] = f"image{len(image_ids)}"
+        if image_base_url is not None:
+            href = image_base_url.rstrip("/") + url
+        else:
+            path = settings.STATIC_ROOT + "/" + get_image_from_url(url)
+            href = encode_image_uri(path, os.stat(path).st_mtime)
+        writer.element("image", {
+            "id": image_ids[url],
+            "width": NODE_SIZE,
+            "height": NODE_SIZE,
+            "href": href,
+            "xlink:href": href,
+        })
+        yield writer.pop()
+    writer.end("defs")
+
+    writer.start("g", {"fill": "none", "stroke-width": "2"})
+    for edge in data["edges"]:
+        source = positions.get(str(edge["from"]))
+        target = positions.get(str(edge["to"]))
+        if source is None or target is None:
+            continue
+        attributes = {
+            "x1": f"{source[0]:.1f}",
+            "y1": f"{source[1]:.1f}",
+            "x2": f"{target[0]:.1f}",
+            "y2": f"{target[1]:.1f}",
+            "stroke": edge.get("color", "#2b7ce9"),
+        }
+        dasharray = get_dasharray(edge)
+        if dasharray is not None:
+            attributes["stroke-dasharray"] = dasharray
+        writer.element("line", attributes)
+        yield writer.pop()
+    writer.end("g")
+
+    writer.start("g", {"text-anchor": "middle"})
+    for node in data["nodes"]:
+        x, y = positions[str(node["id"])]
+        if node.get("image") in image_ids:
+            writer.element("use", {
+                "href": f"#{image_ids[node['image']]}",
+                "xlink:href": f"#{image_ids[node['image']]}",
+                "x": f"{x - NODE_SIZE / 2:.1f}",
+                "y": f"{y - NODE_SIZE / 2:.1f}",
+            })
+        writer.element("text", {"x": f"{x:.1f}", "y": f"{y + NODE_SIZE / 2 + 14:.1f}"}, str(node["label"]))
+        yield writer.pop()
+    writer.end("g")
+
+    writer.end("svg")
+    writer.generator.endDocument()
+    yield writer.pop()
+
+
+def iter_svg_export(
+    data: Optional[Dict], image_base_url: Optional[str] = None, use_stored_positions: bool = True
+) -> Iterator[bytes]:
+    return iter_chunks(iter_svg(data, image_base_url, use_stored_positions))
+
+
+def render_png(data: Optional[Dict], use_stored_positions: bool = True) -> bytes:
+    """
+    returns the topology as PNG, requires the optional cairosvg package
+    """
+    if cairosvg is None:
+        raise RuntimeError("PNG rendering requires the cairosvg package")
+    return cairosvg.svg2png(
+        bytestring=b"".join(iter_svg_export(data, use_stored_positions=use_stored_positions))
+    )
@@ -14,5 +14,5 @@ class CoordinatesIndex(SearchIndex):
     model = Coordinate
     fields = (
         ('group', 100),
-        ('device', 200),
+        ('assigned_object', 200),
     )
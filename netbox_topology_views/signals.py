@@ -1,14 +1,106 @@
 from typing import Type
 
-from dcim.models import DeviceRole
+from circuits.models import Circuit, CircuitTermination, CircuitType, Provider, ProviderNetwork
+from dcim.models import (
+    Cable,
+    CableTermination,
+    Device,
+    DeviceRole,
+    DeviceType,
+    FrontPort,
+    Interface,
+    Location,
+    PowerFeed,
+    PowerOutlet,
+    PowerPanel,
+    PowerPort,
+    Rack,
+    RearPort,
+    Site,
+)
 from django.contrib.contenttypes.models import ContentType
-from django.db.models.signals import pre_delete
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
+from extras.models import SavedFilter
+from ipam.models import IPAddress
+from users.models import ObjectPermission
+from wireless.models import WirelessLink
 
-from netbox_topology_views.models import RoleImage
+from netbox_topology_views.caching import invalidate_topology_cache
+from netbox_topology_views.models import (
+    NODE_PREFIXES,
+    RoleImage,
+    CoordinateGroup,
+    Coordinate,
+)
+
+# Changes to any of these models may change a rendered topology, the ETag of a
+# topology is only as strict as this list
+TOPOLOGY_MODELS = (
+    # Nodes and what their labels and titles show
+    Device,
+    DeviceType,
+    DeviceRole,
+    Site,
+    Location,
+    Rack,
+    IPAddress,
+    Circuit,
+    CircuitType,
+    Provider,
+    ProviderNetwork,
+    PowerPanel,
+    PowerFeed,
+    # Edges, the ports form cable paths and logical connections
+    Cable,
+    CableTermination,
+    Interface,
+    FrontPort,
+    RearPort,
+    PowerPort,
+    PowerOutlet,
+    CircuitTermination,
+    WirelessLink,
+    # Saved filters and constraints decide which devices are shown
+    SavedFilter,
+    ObjectPermission,
+    RoleImage,
+    CoordinateGroup,
+    Coordinate,
+)
 
 
 @receiver(pre_delete, sender=DeviceRole, dispatch_uid="delete_hanging_role_image")
 def delete_hanging_role_image(sender: Type[DeviceRole], instance: DeviceRole, **kwargs):
     ct = ContentType.objects.get_for_model(sender)
     RoleImage.objects.filter(content_type=ct, object_id=instance.id).delete()
+
+
+def delete_hanging_coordinates(sender, instance, **kwargs):
+    # Coordinates reference their object generically, so they are not deleted by cascade
+    ct = ContentType.objects.get_for_model(sender)
+    Coordinate.objects.filter(content_type=ct, object_id=instance.pk).delete()
+
+
+for model in NODE_PREFIXES.values():
+    pre_delete.connect(
+        delete_hanging_coordinates,
+        sender=model,
+        dispatch_uid=f"delete_hanging_coordinates_{model._meta.label_lower}",
+    )
+
+
+def invalidate_topology_cache_receiver(sender, **kwargs):
+    # Wait for the commit, otherwise a concurrent request could cache stale data
+    # under the new version
+    transaction.on_commit(invalidate_topology_cache)
+
+
+for model in TOPOLOGY_MODELS:
+    for signal, signal_name in ((post_save, "save"), (post_delete, "delete")):
+        signal.connect(
+            invalidate_topology_cache_receiver,
+            sender=model,
+            dispatch_uid=f"invalidate_topology_cache_{signal_name}_{model._meta.label_lower}",
+        )
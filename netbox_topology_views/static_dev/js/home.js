@@ -53,79 +53,150 @@ const coordSaveCheckbox = document.querySelector('#id_save_coords')
         return container
     }
 
-    const nodes = new DataSet(
-        topologyData.nodes.map((node) => ({
-            ...node,
-            title: htmlTitle(node.title)
-        }))
-    )
+    function toVisItem(item) {
+        return {
+            ...item,
+            title: htmlTitle(item.title)
+        }
+    }
+
+    const nodes = new DataSet(topologyData.nodes.map(toVisItem))
 
     // make nodes object available globally in order to update their physics and positions later
     window.nodes = nodes;
 
-    const edges = new DataSet(
-        topologyData.edges.map((node) => ({
-            ...node,
-            title: htmlTitle(node.title)
-        }))
-    )
+    const edges = new DataSet(topologyData.edges.map(toVisItem))
 
     const group_sites = topologyData.options.group_sites
     const group_locations = topologyData.options.group_locations
     const group_racks = topologyData.options.group_racks
 
+    // All positions are known, e.g. after the layout has been saved. No need to
+    // run the physics simulation again.
+    if (topologyData.nodes.length > 0 && topologyData.nodes.every((node) => node.physics === false)) {
+        options.physics = { ...options.physics, enabled: false }
+    }
+
     graph = new Network(container, { nodes, edges }, options)
     graph.fit()
 
+    // Saves the positions of the given nodes with a single request
+    async function saveCoordinates(positions, group) {
+        return fetch(
+            '/' + basePath + 'api/plugins/netbox_topology_views/save-coords/save_coords_bulk/',
+            {
+                method: 'PATCH',
+                headers: {
+                    'X-CSRFToken': csrftoken,
+                    Accept: 'application/json',
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({
+                    group: group,
+                    nodes: Object.entries(positions).map(([nodeId, nodePosition]) => ({
+                        node_id: nodeId,
+                        x: nodePosition.x,
+                        y: nodePosition.y
+                    }))
+                })
+            }
+        )
+    }
+
     graph.on('dragEnd', (params) => {
         if (coordSaveCheckbox == null) return
         if (!coordSaveCheckbox.checked) return
+        if (params.nodes.length === 0) return
 
-        Promise.allSettled(
-            Object.entries(graph.getPositions(params.nodes)).map(
-                async ([nodeId, nodePosition]) => {
-                    if(!isNaN(parseInt(nodeId))) { 
-                        nodeKey = parseInt(nodeId);
-                    }
-                    else {
-                        nodeKey = nodeId;
-                    }
+        const positions = graph.getPositions(params.nodes)
+        Object.entries(positions).forEach(([nodeId, nodePosition]) => {
+            const nodeKey = !isNaN(parseInt(nodeId)) ? parseInt(nodeId) : nodeId
 
-                    try {
-                        window.nodes.update({id: nodeKey, physics: false, x: nodePosition.x, y: nodePosition.y});
-                    }
-                    catch (e) {
-                        console.log([
-                            'Error while executing window.nodes.update()', 
-                            'nodeId: ' + nodeId, 
-                            'nodeKey: ' + nodeKey, 
-                            'x: ' + nodePosition.x, 
-                            'y: ' + nodePosition.y
-                        ]);
-                        console.log(e);
-                    }
-                    const res = await fetch(
-                        '/' + basePath + 'api/plugins/netbox_topology_views/save-coords/save_coords/',
-                        {
-                            method: 'PATCH',
-                            headers: {
-                                'X-CSRFToken': csrftoken,
-                                Accept: 'application/json',
-                                'Content-Type': 'application/json'
-                            },
-                            body: JSON.stringify({
-                                node_id: nodeId,
-                                x: nodePosition.x,
-                                y: nodePosition.y,
-                                group: topologyData.group
-                            })
-                        }
-                    )
-                }
-            )
-        )
+            try {
+                window.nodes.update({id: nodeKey, physics: false, x: nodePosition.x, y: nodePosition.y});
+            }
+            catch (e) {
+                console.log([
+                    'Error while executing window.nodes.update()', 
+                    'nodeId: ' + nodeId, 
+                    'nodeKey: ' + nodeKey, 
+                    'x: ' + nodePosition.x, 
+                    'y: ' + nodePosition.y
+                ]);
+                console.log(e);
+            }
+        })
+
+        saveCoordinates(positions, topologyData.group)
     })
 
+    // Save the current positions of all nodes to the selected coordinate group at once
+    const saveLayoutButton = document.querySelector('#btnSaveLayout')
+    if (saveLayoutButton) {
+        saveLayoutButton.addEventListener('click', async (e) => {
+            e.preventDefault()
+
+            const groupSelect = document.querySelector('#id_group')
+            const group = groupSelect && groupSelect.value ? groupSelect.value : topologyData.group
+            const positions = graph.getPositions()
+
+            const res = await saveCoordinates(positions, group)
+            if (!res.ok) {
+                console.log(['Error while saving the layout', res.status])
+                return
+            }
+
+            nodes.update(Object.entries(positions).map(([nodeId, nodePosition]) => ({
+                id: nodes.get(nodeId) ? nodeId : parseInt(nodeId),
+                physics: false,
+                x: nodePosition.x,
+                y: nodePosition.y
+            })))
+            graph.setOptions({ physics: { enabled: false } })
+        })
+    }
+
+    // Refresh the topology in place. Only the nodes and edges that changed since the
+    // last load are fetched and patched into the data sets.
+    let currentEtag = typeof topologyEtag !== 'undefined' ? topologyEtag : null
+
+    async function refreshTopology() {
+        const query = new URLSearchParams(window.location.search)
+        if (currentEtag) query.set('since', currentEtag)
+
+        const res = await fetch(
+            '/' + basePath + 'api/plugins/netbox_topology_views/topology/delta/?' + query,
+            { headers: { Accept: 'application/json' } }
+        )
+        if (res.status === 304 || !res.ok) return
+
+        const delta = await res.json()
+        currentEtag = delta.etag
+
+        if (delta.full) {
+            nodes.clear()
+            edges.clear()
+            if (delta.topology) {
+                nodes.add(delta.topology.nodes.map(toVisItem))
+                edges.add(delta.topology.edges.map(toVisItem))
+            }
+            return
+        }
+
+        edges.remove(delta.edges.removed)
+        nodes.remove(delta.nodes.removed)
+        nodes.update([...delta.nodes.added, ...delta.nodes.changed].map(toVisItem))
+        edges.update([...delta.edges.added, ...delta.edges.changed].map(toVisItem))
+    }
+
+    const refreshButton = document.querySelector('#btnRefresh')
+    if (refreshButton) {
+        refreshButton.addEventListener('click', (e) => {
+            e.preventDefault()
+            refreshTopology()
+        })
+    }
+
     graph.on('doubleClick', (params) => {
         if (params.nodes.length > 0) {
             params.nodes.forEach((node) => {
@@ -1,7 +1,8 @@
 import django_tables2 as tables
 
 from netbox.tables import NetBoxTable, ChoiceFieldColumn
-from netbox_topology_views.models import CoordinateGroup, Coordinate, CircuitCoordinate, PowerPanelCoordinate, PowerFeedCoordinate
+from netbox.tables.columns import ContentTypeColumn
+from netbox_topology_views.models import CoordinateGroup, Coordinate
 
 class CoordinateGroupListTable(NetBoxTable):
     name = tables.Column(
@@ -14,58 +15,22 @@ class CoordinateGroupListTable(NetBoxTable):
         fields = ('pk', 'id', 'name', 'description', 'devices')
         default_columns = ('name', 'description', 'devices')
 
-class CircuitCoordinateListTable(NetBoxTable):
-    group = tables.Column(
-        linkify=True
-    )
-
-    device = tables.Column(
-        linkify=True
-    )
-
-    class Meta(NetBoxTable.Meta):
-        model = CircuitCoordinate
-        fields = ('pk', 'id', 'group', 'device', 'x', 'y')
-        default_columns = ('id', 'group', 'device', 'x', 'y')
-
-class PowerPanelCoordinateListTable(NetBoxTable):
-    group = tables.Column(
-        linkify=True
-    )
-
-    device = tables.Column(
-        linkify=True
-    )
-
-    class Meta(NetBoxTable.Meta):
-        model = PowerPanelCoordinate
-        fields = ('pk', 'id', 'group', 'device', 'x', 'y')
-        default_columns = ('id', 'group', 'device', 'x', 'y')
-
-class PowerFeedCoordinateListTable(NetBoxTable):
+class CoordinateListTable(NetBoxTable):
     group = tables.Column(
         linkify=True
     )
 
-    device = tables.Column(
-        linkify=True
-    )
-
-    class Meta(NetBoxTable.Meta):
-        model = PowerFeedCoordinate
-        fields = ('pk', 'id', 'group', 'device', 'x', 'y')
-        default_columns = ('id', 'group', 'device', 'x', 'y')
-
-class CoordinateListTable(NetBoxTable):
-    group = tables.Column(
-        linkify=True
+    content_type = ContentTypeColumn(
+        verbose_name='Object Type'
     )
 
-    device = tables.Column(
-        linkify=True
+    assigned_object = tables.Column(
+        linkify=True,
+        orderable=False,
+        verbose_name='Object'
     )
 
     class Meta(NetBoxTable.Meta):
         model = Coordinate
-        fields = ('pk', 'id', 'group', 'device', 'x', 'y')
-        default_columns = ('id', 'group', 'device', 'x', 'y')
+        fields = ('pk', 'id', 'group', 'content_type', 'assigned_object', 'x', 'y')
+        default_columns = ('id', 'group', 'content_type', 'assigned_object', 'x', 'y')
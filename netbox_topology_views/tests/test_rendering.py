@@ -0,0 +1,31 @@
+import re
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from netbox_topology_views.rendering import iter_svg
+
+SVG_IMAGE = b'<svg xmlns="http://www.w3.org/2000/svg" width="1" height="1"/>'
+
+
+class RenderingTestCase(SimpleTestCase):
+    def test_embedded_images_are_base64_data_uris(self):
+        with tempfile.TemporaryDirectory() as static_root:
+            image_dir = Path(static_root) / "netbox_topology_views/img"
+            image_dir.mkdir(parents=True)
+            (image_dir / "switch.svg").write_bytes(SVG_IMAGE)
+
+            data = {
+                "nodes": [
+                    {"id": 1, "label": "switch", "image": settings.STATIC_URL + "netbox_topology_views/img/switch.svg"},
+                ],
+                "edges": [],
+            }
+            with override_settings(STATIC_ROOT=static_root):
+                svg = "".join(iter_svg(data))
+
+        hrefs = re.findall(r'<image [^>]*\bhref="([^"]*)"', svg)
+        self.assertEqual(len(hrefs), 1)
+        self.assertTrue(hrefs[0].startswith("data:image/svg+xml;base64,"), hrefs[0][:40])
@@ -0,0 +1,83 @@
+from io import StringIO
+
+from dcim.models import Device
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from netbox_topology_views.models import IndividualOptions
+from netbox_topology_views.views import TopologyContext, get_topology_data
+
+PREFIX = "topo-test"
+
+# Every option which adds queries is enabled
+TOPOLOGY_SETTINGS = {
+    "save_coords": False,
+    "show_unconnected": True,
+    "show_cables": True,
+    "show_circuit": True,
+    "show_logical_connections": True,
+    "show_single_cable_logical_conns": True,
+    "show_neighbors": True,
+    "show_power": True,
+    "show_wireless": True,
+    "group_sites": False,
+    "group_locations": False,
+    "group_racks": False,
+}
+
+
+class TopologyQueryCountTestCase(TestCase):
+    """
+    The number of queries of a topology build must not grow with the number of
+    devices, cables, circuits and power feeds
+    """
+
+    def generate_data(self, scale: int):
+        # Replaces the objects generated before with the same prefix
+        call_command(
+            "generate_topology_data",
+            prefix=PREFIX,
+            sites=2,
+            racks_per_site=2,
+            devices_per_rack=3 * scale,
+            interfaces_per_device=4,
+            circuits_per_site=2 * scale,
+            power_feeds_per_site=2 * scale,
+            wireless_links_per_site=scale,
+            coordinates=True,
+            stdout=StringIO(),
+        )
+
+    def build_topology(self):
+        return get_topology_data(
+            queryset=Device.objects.filter(site__slug__startswith=f"{PREFIX}-").select_related("device_type", "role"),
+            individualOptions=IndividualOptions(ignore_cable_type=""),
+            group_id="default",
+            context=TopologyContext.create("default"),
+            **TOPOLOGY_SETTINGS,
+        )
+
+    def count_queries(self):
+        # The first build fills process wide caches, e.g. the content types
+        self.build_topology()
+        with CaptureQueriesContext(connection) as queries:
+            topology = self.build_topology()
+        return len(queries), topology
+
+    def test_query_count_is_constant(self):
+        self.generate_data(1)
+        small_queries, small_topology = self.count_queries()
+
+        self.generate_data(3)
+        large_queries, large_topology = self.count_queries()
+
+        self.assertEqual(Device.objects.filter(site__slug__startswith=f"{PREFIX}-").count(), 36)
+        self.assertGreater(len(large_topology["nodes"]), len(small_topology["nodes"]))
+        self.assertGreater(len(large_topology["edges"]), len(small_topology["edges"]))
+        self.assertEqual(
+            small_queries,
+            large_queries,
+            "the number of queries of get_topology_data grows with the number of devices",
+        )
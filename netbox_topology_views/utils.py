@@ -1,9 +1,12 @@
 from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
-from typing import Type
+from typing import Iterator, Optional, Type
+from xml.sax.saxutils import XMLGenerator
 import base64
-import xml.dom.minidom
+import io
+import mimetypes
+import os
 
 import sys
 
@@ -180,62 +183,136 @@ def get_query_settings(request):
     
     return filter_id, save_coords, show_unconnected, show_power, show_circuit, show_logical_connections, show_single_cable_logical_conns, show_cables, show_wireless, group_sites, group_locations, group_racks, show_neighbors
 
+def get_topology_delta(previous: dict, current: dict) -> dict:
+    """
+    returns the nodes and edges that have been added, changed or removed
+    between two topologies built by get_topology_data
+
+    nodes and edges are matched by their id, removed items are only listed by id
+    """
+    delta = {}
+    for key in ("nodes", "edges"):
+        old_items = {item["id"]: item for item in (previous or {}).get(key, [])}
+        new_items = {item["id"]: item for item in (current or {}).get(key, [])}
+        delta[key] = {
+            "added": [item for id, item in new_items.items() if id not in old_items],
+            "changed": [
+                item for id, item in new_items.items()
+                if id in old_items and old_items[id] != item
+            ],
+            "removed": [id for id in old_items if id not in new_items],
+        }
+    return delta
+
 class LinePattern():
     wireless = [2, 10, 2, 10]
     power = [5, 5, 3, 3]
     logical = [1, 10, 1, 10]
 
     
-def export_data_to_xml(data: dict):
+# Size of the chunks yielded by iter_data_to_xml
+XML_CHUNK_SIZE = 64 * 1024
+
+MXGRAPHMODEL_ATTRIBUTES = {
+    'dx': '0',
+    'dy': '0',
+    'grid': '0',
+    'guides': '1',
+    'tooltips': '1',
+    'connect': '1',
+    'arrows': '1',
+    'fold': '1',
+    'page': '1',
+    'pageScale': '1',
+    'pageWidth': '827',
+    'pageHeight': '1169',
+    'background': 'none',
+    'math': '0',
+    'shadow': '0',
+}
+
+
+def write_mxcell(xml_writer: XMLGenerator, cell: dict, geometry: Optional[dict] = None):
+    xml_writer.startElement('mxCell', cell)
+    if geometry is not None:
+        xml_writer.startElement('mxGeometry', geometry)
+        xml_writer.endElement('mxGeometry')
+    xml_writer.endElement('mxCell')
+
+
+@lru_cache(maxsize=256)
+def encode_image(path: str, mtime: float) -> str:
+    """
+    returns the image as data URI for draw.io styles
+
+    Cached per process, the modification time is part of the key so that changed
+    images are read again.
+    """
+    mime_type = mimetypes.guess_type(path)[0] or 'image/svg+xml'
+    with open(path, "rb") as img:
+        return f"data:{mime_type}," + base64.b64encode(img.read()).decode('utf-8')
+
+
+@lru_cache(maxsize=256)
+def encode_image_uri(path: str, mtime: float) -> str:
+    """
+    returns the image as base64 data URI for SVG and HTML documents
+
+    Unlike the draw.io styles of encode_image the URI needs the ;base64 marker.
+    Cached the same way by path and modification time.
+    """
+    mime_type = mimetypes.guess_type(path)[0] or 'image/svg+xml'
+    with open(path, "rb") as img:
+        return f"data:{mime_type};base64," + base64.b64encode(img.read()).decode('utf-8')
+
+
+def iter_data_to_xml(data: dict, image_base_url: Optional[str] = None) -> Iterator[bytes]:
+    """
+    yields the topology as draw.io (mxfile) document in chunks
+
+    The document is written element by element, so neither a DOM nor the whole
+    document is held in memory. Each distinct image is looked up once per export.
+    If image_base_url is set (e.g. "https://netbox.example.com"), the images are
+    linked instead of embedded, which keeps the document small but requires
+    draw.io to reach NetBox.
+    """
     if data is None:
-        return ''
+        return
+
+    # draw.io image references by image URL of the nodes
+    images = {}
+
+    def get_image(url: str) -> str:
+        if url not in images:
+            if image_base_url is not None:
+                images[url] = image_base_url.rstrip('/') + url
+            else:
+                path = settings.STATIC_ROOT + '/' + get_image_from_url(url)
+                images[url] = encode_image(path, os.stat(path).st_mtime)
+        return images[url]
+
+    buffer = io.BytesIO()
+    xml_writer = XMLGenerator(buffer, encoding='UTF-8', short_empty_elements=True)
+
+    def flush(force: bool = False):
+        if force or buffer.tell() >= XML_CHUNK_SIZE:
+            chunk = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return chunk
+        return None
 
     # static xml header
-    doc = xml.dom.minidom.Document()
-    mxfile = doc.createElement('mxfile')
-    mxfile.setAttribute('host', 'app.diagrams.net')
-    mxfile.setAttribute('type', 'device')
-    diagram = doc.createElement('diagram')
-    diagram.setAttribute('name', 'topology')
-    diagram.setAttribute('id', 'someid')
-
-    doc.appendChild(mxfile)
-    mxfile.appendChild(diagram)
-
-    # mxGraphModel
-    mxgraphmodel = doc.createElement('mxGraphModel')
-    mxgraphmodel.setAttribute('dx', '0')
-    mxgraphmodel.setAttribute('dy', '0')
-    mxgraphmodel.setAttribute('grid', '0')
-    mxgraphmodel.setAttribute('guides', '1')
-    mxgraphmodel.setAttribute('tooltips', '1')
-    mxgraphmodel.setAttribute('connect', '1')
-    mxgraphmodel.setAttribute('arrows', '1')
-    mxgraphmodel.setAttribute('fold', '1')
-    mxgraphmodel.setAttribute('page', '1')
-    mxgraphmodel.setAttribute('pageScale', '1')
-    mxgraphmodel.setAttribute('pageWidth', '827')
-    mxgraphmodel.setAttribute('pageHeight', '1169')
-    mxgraphmodel.setAttribute('background', 'none')
-    mxgraphmodel.setAttribute('math', '0')
-    mxgraphmodel.setAttribute('shadow', '0')
-
-    diagram.appendChild(mxgraphmodel)
-
-    # root
-    root = doc.createElement('root')
-
-    mxgraphmodel.appendChild(root)
+    xml_writer.startDocument()
+    xml_writer.startElement('mxfile', {'host': 'app.diagrams.net', 'type': 'device'})
+    xml_writer.startElement('diagram', {'name': 'topology', 'id': 'someid'})
+    xml_writer.startElement('mxGraphModel', MXGRAPHMODEL_ATTRIBUTES)
+    xml_writer.startElement('root', {})
 
     # mxCells
     # header
-    mxcell = doc.createElement('mxCell')
-    mxcell.setAttribute('id', '0')
-    root.appendChild(mxcell)
-    mxcell = doc.createElement('mxCell')
-    mxcell.setAttribute('id', '1')
-    mxcell.setAttribute('parent', '0')
-    root.appendChild(mxcell)
+    write_mxcell(xml_writer, {'id': '0'})
+    write_mxcell(xml_writer, {'id': '1', 'parent': '0'})
 
     # edges
     for edge in data['edges']:
@@ -247,85 +324,77 @@ def export_data_to_xml(data: dict):
                 dashes = 'dashed=1;dashPattern=6 6;'
             if edge['dashes'] == LinePattern().logical:
                 dashes = 'dashed=1;dashPattern=1 4;strokeWidth=2;'
-            
-        mxcell = doc.createElement('mxCell')
-        mxcell.setAttribute('id', 'edge_' + str(edge['id']))
-        mxcell.setAttribute('style', 'rounded=0;orthogonalLoop=1;jettySize=auto;html=1;endArrow=none;endFill=0;strokeColor=' + edge['color'] + ';' + dashes)
-        mxcell.setAttribute('edge', '1')
-        mxcell.setAttribute('parent', '1')
-        mxcell.setAttribute('source', 'node_' + str(edge['from']))
-        mxcell.setAttribute('target', 'node_' + str(edge['to']))
-
-        root.appendChild(mxcell)
 
-        mxgeometry = doc.createElement('mxGeometry')
-        mxgeometry.setAttribute('relative', '1')
-        mxgeometry.setAttribute('as', 'geometry')
-
-        mxcell.appendChild(mxgeometry)
+        write_mxcell(
+            xml_writer,
+            {
+                'id': 'edge_' + str(edge['id']),
+                'style': 'rounded=0;orthogonalLoop=1;jettySize=auto;html=1;endArrow=none;endFill=0;strokeColor=' + edge['color'] + ';' + dashes,
+                'edge': '1',
+                'parent': '1',
+                'source': 'node_' + str(edge['from']),
+                'target': 'node_' + str(edge['to']),
+            },
+            {'relative': '1', 'as': 'geometry'},
+        )
+        chunk = flush()
+        if chunk:
+            yield chunk
 
     # nodes
     noPositionX = 0
     noPositionY = 1000
     for node in data['nodes']:
-        with open(settings.STATIC_ROOT + '/' + get_image_from_url(node['image']), "rb") as img:
-            svg = base64.b64encode(img.read()).decode('utf-8')
-        mxcell = doc.createElement('mxCell')
-        mxcell.setAttribute('id', 'node_' + str(node['id']))
-        mxcell.setAttribute('value', str(node['label']))
-        mxcell.setAttribute('style', 'shape=image;verticalLabelPosition=bottom;verticalAlign=top;imageAspect=0;aspect=fixed;image=data:image/svg+xml,' + svg + ';perimeter=elippsePerimeter;fontSize=10;strokeWidth=1;fontColor=#000000;')
-        mxcell.setAttribute('vertex', '1')
-        mxcell.setAttribute('parent', '1')
-
-        root.appendChild(mxcell)
-
-        mxgeometry = doc.createElement('mxGeometry')
         # Check if x and y values are stored in the database and set pseudo
         # coordinates if not. Otherwise icons will not be exported / KeyError is raised
         if 'x' in node:
-            mxgeometry.setAttribute('x', str(node['x']))
+            x = node['x']
         else:
             # Set next pseudo coordinates
             if noPositionX > 2500:
                 noPositionX = 100
                 noPositionY = noPositionY + 100
             else:
-                noPositionX = noPositionX + 100                
-
-            mxgeometry.setAttribute('x', str(noPositionX))
-        if 'y' in node:
-            mxgeometry.setAttribute('y', str(node['y']))
-        else:
-            mxgeometry.setAttribute('y', str(noPositionY))
-
-        mxgeometry.setAttribute('width', '50')
-        mxgeometry.setAttribute('height', '50')
-        mxgeometry.setAttribute('as', 'geometry')
-
-        mxcell.appendChild(mxgeometry)
+                noPositionX = noPositionX + 100
+            x = noPositionX
+        y = node['y'] if 'y' in node else noPositionY
+
+        write_mxcell(
+            xml_writer,
+            {
+                'id': 'node_' + str(node['id']),
+                'value': str(node['label']),
+                'style': 'shape=image;verticalLabelPosition=bottom;verticalAlign=top;imageAspect=0;aspect=fixed;image=' + get_image(node['image']) + ';perimeter=elippsePerimeter;fontSize=10;strokeWidth=1;fontColor=#000000;',
+                'vertex': '1',
+                'parent': '1',
+            },
+            {'x': str(x), 'y': str(y), 'width': '50', 'height': '50', 'as': 'geometry'},
+        )
+        chunk = flush()
+        if chunk:
+            yield chunk
 
     # Place a warning if one or more icons are misplaced because of missing coordinates
     if noPositionX > 0:
-        mxcell = doc.createElement('mxCell')
-        mxcell.setAttribute('id', 'noPositionWarning')
-        mxcell.setAttribute('value', 'One or more icons are misplaced. This happens if no coordinates are stored for a device. Turn on coordinates saving and make sure to drag all icons in the topology to a specific position before exporting to XML.')
-        mxcell.setAttribute('style', 'text;html=1;strokeColor=none;fillColor=none;align=center;verticalAlign=middle;whiteSpace=wrap;rounded=0;fontColor=#FF0000;fontStyle=0;fontSize=35;labelBackgroundColor=#FFFF99;labelBorderColor=none;strokeWidth=20;')
-        mxcell.setAttribute('vertex', '1')
-        mxcell.setAttribute('parent', '1')
-        
-        root.appendChild(mxcell)
-
-        mxgeometry = doc.createElement('mxGeometry')
-        mxgeometry.setAttribute('x', '0')
-        mxgeometry.setAttribute('y', '0')
-        mxgeometry.setAttribute('width', '870')
-        mxgeometry.setAttribute('height', '100')
-        mxgeometry.setAttribute('as', 'geometry')
-
-        mxcell.appendChild(mxgeometry)
-
-    # debug output
-    # print(doc.toprettyxml())
-
-    return doc.toxml(encoding='UTF-8')
-    
\ No newline at end of file
+        write_mxcell(
+            xml_writer,
+            {
+                'id': 'noPositionWarning',
+                'value': 'One or more icons are misplaced. This happens if no coordinates are stored for a device. Turn on coordinates saving and make sure to drag all icons in the topology to a specific position before exporting to XML.',
+                'style': 'text;html=1;strokeColor=none;fillColor=none;align=center;verticalAlign=middle;whiteSpace=wrap;rounded=0;fontColor=#FF0000;fontStyle=0;fontSize=35;labelBackgroundColor=#FFFF99;labelBorderColor=none;strokeWidth=20;',
+                'vertex': '1',
+                'parent': '1',
+            },
+            {'x': '0', 'y': '0', 'width': '870', 'height': '100', 'as': 'geometry'},
+        )
+
+    xml_writer.endElement('root')
+    xml_writer.endElement('mxGraphModel')
+    xml_writer.endElement('diagram')
+    xml_writer.endElement('mxfile')
+    xml_writer.endDocument()
+    yield flush(force=True)
+
+
+def export_data_to_xml(data: dict, image_base_url: Optional[str] = None) -> bytes:
+    return b''.join(iter_data_to_xml(data, image_base_url))
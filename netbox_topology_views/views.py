@@ -1,16 +1,16 @@
 import json
-from functools import reduce
-from typing import DefaultDict, Dict, Optional, Union
+from dataclasses import dataclass
+from functools import cached_property, reduce
+from typing import DefaultDict, Dict, List, NamedTuple, Optional, Set, Tuple, Union
 import time
 from itertools import chain
 
 from utilities.htmx import is_htmx
-from circuits.models import Circuit, CircuitTermination, ProviderNetwork
+from circuits.models import Circuit, CircuitTermination
 from dcim.models import (
     Cable,
     CableTermination,
     Device,
-    device_components,
     DeviceRole,
     FrontPort,
     Interface,
@@ -22,7 +22,9 @@ from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import PermissionRequiredMixin
 from django.contrib.contenttypes.models import ContentType
-from django.db.models import Q, QuerySet, Count
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.db.models import Q, QuerySet, Count, Prefetch
 from django.db.models.functions import Lower
 from django.http import HttpRequest, HttpResponseRedirect, QueryDict
 from django.shortcuts import render, get_object_or_404
@@ -37,36 +39,38 @@ from netbox.views.generic import (
     ObjectChangeLogView, 
     BulkImportView
 )
-from netbox_topology_views.filters import DeviceFilterSet, CoordinatesFilterSet, CircuitCoordinatesFilterSet, PowerPanelCoordinatesFilterSet, PowerFeedCoordinatesFilterSet
+from netbox_topology_views.caching import (
+    CACHE_MISS,
+    get_build_result_key,
+    get_cache_timeout,
+    get_topology_build_key,
+    get_topology_cache_key,
+    get_topology_etag,
+)
+from netbox_topology_views.compression import compress_response
+from netbox_topology_views.coordinate_io import FILE_FORMATS, get_export_response, import_coordinates
+from netbox_topology_views.filters import DeviceFilterSet, CoordinatesFilterSet
+from netbox_topology_views.jobs import enqueue_topology_build, get_completed_topology_build
+from netbox_topology_views.metrics import observe_topology
+from netbox_topology_views.profiling import TopologyProfiler, set_request_profiler
 from netbox_topology_views.forms import (
     DeviceFilterForm, 
     IndividualOptionsForm, 
     CoordinateGroupsForm, 
-    CircuitCoordinatesForm, 
-    CircuitCoordinatesFilterForm, 
-    CircuitCoordinatesImportForm,
-    PowerPanelCoordinatesForm, 
-    PowerPanelCoordinatesFilterForm, 
-    PowerPanelCoordinatesImportForm,
-    PowerFeedCoordinatesForm, 
-    PowerFeedCoordinatesFilterForm, 
-    PowerFeedCoordinatesImportForm,
+    CoordinateGroupCloneForm,
+    CoordinateGroupFileImportForm,
     CoordinatesForm, 
     CoordinatesFilterForm, 
     CoordinateGroupsImportForm,
     CoordinatesImportForm
 )
-import netbox_topology_views.models
 from netbox_topology_views.models import (
     RoleImage, 
     IndividualOptions, 
     CoordinateGroup, 
     Coordinate, 
-    CircuitCoordinate, 
-    PowerPanelCoordinate, 
-    PowerFeedCoordinate,
 )
-from netbox_topology_views.tables import CoordinateGroupListTable, CoordinateListTable, CircuitCoordinateListTable, PowerPanelCoordinateListTable, PowerFeedCoordinateListTable
+from netbox_topology_views.tables import CoordinateGroupListTable, CoordinateListTable
 from netbox_topology_views.utils import (
     CONF_IMAGE_DIR,
     find_image_url,
@@ -78,33 +82,111 @@ from netbox_topology_views.utils import (
     IMAGE_FILETYPES
 )
 
+class CableLink(NamedTuple):
+    """
+    A cable termination of a device, as read by the cable phase of get_topology_data
+    """
+    id: int
+    cable_id: int
+    cable_end: str
+    termination_type_id: int
+    termination_id: int
+    device_id: int
+    device_name: str
+
+
+@dataclass
+class TopologyContext:
+    """
+    Request-scoped data that is needed for every node of a topology. It is built once
+    per request so that creating a node does not need any database round trip.
+    """
+    group_id: Union[int, str, None]
+    group: Optional[CoordinateGroup]
+    content_type_ids: Dict[type, int]
+    role_images: Dict[int, str]
+    content_type_images: Dict[int, str]
+
+    @classmethod
+    def create(cls, group_id="default"):
+        coordinate_group_id = group_id
+        if group_id is None or group_id == "default":
+            coordinate_group_id = Coordinate.get_or_create_default_group(group_id)
+            if not coordinate_group_id:
+                print('Exception occured while handling default group.')
+        group = (
+            get_object_or_404(CoordinateGroup, pk=coordinate_group_id)
+            if coordinate_group_id
+            else None
+        )
+
+        content_type_ids = {
+            model: ct.pk
+            for model, ct in ContentType.objects.get_for_models(*ADDITIONAL_ROLES).items()
+        }
+
+        role_images = {}
+        content_type_images = {}
+        for role_image in RoleImage.objects.select_related("content_type"):
+            if role_image.object_id is not None:
+                role_images[role_image.object_id] = role_image.get_image_url()
+            else:
+                content_type_images[role_image.content_type_id] = role_image.get_image_url()
+
+        return cls(
+            group_id=group_id,
+            group=group,
+            content_type_ids=content_type_ids,
+            role_images=role_images,
+            content_type_images=content_type_images,
+        )
 
+    @cached_property
+    def positions(self):
+        if self.group is None:
+            return {}
+        return self.group.get_positions()
 
-def get_image_for_entity(entity: Union[Device, Circuit, PowerPanel, PowerFeed]):
+
+def get_image_for_entity(
+    entity: Union[Device, Circuit, PowerPanel, PowerFeed],
+    context: Optional[TopologyContext] = None,
+):
     is_device = isinstance(entity, Device)
-    query = (
-        {"object_id": entity.role_id}
-        if is_device
-        else {"content_type_id": ContentType.objects.get_for_model(entity).pk}
-    )
 
-    try:
-        return RoleImage.objects.get(**query).get_image_url()
-    except RoleImage.DoesNotExist:
-        return find_image_url(
-            entity.device_role.slug if is_device else get_model_slug(entity.__class__)
+    if context is None:
+        query = (
+            {"object_id": entity.role_id}
+            if is_device
+            else {"content_type_id": ContentType.objects.get_for_model(entity).pk}
         )
+        try:
+            return RoleImage.objects.get(**query).get_image_url()
+        except RoleImage.DoesNotExist:
+            pass
+    elif is_device and entity.role_id in context.role_images:
+        return context.role_images[entity.role_id]
+    elif not is_device:
+        content_type_id = context.content_type_ids.get(entity.__class__)
+        if content_type_id in context.content_type_images:
+            return context.content_type_images[content_type_id]
+
+    return find_image_url(
+        entity.device_role.slug if is_device else get_model_slug(entity.__class__)
+    )
 
 
 def create_node(
-    device: Union[Device, Circuit, PowerPanel, PowerFeed], save_coords: bool, group_id="default"
+    device: Union[Device, Circuit, PowerPanel, PowerFeed],
+    save_coords: bool,
+    group_id="default",
+    context: Optional[TopologyContext] = None,
 ):
     node = {}
     node_content = ""
     if isinstance(device, Circuit):
         dev_name = device.cid
         node["id"] = f"c{device.pk}"
-        model_name = 'CircuitCoordinate'
 
         if device.provider is not None:
             node_content += (
@@ -115,7 +197,6 @@ def create_node(
     elif isinstance(device, PowerPanel):
         dev_name = device.name
         node["id"] = f"p{device.pk}"
-        model_name = 'PowerPanelCoordinate'
 
         if device.site is not None:
             node_content += f"<tr><th>Site: </th><td>{device.site.name}</td></tr>"
@@ -126,7 +207,6 @@ def create_node(
     elif isinstance(device, PowerFeed):
         dev_name = device.name
         node["id"] = f"f{device.pk}"
-        model_name = 'PowerFeedCoordinate'
 
         if device.power_panel is not None:
             node_content += (
@@ -143,7 +223,6 @@ def create_node(
         if device.voltage is not None:
             node_content += f"<tr><th>Voltage: </th><td>{device.voltage}</td></tr>"
     else:
-        model_name = 'Coordinate'
         dev_name = device.name
         if dev_name is None:
             dev_name = device.device_type.get_full_name
@@ -193,27 +272,33 @@ def create_node(
         if device.device_role.color != "":
             node["color.border"] = "#" + device.device_role.color
 
-    model_class = getattr(netbox_topology_views.models, model_name)
-
-    if group_id is None or group_id == "default":
-        group_id = model_class.get_or_create_default_group(group_id)
-        if not group_id:
-            print('Exception occured while handling default group.')
-            return node
-   
-    group = get_object_or_404(CoordinateGroup, pk=group_id)
+    if context is None:
+        # Standalone call: look up the coordinates of this single node
+        if group_id is None or group_id == "default":
+            group_id = Coordinate.get_or_create_default_group(group_id)
+            if not group_id:
+                print('Exception occured while handling default group.')
+                return node
+
+        group = get_object_or_404(CoordinateGroup, pk=group_id)
+        position = Coordinate.objects.filter(
+            group=group,
+            content_type=ContentType.objects.get_for_model(device),
+            object_id=device.pk,
+        ).values_list('x', 'y').first()
+    else:
+        position = context.positions.get(node["id"])
 
     node["physics"] = True
-    # Coords must be set even if no coords have been stored. Otherwise nodes with coords 
+    # Coords must be set even if no coords have been stored. Otherwise nodes with coords
     # will not be placed correctly by vis-network.
     node["x"] = 0
     node["y"] = 0
-    if model_class.objects.filter(group=group, device=device.pk).values('x') and model_class.objects.filter(group=group, device=device.pk).values('y'):
+    if position is not None:
         # Coordinates data for the device exists in Coordinates Group. Let's assign them
-        node["x"] = model_class.objects.get(group=group, device=device.pk).x
-        node["y"] = model_class.objects.get(group=group, device=device.pk).y
+        node["x"], node["y"] = position
         node["physics"] = False
-    elif "coordinates" in device.custom_field_data:
+    elif CONFIG["coordinates_custom_field_fallback"] and "coordinates" in device.custom_field_data:
         # We prefer the new Coordinate model but leave the deprecated method 
         # for now as fallback for compatibility reasons
         if device.custom_field_data["coordinates"] is not None:
@@ -229,13 +314,13 @@ def create_node(
     node["label"] = dev_name
     node["shape"] = "image"
     node["href"] = device.get_absolute_url()
-    node["image"] = get_image_for_entity(device)
+    node["image"] = get_image_for_entity(device, context)
 
     return node
 
 
 def create_edge(
-    edge_id: int,
+    edge_id: str,
     termination_a: Dict,
     termination_b: Dict,
     circuit: Optional[Dict] = None,
@@ -303,26 +388,134 @@ def create_edge(
     return edge
 
 
-def create_circuit_termination(termination):
-    if isinstance(termination, CircuitTermination):
+def get_cable_end(cable: Cable, cable_end: str) -> Optional[CableTermination]:
+    # Uses the prefetched terminations of the cable instead of a_terminations/b_terminations
+    return next(
+        (link for link in cable.terminations.all() if link.cable_end == cable_end), None
+    )
+
+
+def create_circuit_termination(
+    link: CableTermination, circuit_terminations: Dict[int, CircuitTermination]
+):
+    if link is None:
+        return None
+    if link.termination_type.model_class() == CircuitTermination:
+        termination = circuit_terminations.get(link.termination_id, link.termination)
         return {
             "termination_name": termination.circuit.provider.name,
             "termination_device_name": termination.circuit.cid,
             "device_id": "c{}".format(termination.circuit.pk),
         }
     if (
-        isinstance(termination, Interface)
-        or isinstance(termination, FrontPort)
-        or isinstance(termination, RearPort)
+        isinstance(link.termination, Interface)
+        or isinstance(link.termination, FrontPort)
+        or isinstance(link.termination, RearPort)
     ):
         return {
-            "termination_name": termination.name,
-            "termination_device_name": termination.device.name,
-            "device_id": termination.device.pk,
+            "termination_name": link.termination.name,
+            "termination_device_name": link._device.name,
+            "device_id": link._device_id,
         }
     return None
 
 
+def get_neighbor_device_ids(device_ids: Set[int], depth: int = 1) -> Set[int]:
+    """
+    Add the devices that are connected by cable to an interface, front port or rear
+    port of the given devices. Each hop takes two queries, no matter how many ports
+    the devices have. Every hop adds at most max_neighbors_per_hop devices.
+
+    returns a new set containing the given and the neighboring device ids
+    """
+    port_types = ContentType.objects.get_for_models(Interface, FrontPort, RearPort).values()
+    max_neighbors = CONFIG["max_neighbors_per_hop"]
+    depth = max(1, min(depth, CONFIG["max_neighbor_depth"]))
+
+    known_device_ids = set(device_ids)
+    frontier = set(device_ids)
+    for hop in range(depth):
+        if not frontier:
+            break
+
+        # Cable ends of the ports on the outermost devices
+        port_links = CableTermination.objects.filter(
+            _device_id__in=frontier, termination_type__in=port_types
+        ).values_list("cable_id", "cable_end")
+        cable_ends = set(port_links)
+
+        # Link peers: devices on the opposite end of the same cables
+        peer_links = CableTermination.objects.filter(
+            cable_id__in=port_links.values("cable_id"), _device_id__isnull=False
+        ).values_list("cable_id", "cable_end", "_device_id")
+        neighbors = {
+            peer_device_id
+            for cable_id, cable_end, peer_device_id in peer_links
+            if peer_device_id not in known_device_ids
+            and (cable_id, "B" if cable_end == "A" else "A") in cable_ends
+        }
+
+        if max_neighbors and len(neighbors) > max_neighbors:
+            neighbors = set(sorted(neighbors)[:max_neighbors])
+
+        known_device_ids |= neighbors
+        frontier = neighbors
+
+    return known_device_ids
+
+
+def get_logical_connections(device_ids: Set[int]) -> List[Tuple[Interface, Interface]]:
+    """
+    Resolve the far end interfaces of all complete cable paths that start at an
+    interface of the given devices. The destinations are read from the stored path
+    of the CablePath and fetched in one bulk query, instead of loading
+    path.destinations for every interface.
+
+    returns a list of (interface, destination interface) tuples
+    """
+    if not device_ids:
+        return []
+
+    interface_type_id = ContentType.objects.get_for_model(Interface).pk
+    interfaces = Interface.objects.filter(
+        _path__is_complete=True, device_id__in=device_ids
+    ).select_related("device", "_path")
+
+    interface_destinations = []
+    destination_ids = set()
+    for interface in interfaces:
+        # The last hop of a complete path holds its destinations as "<content type>:<id>"
+        path = interface._path.path
+        ids = []
+        for path_node in path[-1] if path else []:
+            content_type_id, object_id = path_node.split(":")
+            if int(content_type_id) == interface_type_id:
+                ids.append(int(object_id))
+        interface_destinations.append((interface, ids))
+        destination_ids.update(ids)
+
+    destinations = Interface.objects.select_related("device").in_bulk(destination_ids)
+
+    return [
+        (interface, destinations[destination_id])
+        for interface, ids in interface_destinations
+        for destination_id in ids
+        if destination_id in destinations
+    ]
+
+
+# Relations create_node reads from a device
+NODE_DEVICE_RELATED = (
+    "device_type__manufacturer",
+    "role",
+    "site",
+    "location",
+    "rack",
+    "primary_ip4",
+    "primary_ip6",
+)
+
+
 def get_topology_data(
     queryset: QuerySet,
     individualOptions: IndividualOptions,
@@ -339,62 +532,76 @@ def get_topology_data(
     group_locations: bool,
     group_racks: bool,
     group_id,
+    context: Optional[TopologyContext] = None,
+    neighbor_depth: int = 1,
+    profiler: Optional[TopologyProfiler] = None,
 ):
     
     supported_termination_types = []
     for t in IndividualOptions.CHOICES:
         supported_termination_types.append(t[1])
 
+    if profiler is None:
+        profiler = TopologyProfiler()
+    profiler.phase("devices")
+
     if not queryset:
         return None
 
-    nodes_devices = {}
+    if context is None:
+        context = TopologyContext.create(group_id)
+
+    # Devices are collected by id and loaded in bulk once all connections are known
+    nodes_devices: Dict[int, None] = {}
     edges = []
     nodes = []
     options = {}
-    edge_ids = 0
     nodes_circuits: Dict[int, Circuit] = {}
     nodes_powerpanel: Dict[int, PowerPanel] = {}
     nodes_powerfeed: Dict[int, PowerFeed] = {}
     nodes_provider_networks = {}
     cable_ids = DefaultDict(dict)
-    interface_ids = DefaultDict(dict)
+    logical_connections = None
 
     ignore_cable_type = individualOptions.ignore_cable_type
 
-    device_ids = [d.pk for d in queryset]
+    device_ids = {d.pk for d in queryset}
     site_ids = [d.site_id for d in queryset]
 
-    if show_neighbors:
-        interfaces = Interface.objects.filter(
-            Q(device_id__in=device_ids)
-        )
-        frontports = FrontPort.objects.filter(
-            Q(device_id__in=device_ids)
-        )
-        rearports = RearPort.objects.filter(
-            Q(device_id__in=device_ids)
+    def count_collected():
+        return (
+            len(nodes_devices) + len(nodes_circuits) + len(nodes_powerpanel) + len(nodes_powerfeed),
+            len(edges),
         )
 
-        ports = chain(interfaces, frontports, rearports)
-        for port in ports:
-            for link_peer in port.link_peers:
-                if hasattr(link_peer, 'device') and link_peer.device.id not in device_ids:
-                    device_ids.append(link_peer.device.id)
+    profiler.phase("neighbors", count_collected)
+    if show_neighbors:
+        device_ids = get_neighbor_device_ids(device_ids, neighbor_depth)
 
         if show_logical_connections:
-            path_complete_interfaces = Interface.objects.filter(
-                Q(_path__is_complete=True) & Q(device_id__in=device_ids)
-            )
-            for path_complete_interface in path_complete_interfaces:
-                for connected_endpoint in path_complete_interface.connected_endpoints:
-                    if type(connected_endpoint) != ProviderNetwork:
-                        device_ids.append(connected_endpoint.device.id)
-
+            # Computed once and reused by the logical connection phase. Only the
+            # paths starting at the devices added here have to be resolved on top.
+            logical_connections = get_logical_connections(device_ids)
+            logical_device_ids = {
+                destination.device_id for _, destination in logical_connections
+            } - device_ids
+            device_ids |= logical_device_ids
+            logical_connections += get_logical_connections(logical_device_ids)
+
+    profiler.phase("circuits", count_collected)
     if show_circuit:
         circuit_terminations = CircuitTermination.objects.filter(
             Q(site_id__in=site_ids) | Q(provider_network__isnull=False)
-        ).prefetch_related("provider_network", "circuit")
+        ).select_related(
+            "provider_network", "circuit__provider", "circuit__type", "cable"
+        ).prefetch_related(
+            Prefetch(
+                "cable__terminations",
+                queryset=CableTermination.objects.select_related("termination_type", "_device"),
+            ),
+            "cable__terminations__termination",
+        )
+        circuit_terminations_by_id = {ct.pk: ct for ct in circuit_terminations}
         for circuit_termination in circuit_terminations:
             circuit_termination: CircuitTermination
             if (
@@ -409,11 +616,13 @@ def get_topology_data(
             termination_b = {}
             circuit_model = {}
             if circuit_termination.cable is not None:
+                link_a = get_cable_end(circuit_termination.cable, "A")
+                link_b = get_cable_end(circuit_termination.cable, "B")
                 termination_a = create_circuit_termination(
-                    circuit_termination.cable.a_terminations[0]
+                    link_a, circuit_terminations_by_id
                 )
                 termination_b = create_circuit_termination(
-                    circuit_termination.cable.b_terminations[0]
+                    link_b, circuit_terminations_by_id
                 )
             elif circuit_termination.provider_network is not None:
                 if (
@@ -428,10 +637,9 @@ def get_topology_data(
                 circuit_model = {
                     "provider_name": circuit_termination.circuit.provider.name
                 }
-                edge_ids += 1
                 edges.append(
                     create_edge(
-                        edge_id=edge_ids,
+                        edge_id=f"circuit-{circuit_termination.pk}",
                         cable=circuit_termination.cable,
                         circuit=circuit_model,
                         termination_a=termination_a,
@@ -440,19 +648,16 @@ def get_topology_data(
                 )
 
                 circuit_has_connections = False
-                for termination in [
-                    circuit_termination.cable.a_terminations[0],
-                    circuit_termination.cable.b_terminations[0],
-                ]:
-                    if not isinstance(termination, CircuitTermination):
+                for link in [link_a, link_b]:
+                    if link.termination_type.model_class() != CircuitTermination:
                         if (
-                            termination.device_id not in nodes_devices
-                            and termination.device_id in device_ids
+                            link._device_id not in nodes_devices
+                            and link._device_id in device_ids
                         ):
-                            nodes_devices[termination.device_id] = termination.device
+                            nodes_devices[link._device_id] = None
                             circuit_has_connections = True
                         else:
-                            if termination.device_id in device_ids:
+                            if link._device_id in device_ids:
                                 circuit_has_connections = True
 
                 if circuit_has_connections and not show_unconnected:
@@ -461,16 +666,24 @@ def get_topology_data(
                             circuit_termination.circuit.pk
                         ] = circuit_termination.circuit
 
-        for d in nodes_circuits.values():
-            nodes.append(create_node(d, save_coords, group_id))
-
+    profiler.phase("power", count_collected)
     if show_power:
         power_panels_ids = PowerPanel.objects.filter(
             Q(site_id__in=site_ids)
         ).values_list("pk", flat=True)
         power_feeds: QuerySet[PowerFeed] = PowerFeed.objects.filter(
             Q(power_panel_id__in=power_panels_ids)
-        )
+        ).select_related("power_panel__site", "power_panel__location")
+
+        # Load the far ends of all power feed cables at once instead of
+        # evaluating link_peers for every single power feed
+        power_feed_peers: Dict[tuple, CableTermination] = {}
+        if not show_unconnected:
+            peer_links = CableTermination.objects.filter(
+                cable_id__in=[pf.cable_id for pf in power_feeds if pf.cable_id is not None]
+            ).prefetch_related("termination")
+            for peer_link in peer_links:
+                power_feed_peers.setdefault((peer_link.cable_id, peer_link.cable_end), peer_link)
 
         for power_feed in power_feeds:
             if show_unconnected or (
@@ -482,13 +695,15 @@ def get_topology_data(
                 power_link_name = ""
                 if power_feed.pk not in nodes_powerfeed:
                     if not show_unconnected:
-                        if power_feed.link_peers[0].device_id in device_ids:
+                        peer_link = power_feed_peers.get(
+                            (power_feed.cable_id, "B" if power_feed.cable_end == "A" else "A")
+                        )
+                        if peer_link is not None and peer_link._device_id in device_ids:
                             nodes_powerfeed[power_feed.pk] = power_feed
-                            power_link_name = power_feed.link_peers[0].name
+                            power_link_name = peer_link.termination.name
                     else:
                         nodes_powerfeed[power_feed.pk] = power_feed
 
-                edge_ids += 1
                 termination_a = {
                     "termination_name": power_feed.power_panel.name,
                     "termination_device_name": "",
@@ -501,7 +716,7 @@ def get_topology_data(
                 }
                 edges.append(
                     create_edge(
-                        edge_id=edge_ids,
+                        edge_id=f"power-{power_feed.pk}",
                         termination_a=termination_a,
                         termination_b=termination_b,
                         power=True,
@@ -511,53 +726,50 @@ def get_topology_data(
                 if power_feed.cable_id is not None:
                     cable_ids[power_feed.cable_id][power_feed.cable_end] = termination_b
 
-        for d in nodes_powerfeed.values():
-            nodes.append(create_node(d, save_coords, group_id))
+    profiler.phase("logical", count_collected)
+    if show_logical_connections:
+        if logical_connections is None:
+            logical_connections = get_logical_connections(device_ids)
 
-        for d in nodes_powerpanel.values():
-            nodes.append(create_node(d, save_coords, group_id))
+        connected_interface_ids: Set[int] = set()
+        for interface, destination in logical_connections:
+            if destination.device_id not in device_ids:
+                # Destination interface not in device queryset, ignoring
+                continue
 
-    if show_logical_connections:
-        interfaces = Interface.objects.filter(
-            Q(_path__is_complete=True) & Q(device_id__in=device_ids)
-        )
+            if destination.id in connected_interface_ids:
+                # we've already captured the destination interface, ignore this connection
+                continue
 
-        for interface in interfaces:
-            # print('{} {} {} {}'.format(interface.device.name, interface.name, interface._path.destinations[0].device.name, interface._path.destinations[0].name))
-            for destination in interface._path.destinations:
-                if isinstance(destination, device_components.Interface):
-                    if destination.device.id not in device_ids:
-                        # print('Destination interface not in device queryset, ignoring')
-                        continue
-
-                    if destination.id in interface_ids:
-                        # we've already captured the destination interface, ignore this connection
-                        # print('Destination interface already exists, ignoring')
-                        continue
-
-                    if not show_single_cable_logical_conns and interface.cable_id==destination.cable_id and show_cables:
-                        # interface connection is the same as the cable connection, ignore this connection
-                        continue
-            
-                    interface_ids[interface.id]=interface
-                    edge_ids += 1
-                    termination_a = { "termination_name": interface.name, "termination_device_name": interface.device.name, "device_id": interface.device.id }
-                    termination_b = { "termination_name": destination.name, "termination_device_name": destination.device.name, "device_id": destination.device.id }
-                    edges.append(create_edge(edge_id=edge_ids, termination_a=termination_a, termination_b=termination_b, interface=interface))
-                    nodes_devices[interface.device.id] = interface.device
-                    nodes_devices[destination.device.id] = destination.device
+            if not show_single_cable_logical_conns and interface.cable_id == destination.cable_id and show_cables:
+                # interface connection is the same as the cable connection, ignore this connection
+                continue
 
+            connected_interface_ids.add(interface.id)
+            termination_a = { "termination_name": interface.name, "termination_device_name": interface.device.name, "device_id": interface.device_id }
+            termination_b = { "termination_name": destination.name, "termination_device_name": destination.device.name, "device_id": destination.device_id }
+            edges.append(create_edge(edge_id=f"logical-{interface.id}-{destination.id}", termination_a=termination_a, termination_b=termination_b, interface=interface))
+            nodes_devices[interface.device_id] = None
+            nodes_devices[destination.device_id] = None
+
+    profiler.phase("cables", count_collected)
     if show_cables:
-        links: QuerySet[CableTermination] = CableTermination.objects.filter(
+        # Plain rows instead of model instances, the termination names are resolved
+        # per termination type below instead of dereferencing the generic foreign key
+        links = CableTermination.objects.filter(
             Q(_device_id__in=device_ids)
-        ).select_related("termination_type")
+        ).values_list(
+            "id", "cable_id", "cable_end", "termination_type_id", "termination_id", "_device_id", "_device__name"
+        )
 
-        for link in links:
-            if link.termination_type.name in ignore_cable_type:
+        complete_links = []
+        for link in map(CableLink._make, links):
+            termination_type_name = ContentType.objects.get_for_id(link.termination_type_id).name
+            if termination_type_name in ignore_cable_type:
                 continue
 
             # Normal device cables
-            if link.termination_type.name in supported_termination_types:
+            if termination_type_name in supported_termination_types:
                 complete_link = False
                 if link.cable_end == "A":
                     if link.cable_id not in cable_ids:
@@ -578,69 +790,59 @@ def get_topology_data(
                 cable_ids[link.cable_id][link.cable_end] = link
 
                 if complete_link:
-                    edge_ids += 1
-                    if isinstance(cable_ids[link.cable_id]["B"], CableTermination):
-                        if cable_ids[link.cable_id]["B"]._device_id not in nodes_devices:
-                            nodes_devices[
-                                cable_ids[link.cable_id]["B"]._device_id
-                            ] = cable_ids[link.cable_id]["B"].termination.device
-                        termination_b = {
-                            "termination_name": cable_ids[link.cable_id][
-                                "B"
-                            ].termination.name,
-                            "termination_device_name": cable_ids[link.cable_id][
-                                "B"
-                            ].termination.device.name,
-                            "device_id": cable_ids[link.cable_id][
-                                "B"
-                            ].termination.device_id,
-                        }
-                    else:
-                        termination_b = cable_ids[link.cable_id]["B"]
-
-                    if isinstance(cable_ids[link.cable_id]["A"], CableTermination):
-                        if cable_ids[link.cable_id]["A"]._device_id not in nodes_devices:
-                            nodes_devices[
-                                cable_ids[link.cable_id]["A"]._device_id
-                            ] = cable_ids[link.cable_id]["A"].termination.device
-                        termination_a = {
-                            "termination_name": cable_ids[link.cable_id][
-                                "A"
-                            ].termination.name,
-                            "termination_device_name": cable_ids[link.cable_id][
-                                "A"
-                            ].termination.device.name,
-                            "device_id": cable_ids[link.cable_id][
-                                "A"
-                            ].termination.device_id,
-                        }
-                    else:
-                        termination_a = cable_ids[link.cable_id]["A"]
-
-                    edges.append(
-                        create_edge(
-                            edge_id=edge_ids,
-                            cable=link.cable,
-                            termination_a=termination_a,
-                            termination_b=termination_b,
-                        )
-                    )
+                    complete_links.append(link)
+
+        # One query per termination type for the names and one for the cables
+        termination_ids: DefaultDict[int, Set[int]] = DefaultDict(set)
+        for link in complete_links:
+            for cable_end in cable_ids[link.cable_id].values():
+                if isinstance(cable_end, CableLink):
+                    termination_ids[cable_end.termination_type_id].add(cable_end.termination_id)
+
+        termination_names: Dict[tuple, str] = {}
+        for termination_type_id, ids in termination_ids.items():
+            termination_model = ContentType.objects.get_for_id(termination_type_id).model_class()
+            for termination_id, name in termination_model.objects.filter(pk__in=ids).values_list("pk", "name"):
+                termination_names[(termination_type_id, termination_id)] = name
+
+        cables = Cable.objects.only("pk", "color").in_bulk(
+            {link.cable_id for link in complete_links}
+        )
+
+        def get_cable_termination(cable_end: Union[CableLink, Dict]) -> Dict:
+            if not isinstance(cable_end, CableLink):
+                return cable_end
+            nodes_devices[cable_end.device_id] = None
+            return {
+                "termination_name": termination_names.get(
+                    (cable_end.termination_type_id, cable_end.termination_id)
+                ),
+                "termination_device_name": cable_end.device_name,
+                "device_id": cable_end.device_id,
+            }
+
+        for link in complete_links:
+            termination_b = get_cable_termination(cable_ids[link.cable_id]["B"])
+            termination_a = get_cable_termination(cable_ids[link.cable_id]["A"])
+            edges.append(
+                create_edge(
+                    edge_id=f"cable-{link.cable_id}-{link.id}",
+                    cable=cables.get(link.cable_id),
+                    termination_a=termination_a,
+                    termination_b=termination_b,
+                )
+            )
 
+    profiler.phase("wireless", count_collected)
     if show_wireless:
         wlan_links: QuerySet[WirelessLink] = WirelessLink.objects.filter(
             Q(_interface_a_device_id__in=device_ids)
             & Q(_interface_b_device_id__in=device_ids)
-        )
+        ).select_related("interface_a__device", "interface_b__device")
 
         for wlan_link in wlan_links:
-            if wlan_link.interface_a.device_id not in nodes_devices:
-                nodes_devices[
-                    wlan_link.interface_a.device.pk
-                ] = wlan_link.interface_a.device
-            if wlan_link.interface_b.device_id not in nodes_devices:
-                nodes_devices[
-                    wlan_link.interface_b.device.pk
-                ] = wlan_link.interface_b.device
+            nodes_devices[wlan_link.interface_a.device_id] = None
+            nodes_devices[wlan_link.interface_b.device_id] = None
 
             termination_a = {
                 "termination_name": wlan_link.interface_a.name,
@@ -654,10 +856,9 @@ def get_topology_data(
             }
             wireless = {"ssid": wlan_link.ssid}
 
-            edge_ids += 1
             edges.append(
                 create_edge(
-                    edge_id=edge_ids,
+                    edge_id=f"wireless-{wlan_link.pk}",
                     cable=wlan_link,
                     termination_a=termination_a,
                     termination_b=termination_b,
@@ -672,15 +873,24 @@ def get_topology_data(
     if group_sites:
         options['group_sites'] = 'on'
 
+    profiler.phase("nodes", lambda: (len(nodes), len(edges)))
     for qs_device in queryset:
         if qs_device.pk not in nodes_devices and show_unconnected:
-            nodes_devices[qs_device.pk] = qs_device
+            nodes_devices[qs_device.pk] = None
 
-    results = {}
+    # Load everything needed to materialize the nodes with a fixed number of queries
+    devices = Device.objects.select_related(*NODE_DEVICE_RELATED).in_bulk(nodes_devices.keys())
 
-    for d in nodes_devices.values():
-        nodes.append(create_node(d, save_coords, group_id))
+    for d in chain(
+        nodes_circuits.values(),
+        nodes_powerfeed.values(),
+        nodes_powerpanel.values(),
+        (devices[pk] for pk in nodes_devices if pk in devices),
+    ):
+        nodes.append(create_node(d, save_coords, group_id, context))
+    profiler.stop()
 
+    results = {}
     results["nodes"] = nodes
     results["edges"] = edges
     results["group"] = group_id
@@ -688,6 +898,106 @@ def get_topology_data(
     return results
 
 
+def get_topology_settings(request) -> Dict:
+    """
+    Read the topology options from the request. Options stored in the selected
+    saved filter are applied as well, as NetBox does not handle custom plugin filters.
+
+    returns a dict of keyword arguments for get_topology_data
+    """
+    filter_id, save_coords, show_unconnected, show_power, show_circuit, show_logical_connections, show_single_cable_logical_conns, show_cables, show_wireless, group_sites, group_locations, group_racks, show_neighbors = get_query_settings(request)
+
+    topology_settings = {
+        "save_coords": save_coords,
+        "show_unconnected": show_unconnected,
+        "show_cables": show_cables,
+        "show_logical_connections": show_logical_connections,
+        "show_single_cable_logical_conns": show_single_cable_logical_conns,
+        "show_neighbors": show_neighbors,
+        "show_circuit": show_circuit,
+        "show_power": show_power,
+        "show_wireless": show_wireless,
+        "group_sites": group_sites,
+        "group_locations": group_locations,
+        "group_racks": group_racks,
+        "neighbor_depth": 1,
+    }
+
+    try:
+        topology_settings["neighbor_depth"] = max(1, int(request.GET.get("neighbor_depth", 1)))
+    except ValueError:
+        pass
+
+    if "filter_id" in request.GET and request.GET["filter_id"] != '':
+        try:
+            saved_filter = SavedFilter.objects.get(pk=filter_id)
+            saved_filter_params = getattr(saved_filter, 'parameters')
+
+            for option, value in topology_settings.items():
+                if value == False and option in saved_filter_params:
+                    topology_settings[option] = saved_filter_params[option]
+        except SavedFilter.DoesNotExist: # filter_id not found
+            pass
+        except Exception as inst:
+            print(type(inst))
+
+    return topology_settings
+
+
+def get_cached_topology_data(
+    request,
+    queryset: QuerySet,
+    individualOptions: IndividualOptions,
+    group_id,
+    topology_settings: Dict,
+    cache_key: Optional[str] = None,
+    view: str = "api",
+):
+    """
+    Serve the topology from Django's cache if an unchanged topology has already been
+    built for the same filter, options, coordinate group and permissions
+
+    view labels the metrics of the request, see observe_topology
+    """
+    start = time.perf_counter()
+    # Background builds store their result even if caching is disabled
+    if cache_key is None:
+        cache_key = get_topology_cache_key(request, individualOptions, group_id, topology_settings)
+    cached = cache.get(cache_key, CACHE_MISS)
+    if cached is not CACHE_MISS:
+        set_request_profiler(request, TopologyProfiler(cache_hit=True))
+        observe_topology(view, True, time.perf_counter() - start, cached)
+        return cached
+
+    profiler = TopologyProfiler()
+    with profiler:
+        topo_data = get_topology_data(
+            queryset=queryset,
+            individualOptions=individualOptions,
+            group_id=group_id,
+            context=TopologyContext.create(group_id),
+            profiler=profiler,
+            **topology_settings,
+        )
+    set_request_profiler(request, profiler)
+    profiler.log_if_slow(path=request.get_full_path(), user=request.user.username)
+
+    cache_timeout = get_cache_timeout()
+    if cache_timeout:
+        cache.set(cache_key, topo_data, cache_timeout)
+
+    observe_topology(view, False, time.perf_counter() - start, topo_data)
+    return topo_data
+
+
+def get_topology_profile(request) -> Optional[Dict]:
+    # The phases of the build are shown on the page in debug mode only
+    profiler = getattr(request, "topology_profiler", None)
+    if not settings.DEBUG or profiler is None:
+        return None
+    return profiler.as_dict()
+
+
 class TopologyHomeView(PermissionRequiredMixin, View):
     permission_required = ("dcim.view_site", "dcim.view_device")
 
@@ -703,36 +1013,16 @@ class TopologyHomeView(PermissionRequiredMixin, View):
         self.queryset = self.filterset(request.GET, self.queryset).qs
         self.model = self.queryset.model
         topo_data = None
+        topology_etag = None
+        topology_build = None
+        topology_build_pending = False
 
         individualOptions, created = IndividualOptions.objects.get_or_create(
             user_id=request.user.id,
         )
 
         if request.GET:
-
-            filter_id, save_coords, show_unconnected, show_power, show_circuit, show_logical_connections, show_single_cable_logical_conns, show_cables, show_wireless, group_sites, group_locations, group_racks, show_neighbors = get_query_settings(request)
-            
-            # Read options from saved filters as NetBox does not handle custom plugin filters
-            if "filter_id" in request.GET and request.GET["filter_id"] != '':
-                try:
-                    saved_filter = SavedFilter.objects.get(pk=filter_id)
-                    saved_filter_params = getattr(saved_filter, 'parameters')
-
-                    if save_coords == False and 'save_coords' in saved_filter_params: save_coords = saved_filter_params['save_coords']
-                    if show_power == False and 'show_power' in saved_filter_params: show_power = saved_filter_params['show_power']
-                    if show_circuit == False and 'show_circuit' in saved_filter_params: show_circuit = saved_filter_params['show_circuit']
-                    if show_logical_connections == False and 'show_logical_connections' in saved_filter_params: show_logical_connections = saved_filter_params['show_logical_connections']
-                    if show_single_cable_logical_conns == False and 'show_single_cable_logical_conns' in saved_filter_params: show_single_cable_logical_conns = saved_filter_params['show_single_cable_logical_conns']
-                    if show_cables == False and 'show_cables' in saved_filter_params: show_cables = saved_filter_params['show_cables']
-                    if show_wireless == False and 'show_wireless' in saved_filter_params: show_wireless = saved_filter_params['show_wireless']
-                    if group_sites == False and 'group_sites' in saved_filter_params: group_sites = saved_filter_params['group_sites']
-                    if group_locations == False and 'group_locations' in saved_filter_params: group_locations = saved_filter_params['group_locations']
-                    if group_racks == False and 'group_racks' in saved_filter_params: group_racks = saved_filter_params['group_racks']
-                    if show_neighbors == False and 'show_neighbors' in saved_filter_params: show_neighbors = saved_filter_params['show_neighbors']
-                except SavedFilter.DoesNotExist: # filter_id not found
-                    pass
-                except Exception as inst:
-                    print(type(inst))
+            topology_settings = get_topology_settings(request)
 
             if "group" not in request.GET:
                 group_id = "default"
@@ -740,23 +1030,41 @@ class TopologyHomeView(PermissionRequiredMixin, View):
                 group_id = request.GET["group"]
 
             if not "draw_init" in request.GET or "draw_init" in request.GET and request.GET["draw_init"].lower() == "true":
-                topo_data = get_topology_data(
-                    queryset=self.queryset,
-                    individualOptions=individualOptions,
-                    save_coords=save_coords,
-                    show_unconnected=show_unconnected,
-                    show_cables=show_cables,
-                    show_logical_connections=show_logical_connections,
-                    show_single_cable_logical_conns=show_single_cable_logical_conns,
-                    show_neighbors=show_neighbors,
-                    show_circuit=show_circuit,
-                    show_power=show_power,
-                    show_wireless=show_wireless,
-                    group_sites=group_sites,
-                    group_locations=group_locations,
-                    group_racks=group_racks,
-                    group_id=group_id,
-                )
+                cache_key = get_topology_cache_key(request, individualOptions, group_id, topology_settings)
+                build_key = get_topology_build_key(request, individualOptions, group_id, topology_settings)
+                topology_etag = get_topology_etag(cache_key)
+                background_build_threshold = CONFIG["background_build_threshold"]
+
+                # The page is reloaded with the job id once a background build has completed
+                completed_build = get_completed_topology_build(request.GET.get("build"), build_key)
+                build_result = CACHE_MISS
+                if completed_build is not None:
+                    build_result = cache.get(get_build_result_key(completed_build.pk), CACHE_MISS)
+
+                if build_result is not CACHE_MISS:
+                    topo_data = build_result
+                    topology_etag = completed_build.data["etag"]
+                elif (
+                    background_build_threshold
+                    and not is_htmx(request)
+                    and not cache.has_key(cache_key)
+                    and self.queryset.count() > background_build_threshold
+                ):
+                    # Too large to build within the request, the page polls the build
+                    topology_build_pending = True
+                    topology_build = enqueue_topology_build(
+                        request, individualOptions, group_id, topology_settings, cache_key, build_key
+                    )
+                else:
+                    topo_data = get_cached_topology_data(
+                        request,
+                        queryset=self.queryset,
+                        individualOptions=individualOptions,
+                        group_id=group_id,
+                        topology_settings=topology_settings,
+                        cache_key=cache_key,
+                        view="htmx" if is_htmx(request) else "home",
+                    )
             
         else:
             # No GET-Request in URL. We most likely came here from the navigation menu.
@@ -807,6 +1115,11 @@ class TopologyHomeView(PermissionRequiredMixin, View):
             {
                 "filter_form": DeviceFilterForm(request.GET, label_suffix=""),
                 "topology_data": json.dumps(topo_data),
+                "topology_etag": json.dumps(topology_etag),
+                "allow_coordinates_saving": CONFIG["allow_coordinates_saving"],
+                "topology_build": topology_build,
+                "topology_build_pending": topology_build_pending,
+                "topology_profile": get_topology_profile(request),
                 "broken_image": find_image_url("role-unknown"),
                 "model": self.model,
                 "basepath": settings.BASE_PATH,
@@ -872,132 +1185,6 @@ class TopologyImagesView(PermissionRequiredMixin, View):
             },
         )
 
-class CircuitCoordinateView(PermissionRequiredMixin, ObjectView):
-    permission_required = 'netbox_topology_views.view_coordinate'
-
-    queryset = CircuitCoordinate.objects.all()
-
-class CircuitCoordinateAddView(PermissionRequiredMixin, ObjectEditView):
-    permission_required = 'netbox_topology_views.add_coordinate'
-
-    queryset = CircuitCoordinate.objects.all()
-    form = CircuitCoordinatesForm
-    template_name = 'netbox_topology_views/circuitcoordinate_add.html'
-
-class CircuitCoordinateBulkImportView(BulkImportView):
-    queryset = CircuitCoordinate.objects.all()
-    model_form = CircuitCoordinatesImportForm
-
-class CircuitCoordinateListView(PermissionRequiredMixin, ObjectListView):
-    permission_required = 'netbox_topology_views.view_coordinate'
-
-    queryset = CircuitCoordinate.objects.all()
-    table = CircuitCoordinateListTable
-    template_name = 'netbox_topology_views/circuitcoordinate_list.html'
-    filterset = CircuitCoordinatesFilterSet
-    filterset_form = CircuitCoordinatesFilterForm
-
-class CircuitCoordinateEditView(PermissionRequiredMixin, ObjectEditView):
-    permission_required = 'netbox_topology_views.change_coordinate'
-
-    queryset = CircuitCoordinate.objects.all()
-    form = CircuitCoordinatesForm
-    template_name = 'netbox_topology_views/circuitcoordinate_edit.html'
-
-class CircuitCoordinateDeleteView(PermissionRequiredMixin, ObjectDeleteView):
-    permission_required = 'netbox_topology_views.delete_coordinate'
-
-    queryset = CircuitCoordinate.objects.all()
-
-class CircuitCoordinateChangeLogView(PermissionRequiredMixin, ObjectChangeLogView):
-    permission_required = 'netbox_topology_views.view_coordinate'
-
-    queryset = CircuitCoordinate.objects.all()
-
-class PowerPanelCoordinateView(PermissionRequiredMixin, ObjectView):
-    permission_required = 'netbox_topology_views.view_coordinate'
-
-    queryset = PowerPanelCoordinate.objects.all()
-
-class PowerPanelCoordinateAddView(PermissionRequiredMixin, ObjectEditView):
-    permission_required = 'netbox_topology_views.add_coordinate'
-
-    queryset = PowerPanelCoordinate.objects.all()
-    form = PowerPanelCoordinatesForm
-    template_name = 'netbox_topology_views/powerpanelcoordinate_add.html'
-
-class PowerPanelCoordinateBulkImportView(BulkImportView):
-    queryset = PowerPanelCoordinate.objects.all()
-    model_form = PowerPanelCoordinatesImportForm
-
-class PowerPanelCoordinateListView(PermissionRequiredMixin, ObjectListView):
-    permission_required = 'netbox_topology_views.view_coordinate'
-
-    queryset = PowerPanelCoordinate.objects.all()
-    table = PowerPanelCoordinateListTable
-    template_name = 'netbox_topology_views/powerpanelcoordinate_list.html'
-    filterset = PowerPanelCoordinatesFilterSet
-    filterset_form = PowerPanelCoordinatesFilterForm
-
-class PowerPanelCoordinateEditView(PermissionRequiredMixin, ObjectEditView):
-    permission_required = 'netbox_topology_views.change_coordinate'
-
-    queryset = PowerPanelCoordinate.objects.all()
-    form = PowerPanelCoordinatesForm
-    template_name = 'netbox_topology_views/powerpanelcoordinate_edit.html'
-
-class PowerPanelCoordinateDeleteView(PermissionRequiredMixin, ObjectDeleteView):
-    permission_required = 'netbox_topology_views.delete_coordinate'
-
-    queryset = PowerPanelCoordinate.objects.all()
-
-class PowerPanelCoordinateChangeLogView(PermissionRequiredMixin, ObjectChangeLogView):
-    permission_required = 'netbox_topology_views.view_coordinate'
-
-    queryset = PowerPanelCoordinate.objects.all()
-
-class PowerFeedCoordinateView(PermissionRequiredMixin, ObjectView):
-    permission_required = 'netbox_topology_views.view_coordinate'
-
-    queryset = PowerFeedCoordinate.objects.all()
-
-class PowerFeedCoordinateAddView(PermissionRequiredMixin, ObjectEditView):
-    permission_required = 'netbox_topology_views.add_coordinate'
-
-    queryset = PowerFeedCoordinate.objects.all()
-    form = PowerFeedCoordinatesForm
-    template_name = 'netbox_topology_views/powerfeedcoordinate_add.html'
-
-class PowerFeedCoordinateBulkImportView(BulkImportView):
-    queryset = PowerFeedCoordinate.objects.all()
-    model_form = PowerFeedCoordinatesImportForm
-
-class PowerFeedCoordinateListView(PermissionRequiredMixin, ObjectListView):
-    permission_required = 'netbox_topology_views.view_coordinate'
-
-    queryset = PowerFeedCoordinate.objects.all()
-    table = PowerFeedCoordinateListTable
-    template_name = 'netbox_topology_views/powerfeedcoordinate_list.html'
-    filterset = PowerFeedCoordinatesFilterSet
-    filterset_form = PowerFeedCoordinatesFilterForm
-
-class PowerFeedCoordinateEditView(PermissionRequiredMixin, ObjectEditView):
-    permission_required = 'netbox_topology_views.change_coordinate'
-
-    queryset = PowerFeedCoordinate.objects.all()
-    form = PowerFeedCoordinatesForm
-    template_name = 'netbox_topology_views/powerfeedcoordinate_edit.html'
-
-class PowerFeedCoordinateDeleteView(PermissionRequiredMixin, ObjectDeleteView):
-    permission_required = 'netbox_topology_views.delete_coordinate'
-
-    queryset = PowerFeedCoordinate.objects.all()
-
-class PowerFeedCoordinateChangeLogView(PermissionRequiredMixin, ObjectChangeLogView):
-    permission_required = 'netbox_topology_views.view_coordinate'
-
-    queryset = PowerFeedCoordinate.objects.all()
-
 class CoordinateView(PermissionRequiredMixin, ObjectView):
     permission_required = 'netbox_topology_views.view_coordinate'
 
@@ -1017,7 +1204,7 @@ class CoordinateBulkImportView(BulkImportView):
 class CoordinateListView(PermissionRequiredMixin, ObjectListView):
     permission_required = 'netbox_topology_views.view_coordinate'
 
-    queryset = Coordinate.objects.all()
+    queryset = Coordinate.objects.select_related('group', 'content_type').prefetch_related('assigned_object')
     table = CoordinateListTable
     template_name = 'netbox_topology_views/coordinate_list.html'
     filterset = CoordinatesFilterSet
@@ -1046,22 +1233,107 @@ class CoordinateGroupView(PermissionRequiredMixin, ObjectView):
     queryset = CoordinateGroup.objects.all()
 
     def get_extra_context(self, request, instance):
-        circuittable = CircuitCoordinateListTable(instance.circuitcoordinate_set.all())
-        circuittable.configure(request)
-        powerpaneltable = PowerPanelCoordinateListTable(instance.powerpanelcoordinate_set.all())
-        powerpaneltable.configure(request)
-        powerfeedtable = PowerFeedCoordinateListTable(instance.powerfeedcoordinate_set.all())
-        powerfeedtable.configure(request)
-        table = CoordinateListTable(instance.coordinate_set.all())
+        table = CoordinateListTable(
+            instance.coordinate_set.select_related('group', 'content_type').prefetch_related('assigned_object')
+        )
         table.configure(request)
 
         return {
-            'circuitcoordinates_table': circuittable,
-            'powerpanelcoordinates_table': powerpaneltable,
-            'powerfeedcoordinates_table': powerfeedtable,
             'coordinates_table': table,
         }
 
+class CoordinateGroupCloneView(PermissionRequiredMixin, View):
+    permission_required = (
+        'netbox_topology_views.add_coordinategroup',
+        'netbox_topology_views.add_coordinate',
+    )
+
+    def render_form(self, request, group, form):
+        return render(
+            request,
+            "netbox_topology_views/coordinategroup_clone.html",
+            {
+                "object": group,
+                "form": form,
+                "return_url": group.get_absolute_url(),
+            },
+        )
+
+    def get(self, request, pk):
+        group = get_object_or_404(CoordinateGroup, pk=pk)
+        form = CoordinateGroupCloneForm(initial={
+            'name': f'{group.name} (copy)',
+            'description': group.description,
+        })
+        return self.render_form(request, group, form)
+
+    def post(self, request, pk):
+        group = get_object_or_404(CoordinateGroup, pk=pk)
+        form = CoordinateGroupCloneForm(request.POST)
+        if not form.is_valid():
+            return self.render_form(request, group, form)
+
+        try:
+            new_group, count = group.clone(
+                form.cleaned_data['name'],
+                description=form.cleaned_data['description'],
+                devices=form.get_devices(),
+            )
+        except IntegrityError:
+            # Created by a concurrent request since the form has been validated
+            form.add_error('name', 'A coordinate group with this name already exists.')
+            return self.render_form(request, group, form)
+        messages.success(request, f"Copied {count} coordinates to {new_group}")
+        return HttpResponseRedirect(new_group.get_absolute_url())
+
+class CoordinateGroupExportView(PermissionRequiredMixin, View):
+    permission_required = 'netbox_topology_views.view_coordinate'
+
+    def get(self, request, pk):
+        group = get_object_or_404(CoordinateGroup, pk=pk)
+        file_format = request.GET.get('file_format', 'csv')
+        if file_format not in FILE_FORMATS:
+            file_format = 'csv'
+        return compress_response(request, get_export_response(group, file_format))
+
+class CoordinateGroupFileImportView(PermissionRequiredMixin, View):
+    permission_required = (
+        'netbox_topology_views.add_coordinate',
+        'netbox_topology_views.change_coordinate',
+    )
+
+    def render_form(self, request, group, form):
+        return render(
+            request,
+            "netbox_topology_views/coordinategroup_file_import.html",
+            {
+                "object": group,
+                "form": form,
+                "return_url": group.get_absolute_url(),
+            },
+        )
+
+    def get(self, request, pk):
+        group = get_object_or_404(CoordinateGroup, pk=pk)
+        return self.render_form(request, group, CoordinateGroupFileImportForm())
+
+    def post(self, request, pk):
+        group = get_object_or_404(CoordinateGroup, pk=pk)
+        form = CoordinateGroupFileImportForm(request.POST, request.FILES)
+        if not form.is_valid():
+            return self.render_form(request, group, form)
+
+        try:
+            count = import_coordinates(
+                group, form.cleaned_data['file'], form.cleaned_data['file_format']
+            )
+        except ValueError as e:
+            form.add_error('file', str(e))
+            return self.render_form(request, group, form)
+
+        messages.success(request, f"Imported {count} coordinates to {group}")
+        return HttpResponseRedirect(group.get_absolute_url())
+
 class CoordinateGroupAddView(PermissionRequiredMixin, ObjectEditView):
     permission_required = 'netbox_topology_views.add_coordinategroup'
 